@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Headless audio benchmarks for LearnwithAI
+
+Drives AudioService through the virtual audio device (WAV replay input,
+discarded output) and measures record-start latency, stop/save time,
+playback throughput and memory over long recordings.
+
+Usage:
+    python benchmarks/bench_audio.py [--durations 10 60 300] [--input file.wav] [--json out.json]
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+# Ajouter le chemin src pour importer le module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from learnwithai.services.audio_backends import virtual_backend_factory
+from learnwithai.services.audio_service import AudioService
+from learnwithai.services.device_cache import DeviceCapabilityCache
+
+
+def write_test_tone(path, seconds=5.0, rate=44100):
+    """Write a speech-like amplitude-modulated tone used as default input"""
+    import math
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        t = i / float(rate)
+        value = 0.4 * math.sin(2 * math.pi * 220 * t) * (0.5 + 0.5 * math.sin(2 * math.pi * 3 * t))
+        frames += int(value * 32767).to_bytes(2, 'little', signed=True)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(bytes(frames))
+    return path
+
+
+def make_service(workdir, input_files, speed):
+    factory = virtual_backend_factory(input_files, speed=speed)
+    service = AudioService(
+        device_cache=DeviceCapabilityCache(os.path.join(workdir, 'devices.json')),
+        backend_factory=factory,
+        recordings_dir=os.path.join(workdir, 'recordings')
+    )
+    # Pas de moniteur de périphériques pendant les mesures
+    service.stop_device_monitor()
+    return service, factory()
+
+
+def wait_for_audio(service, seconds, timeout=600):
+    """Wait until `seconds` of audio have been captured"""
+    target_chunks = int(seconds * service.fs / service.chunk)
+    deadline = time.perf_counter() + timeout
+    while len(service.frames) < target_chunks and time.perf_counter() < deadline:
+        time.sleep(0.005)
+
+
+def bench_start_latency(service, iterations=20):
+    """Time start_recording (device lookup + stream open + thread start)"""
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        service.start_recording()
+        timings.append((time.perf_counter() - t0) * 1000)
+        service.stop_recording()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3)
+    }
+
+
+def bench_long_recording(service, seconds):
+    """Capture `seconds` of audio (accelerated) and time stop/save, tracking memory"""
+    tracemalloc.start()
+    service.start_recording()
+    wait_for_audio(service, seconds)
+    capture_peak = tracemalloc.get_traced_memory()[1]
+
+    t0 = time.perf_counter()
+    file_path = service.stop_recording()
+    stop_ms = (time.perf_counter() - t0) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'audio_seconds': seconds,
+        'stop_save_ms': round(stop_ms, 2),
+        'capture_peak_mb': round(capture_peak / 1e6, 2),
+        'peak_mb': round(peak / 1e6, 2),
+        'file_mb': round(os.path.getsize(file_path) / 1e6, 2)
+    }, file_path
+
+
+def bench_playback(service, device, file_path):
+    """Time playback of a file with output discarded at full speed"""
+    before = device.output_bytes
+    t0 = time.perf_counter()
+    service.play_audio(file_path)
+    elapsed = time.perf_counter() - t0
+    played = (device.output_bytes - before) / (2.0 * service.channels * service.fs)
+    return {
+        'audio_seconds': round(played, 2),
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'realtime_factor': round(elapsed / played, 5) if played else None
+    }
+
+
+def run(durations, input_file=None, speed=0.0):
+    results = {'start_latency': None, 'recordings': [], 'playback': []}
+    with tempfile.TemporaryDirectory() as workdir:
+        input_files = [input_file or write_test_tone(os.path.join(workdir, 'input.wav'))]
+        service, device = make_service(workdir, input_files, speed)
+        try:
+            results['start_latency'] = bench_start_latency(service)
+            for seconds in durations:
+                recording, file_path = bench_long_recording(service, seconds)
+                results['recordings'].append(recording)
+                results['playback'].append(bench_playback(service, device, file_path))
+        finally:
+            service.cleanup()
+    return results
+
+
+def print_report(results):
+    print("\n🎤 Record start latency: median {median_ms} ms, max {max_ms} ms".format(**results['start_latency']))
+    print(f"\n{'audio (s)':>10} {'stop+save (ms)':>15} {'peak (MB)':>10} {'file (MB)':>10} {'playback RTF':>13}")
+    for recording, playback in zip(results['recordings'], results['playback']):
+        print(f"{recording['audio_seconds']:>10} {recording['stop_save_ms']:>15} "
+              f"{recording['peak_mb']:>10} {recording['file_mb']:>10} {playback['realtime_factor']:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AudioService benchmarks")
+    parser.add_argument('--durations', type=float, nargs='+', default=[10, 60, 300],
+                        help="Recording lengths in seconds of audio")
+    parser.add_argument('--input', help="WAV file replayed as microphone input")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Capture speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.durations, args.input, args.speed)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Capture DSP benchmark for LearnwithAI
+
+Feeds a noisy speech-like signal through CaptureProcessor chunk by chunk, as
+the recording thread does, and reports for each chunk size the real-time
+factor (processing time / audio time), per-chunk latency percentiles against
+the chunk's time budget, and the noise reduction achieved.
+
+Usage:
+    python benchmarks/bench_dsp.py [--rate 48000] [--chunks 256 512 1024 2048 4096] [--mode on] [--json out.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Ajouter le chemin src pour importer le module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from learnwithai.services.audio_dsp import CaptureProcessor
+from learnwithai.services.audio_service import AUDIO_DSP_MODES
+
+
+def noisy_speech(seconds, rate, noise_dbfs=-35.0, seed=0):
+    """Syllable-like bursts (3 Hz envelope, 1 s pause every 2 s) over white noise
+
+    Returns:
+        tuple: (int16 samples, mask of the speech samples, mask of the noise-only samples)
+    """
+    t = np.arange(int(seconds * rate)) / float(rate)
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) * ((t % 2.0) >= 1.0)
+    voice = 0.3 * envelope * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t))
+    noise = np.random.default_rng(seed).standard_normal(t.size) * 10 ** (noise_dbfs / 20.0)
+    samples = np.clip((voice + noise) * 32767, -32768, 32767).astype('<i2')
+    # Les deux premières secondes servent à l'apprentissage : on ne les mesure pas
+    measured = t >= 2.0
+    return samples, ((t % 2.0) >= 1.0) & measured, ((t % 2.0) < 1.0) & measured
+
+
+def level_dbfs(samples):
+    as_float = samples.astype(np.float64) / 32768.0
+    return 10.0 * np.log10(np.mean(as_float ** 2) + 1e-12)
+
+
+def bench_chunk_size(samples, speech_mask, noise_mask, rate, chunk, mode):
+    noise_suppression, agc = AUDIO_DSP_MODES[mode]
+    processor = CaptureProcessor(rate, noise_suppression=noise_suppression, agc=agc)
+    timings = []
+    output = []
+    for start in range(0, samples.size, chunk):
+        data = samples[start:start + chunk].tobytes()
+        t0 = time.perf_counter()
+        output.append(processor.process(data))
+        timings.append(time.perf_counter() - t0)
+    output.append(processor.flush())
+    processed = np.frombuffer(b''.join(output), dtype='<i2')
+
+    timings.sort()
+    budget_ms = chunk / float(rate) * 1000
+    return {
+        'chunk': chunk,
+        'budget_ms': round(budget_ms, 2),
+        'p50_ms': round(timings[len(timings) // 2] * 1000, 3),
+        'p99_ms': round(timings[int(0.99 * (len(timings) - 1))] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'realtime_factor': round(sum(timings) / (samples.size / float(rate)), 4),
+        # Gain de rapport signal/bruit (indépendant du gain appliqué par l'AGC)
+        'snr_gain_db': round((level_dbfs(processed[speech_mask]) - level_dbfs(processed[noise_mask]))
+                             - (level_dbfs(samples[speech_mask]) - level_dbfs(samples[noise_mask])), 1),
+        'speech_dbfs': round(level_dbfs(processed[speech_mask]), 1),
+        'latency_ms': processor.stats()['latency_ms'],
+    }
+
+
+def run(rate, chunks, mode, seconds):
+    samples, speech_mask, noise_mask = noisy_speech(seconds, rate)
+    # Un passage à vide pour charger les bibliothèques FFT
+    CaptureProcessor(rate).process(samples[:rate].tobytes())
+    return [bench_chunk_size(samples, speech_mask, noise_mask, rate, chunk, mode) for chunk in chunks]
+
+
+def print_report(results, rate, mode):
+    print(f"\n🎛️ Capture DSP ({mode}) at {rate} Hz mono")
+    print(f"{'chunk':>7} {'budget (ms)':>12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} "
+          f"{'RTF':>8} {'SNR gain (dB)':>14} {'speech (dBFS)':>14} {'latency (ms)':>13}")
+    for r in results:
+        print(f"{r['chunk']:>7} {r['budget_ms']:>12} {r['p50_ms']:>9} {r['p99_ms']:>9} {r['max_ms']:>9} "
+              f"{r['realtime_factor']:>8} {r['snr_gain_db']:>14} {r['speech_dbfs']:>14} {r['latency_ms']:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture DSP real-time factor per chunk size")
+    parser.add_argument('--rate', type=int, default=48000)
+    parser.add_argument('--chunks', type=int, nargs='+', default=[256, 512, 1024, 2048, 4096])
+    parser.add_argument('--mode', choices=[mode for mode in AUDIO_DSP_MODES if mode != 'off'], default='on')
+    parser.add_argument('--seconds', type=float, default=30.0, help="Length of the test signal")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.rate, args.chunks, args.mode, args.seconds)
+    print_report(results, args.rate, args.mode)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Offline performance suite for LearnwithAI
+
+Times the hot paths of the app with a mocked Groq client and no GUI backend,
+compares each metric with the JSON baselines and fails when one regresses
+beyond the threshold.
+
+The suite runs several times, each in a fresh process (a slow process stays
+slow for all its measurements), and keeps the best value of each metric.
+Millisecond metrics, dominated by file I/O and allocation, get a wider
+tolerance than the microsecond ones.
+
+Usage:
+    python benchmarks/bench_suite.py                    # compare with baselines.json
+    python benchmarks/bench_suite.py --update-baseline  # record new baselines
+    python benchmarks/bench_suite.py --only parse --threshold 0.5 --repeats 3
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import statistics
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Ajouter le chemin src pour importer le module
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+from learnwithai.prompts.teaching_prompts import get_available_prompt_types, get_prompt
+from learnwithai.services.learner_memory import KIND_FACT, LearnerMemory
+from learnwithai.services.response_parser import parse_ai_response
+from learnwithai.views.ai_chat_view import AIChatView
+from learnwithai.views.chat_transcript import TranscriptRenderer
+
+from fakes import REPLY_CORPUS, FakeGroqClient, FakeTextWidget, isolated_ai_service
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baselines.json')
+DEFAULT_THRESHOLD = 0.3  # +30% par rapport à la référence = régression
+DEFAULT_MS_THRESHOLD = 0.6  # Métriques en ms (E/S disque, allocations) : plus bruitées
+DEFAULT_REPEATS = 5
+SESSION_SIZE = 1000
+
+
+def measure(func, number=100, repeat=5):
+    """Median time of one call to func() in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - t0) / number * 1e6)
+    return round(statistics.median(timings), 3)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the services' debug prints while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def make_chat_view(ai_service=None):
+    app = SimpleNamespace(ai_service=ai_service, audio_service=None, review_scheduler=None, executor=None)
+    view = AIChatView(app)
+    view.transcript = TranscriptRenderer(FakeTextWidget())
+    return view
+
+
+def fill_session(view, size=SESSION_SIZE):
+    for i in range(size // 2):
+        view.add_message("Vous", f"Message number {i}: I goed to the market yesterday.")
+        view.add_message("AI Assistant", f"Reply number {i}: Nice! What did you buy at the market?")
+
+
+# --- Benchmarks ---
+
+def bench_send_message():
+    """send_message overhead with an instant client (no network time)"""
+    with quiet():
+        service = isolated_ai_service()
+    service.client = FakeGroqClient()
+    view = make_chat_view(service)
+    fill_session(view, 20)
+    history = view.conversation.recent(10)
+    with quiet():
+        return {'send_message_us': measure(lambda: service.send_message("How are you?", history), number=200)}
+
+
+def bench_parse():
+    """parse_ai_response over the reply corpus"""
+    def parse_corpus():
+        for reply in REPLY_CORPUS:
+            parse_ai_response(reply)
+    with quiet():
+        per_corpus = measure(parse_corpus, number=200)
+    return {'parse_reply_us': round(per_corpus / len(REPLY_CORPUS), 3)}
+
+
+def bench_transcript():
+    """add_message / remove_last_message on a 1k-message session"""
+    def build():
+        fill_session(make_chat_view())
+    view = make_chat_view()
+    fill_session(view)
+
+    def add_remove():
+        view.add_message("Vous", "One more message")
+        view.remove_last_message()
+    return {
+        'session_1k_build_ms': round(measure(build, number=3) / 1000, 3),
+        'add_remove_at_1k_us': measure(add_remove, number=500),
+    }
+
+
+def bench_prompts():
+    """get_prompt for every type and level, and settings loading"""
+    prompt_types = get_available_prompt_types()
+    levels = ('beginner', 'intermediate', 'advanced')
+
+    def all_prompts():
+        for prompt_type in prompt_types:
+            for level in levels:
+                get_prompt(prompt_type, level)
+    with quiet():
+        service = isolated_ai_service()
+    return {
+        'get_prompt_us': round(measure(all_prompts, number=200) / (len(prompt_types) * len(levels)), 3),
+        'load_settings_us': measure(service.load_user_settings, number=200),
+    }
+
+
+def bench_audio_save():
+    """AudioService stop/save of a 10 s recording through the virtual device"""
+    from bench_audio import bench_long_recording, make_service, write_test_tone
+    with tempfile.TemporaryDirectory() as workdir, quiet():
+        service, _ = make_service(workdir, [write_test_tone(os.path.join(workdir, 'input.wav'))], 0.0)
+        try:
+            timings = [bench_long_recording(service, 10)[0]['stop_save_ms'] for _ in range(3)]
+        finally:
+            service.cleanup()
+    return {'audio_stop_save_10s_ms': round(statistics.median(timings), 3)}
+
+
+def bench_memory():
+    """Retrieval and send_message with 20k learner memories"""
+    import random
+    rng = random.Random(0)
+    vocabulary = [f"topic{i}" for i in range(3000)]
+    with tempfile.TemporaryDirectory() as workdir, quiet():
+        memory = LearnerMemory(os.path.join(workdir, 'memory.npz'))
+        memory.add_many((KIND_FACT, " ".join(rng.choices(vocabulary, k=6))) for _ in range(20000))
+        memory.add("The learner said: \"I work as a nurse in Lyon\"")
+        service = isolated_ai_service()
+        service.client = FakeGroqClient()
+        service.memory = memory
+        return {
+            'memory_recall_20k_us': measure(lambda: service.recall("Are you a nurse in Lyon?"), number=50),
+            'send_with_memory_20k_us': measure(lambda: service.send_message("How are you?"), number=50),
+        }
+
+
+BENCHMARKS = {
+    'send': bench_send_message,
+    'parse': bench_parse,
+    'transcript': bench_transcript,
+    'prompts': bench_prompts,
+    'audio': bench_audio_save,
+    'memory': bench_memory,
+}
+
+
+def run(names=None):
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results.update(bench())
+    return results
+
+
+def run_repeated(names=None, repeats=DEFAULT_REPEATS):
+    """
+    Run the suite `repeats` times, each in its own process, and keep the minimum of each metric
+
+    The noise of a shared machine only ever adds time, so the minimum is the
+    most reproducible estimate.
+    """
+    if repeats <= 1:
+        return run(names)
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for index in range(repeats):
+            path = os.path.join(workdir, f'run{index}.json')
+            command = [sys.executable, os.path.abspath(__file__), '--worker', '--json', path]
+            if names:
+                command += ['--only'] + list(names)
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            with open(path, 'r') as f:
+                runs.append(json.load(f))
+    return {metric: min(run[metric] for run in runs) for metric in runs[0]}
+
+
+def metric_threshold(metric, threshold, ms_threshold):
+    """Allowed slowdown of a metric (millisecond metrics have their own tolerance)"""
+    return ms_threshold if metric.endswith('_ms') else threshold
+
+
+def compare(results, baselines, threshold, ms_threshold=DEFAULT_MS_THRESHOLD):
+    """
+    Returns:
+        list: (metric, baseline, value, ratio) for each regression
+    """
+    regressions = []
+    for metric, value in results.items():
+        baseline = baselines.get(metric)
+        if not baseline:
+            continue
+        ratio = value / baseline
+        if ratio > 1 + metric_threshold(metric, threshold, ms_threshold):
+            regressions.append((metric, baseline, value, ratio))
+    return regressions
+
+
+def print_report(results, baselines):
+    print(f"\n{'metric':<26} {'value':>12} {'baseline':>12} {'change':>8}")
+    for metric, value in results.items():
+        baseline = baselines.get(metric)
+        change = f"{(value / baseline - 1) * 100:+.0f}%" if baseline else "new"
+        print(f"{metric:<26} {value:>12} {baseline if baseline else '-':>12} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline LearnwithAI performance suite")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of the microsecond metrics (0.3 = +30%%)")
+    parser.add_argument('--ms-threshold', type=float, default=DEFAULT_MS_THRESHOLD,
+                        help="Allowed slowdown of the millisecond metrics")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help="Runs in separate processes; the best value of each metric is kept")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        # Une seule passe, résultats en JSON pour le processus parent
+        with open(args.json, 'w') as f:
+            json.dump(run(args.only), f)
+        return 0
+
+    results = run_repeated(args.only, args.repeats)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baselines = json.load(f)
+
+    print_report(results, baselines)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        baselines.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold, args.ms_threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed beyond their threshold "
+              f"({args.threshold:.0%}, {args.ms_threshold:.0%} for ms metrics):")
+        for metric, baseline, value, ratio in regressions:
+            print(f"   {metric}: {baseline} -> {value} (x{ratio:.2f})")
+        return 1
+    print("\n✅ No regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Offline stand-ins used by the benchmarks: a Groq client that answers instantly,
+a text widget without a GUI backend, a corpus of model replies and a chat
+service that never touches the learner's stores.
+"""
+
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+
+from learnwithai.services.ai_service import AIChatService
+
+# Mémoire et profil d'erreurs des benchmarks : jamais ceux du développeur dans resources/
+_STORE_DIR = tempfile.TemporaryDirectory(prefix='learnwithai-bench-')
+
+# Réponses typiques du modèle, bien formées ou non
+REPLY_CORPUS = [
+    json.dumps({"response": "Nice to meet you! Where are you from?", "tips": ""}),
+    json.dumps({"response": "Great! What did you eat yesterday?",
+                "tips": "Use the past tense: 'I ate', not 'I eat yesterday'."}),
+    'Sure! Here is my answer:\n{"response": "I love travelling too. Which country?", "tips": "Say \'travelling\' (UK) or \'traveling\' (US)."}',
+    '```json\n{"response": "Good job!", "tips": ""}\n```',
+    '{"response": "You can say: \\"I have been waiting for two hours.\\"", "tips": "Use the present perfect continuous with \'for\'."}',
+    '{"response": "Missing closing brace", "tips": "oops"',
+    '{"tips": "Only tips, no response key"}',
+    '{"response": "", "tips": "Empty response"}',
+    "Plain text answer without any JSON at all. " * 5,
+    '{"response": "Nested {braces} inside", "tips": {"grammar": "not a string"}}',
+    "",
+    json.dumps({"response": "Long answer. " * 80, "tips": "Watch your articles: 'a' before consonants. " * 5}),
+]
+
+
+class FakeCompletions:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeGroqClient:
+    def __init__(self, reply=REPLY_CORPUS[1]):
+        """Groq-compatible client returning `reply` without any network call"""
+        self.chat = SimpleNamespace(completions=FakeCompletions(reply))
+
+
+class FakeTextWidget:
+    """MultilineTextInput stand-in for TranscriptRenderer"""
+
+    def __init__(self):
+        self.value = ""
+
+    def scroll_to_bottom(self):
+        pass
+
+
+def isolated_ai_service():
+    """AIChatService whose learner memory and error profile live in a temporary directory"""
+    return AIChatService(memory_file=os.path.join(_STORE_DIR.name, 'learner_memory.npz'),
+                         error_profile_file=os.path.join(_STORE_DIR.name, 'error_profile.json'))
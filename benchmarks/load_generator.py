@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+In-process load generator for LearnwithAI
+
+Runs N simulated learners concurrently against one shared AIChatService, each
+with its own level and scripted multi-turn dialogue, through a fake client
+that injects latency and errors. Reports throughput, latency percentiles,
+error rate and memory growth, and checks every request and reply for state
+belonging to another learner (cross-session bleed).
+
+Usage:
+    python benchmarks/load_generator.py --learners 50 --turns 8 --latency 0.2
+    python benchmarks/load_generator.py --learners 20 --shared-settings   # app-style shared settings
+    python benchmarks/load_generator.py --shared-settings --prompt-delay 0  # without the widened race window
+    python benchmarks/load_generator.py --tail-rate 0.05 --tail-latency 2 --hedge
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import contextlib
+import statistics
+import tracemalloc
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Ajouter le chemin src pour importer le module
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+from learnwithai.prompts.teaching_prompts import get_level_context, get_prompt
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.conversation import ASSISTANT_SENDER, USER_SENDER, Conversation
+from learnwithai.services.hedging import HedgedCompleter
+from learnwithai.services.model_router import ModelRouter
+from learnwithai.services.response_parser import parse_ai_response
+
+from fakes import isolated_ai_service
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+# Pause ajoutée avant la construction du prompt partagé : élargit la fenêtre entre
+# le réglage du niveau et sa lecture, pour que le détecteur voie la fuite
+DEFAULT_PROMPT_DELAY = 0.002
+MARKER_RE = re.compile(r"\[learner-(\d+):turn-(\d+)\]")
+
+# Dialogue type rejoué par chaque apprenant (le marqueur identifie l'apprenant et le tour)
+SCRIPT = [
+    "Hello, my name is Sam and I am from Lyon.",
+    "Yesterday I goed to the cinema with my friends.",
+    "What do you think about learning English with movies?",
+    "I have been studying English since three years.",
+    "Can you give me an example with the present perfect?",
+    "Thank you! How do I say 'addition' at the restaurant?",
+    "I want to travel to London next summer.",
+    "Goodbye, see you tomorrow!",
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyCompletions:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None, tail_rate=0.0, tail_latency=1.0):
+        """
+        Groq-compatible completions endpoint that answers after a delay
+
+        The reply echoes the marker of the last user message and the level found
+        in the system prompt, and every request is checked for markers of more
+        than one learner. A `tail_rate` fraction of requests is slowed down to
+        `tail_latency` to reproduce a latency tail. Streaming is supported.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.mixed_requests = 0
+        self._level_contexts = {level: get_level_context(level).strip() for level in LEVELS}
+
+    def create(self, messages, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if self._random.random() < self.tail_rate:
+                delay = self.tail_latency
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if stream:
+            return self._stream(messages, delay, fail)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError("injected API error")
+        content = self._reply(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _stream(self, messages, delay, fail):
+        # Le délai s'applique avant le premier token
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError("injected API error")
+        content = self._reply(messages)
+        for start in range(0, len(content), 16):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[start:start + 16]))])
+
+    def _reply(self, messages):
+
+        learners = {match[0] for message in messages[1:] for match in MARKER_RE.findall(message['content'])}
+        if len(learners) > 1:
+            with self._lock:
+                self.mixed_requests += 1
+
+        markers = MARKER_RE.findall(messages[-1]['content'])
+        marker = f"[learner-{markers[0][0]}:turn-{markers[0][1]}]" if markers else "[unknown]"
+        system_prompt = messages[0]['content']
+        level = next((level for level, context in self._level_contexts.items() if context in system_prompt), 'unknown')
+        reply = {"response": f"{marker} level={level} Nice sentence! Tell me more.", "tips": ""}
+        return json.dumps(reply)
+
+
+class Learner:
+    def __init__(self, learner_id, level, turns, service, shared_settings=False, think_time=0.0):
+        self.learner_id = learner_id
+        self.level = level
+        self.turns = turns
+        self.service = service
+        self.shared_settings = shared_settings
+        self.think_time = think_time
+        self.conversation = Conversation()
+        self.system_prompt = get_prompt('conversation', level)
+        self.latencies = []
+        self.fallbacks = 0
+        self.bleeds = []
+
+    def run(self):
+        for turn in range(self.turns):
+            marker = f"[learner-{self.learner_id}:turn-{turn}]"
+            text = f"{marker} {SCRIPT[turn % len(SCRIPT)]}"
+            history = self.conversation.recent(10)
+
+            t0 = time.perf_counter()
+            if self.shared_settings:
+                # Comme l'application : le niveau vit dans l'instance partagée
+                self.service.settings['level'] = self.level.capitalize()
+                self.service.settings['focus'] = 'Conversation'
+                self.service.apply_settings_to_prompt()
+                raw = self.service.send_message(text, history)
+            else:
+                raw = self.service.send_message(text, history, system_prompt=self.system_prompt)
+            reply, _ = parse_ai_response(raw)
+            self.latencies.append(time.perf_counter() - t0)
+
+            self.conversation.append(USER_SENDER, text)
+            if " level=" not in reply:
+                # Réponse de secours (erreur API) : rien à vérifier
+                self.fallbacks += 1
+            else:
+                if marker not in reply:
+                    self.bleeds.append(('reply', turn, reply[:60]))
+                if f"level={self.level}" not in reply:
+                    self.bleeds.append(('system_prompt', turn, reply[:60]))
+                self.conversation.append(ASSISTANT_SENDER, reply)
+            if self.think_time:
+                time.sleep(self.think_time)
+        return self
+
+
+def run(learners=20, turns=8, latency=0.05, jitter=0.02, error_rate=0.0, concurrency=None,
+        shared_settings=False, think_time=0.0, seed=1, tail_rate=0.0, tail_latency=1.0, hedge=False,
+        prompt_delay=DEFAULT_PROMPT_DELAY):
+    completions = LatencyCompletions(latency, jitter, error_rate, seed, tail_rate, tail_latency)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = isolated_ai_service()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    # Un seul modèle pour la charge : la cascade fausserait les latences comparées
+    service.router = ModelRouter(service.model, None)
+    # Deux tentatives au plus par apprenant simultané
+    service.hedger = HedgedCompleter(max_workers=2 * (concurrency or learners)) if hedge else None
+    if prompt_delay:
+        # Seul le prompt partagé passe par get_system_prompt (les sessions fournissent le leur)
+        build_prompt = service.get_system_prompt
+
+        def slow_system_prompt():
+            time.sleep(prompt_delay)
+            return build_prompt()
+        service.get_system_prompt = slow_system_prompt
+
+    population = [
+        Learner(i, LEVELS[i % len(LEVELS)], turns, service, shared_settings, think_time)
+        for i in range(learners)
+    ]
+
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    # Les impressions de débogage du service sont coupées pendant la charge
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency or learners) as pool:
+            list(pool.map(Learner.run, population))
+    elapsed = time.perf_counter() - started
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = [latency for learner in population for latency in learner.latencies]
+    bleeds = [(learner.learner_id,) + bleed for learner in population for bleed in learner.bleeds]
+    requests = len(latencies)
+    return {
+        'learners': learners,
+        'turns': turns,
+        'requests': requests,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean': round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        'error_rate': round(completions.errors / max(1, completions.calls), 4),
+        'fallback_replies': sum(learner.fallbacks for learner in population),
+        'memory_growth_mb': round((memory_after - memory_before) / 1e6, 3),
+        'memory_peak_mb': round(memory_peak / 1e6, 3),
+        'hedging': service.hedger.stats() if service.hedger else None,
+        'bleed': {
+            'count': len(bleeds),
+            'mixed_history_requests': completions.mixed_requests,
+            'examples': [list(bleed) for bleed in bleeds[:5]],
+        },
+    }
+
+
+def print_report(results):
+    latency = results['latency_ms']
+    print(f"\n👥 {results['learners']} learners x {results['turns']} turns = {results['requests']} requests "
+          f"in {results['elapsed_s']} s ({results['throughput_rps']} req/s)")
+    print(f"⏱️ Latency: p50 {latency['p50']} ms, p90 {latency['p90']} ms, p99 {latency['p99']} ms")
+    print(f"⚠️ Error rate: {results['error_rate']:.1%} ({results['fallback_replies']} fallback replies)")
+    print(f"💾 Memory: +{results['memory_growth_mb']} MB (peak {results['memory_peak_mb']} MB)")
+    if results['hedging']:
+        hedging = results['hedging']
+        print(f"🪃 Hedging: {hedging['hedge_rate']:.1%} of requests hedged, {hedging['hedge_win_rate']:.0%} won by the hedge, "
+              f"threshold {hedging['threshold_ms']} ms")
+    bleed = results['bleed']
+    if bleed['count'] or bleed['mixed_history_requests']:
+        print(f"❌ State bleed: {bleed['count']} reply/prompt mismatches, "
+              f"{bleed['mixed_history_requests']} requests mixing learners' history")
+        for example in bleed['examples']:
+            print(f"   learner {example[0]}: {example[1]} at turn {example[2]}: {example[3]}")
+    else:
+        print("✅ No cross-session state bleed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many concurrent learners")
+    parser.add_argument('--learners', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, help="Worker threads (defaults to one per learner)")
+    parser.add_argument('--latency', type=float, default=0.05, help="Injected API latency (s)")
+    parser.add_argument('--jitter', type=float, default=0.02, help="Latency jitter (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of API calls that fail")
+    parser.add_argument('--tail-rate', type=float, default=0.0, help="Fraction of API calls that are slow")
+    parser.add_argument('--tail-latency', type=float, default=1.0, help="Latency of the slow calls (s)")
+    parser.add_argument('--hedge', action='store_true', help="Enable hedged requests")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Pause between turns (s)")
+    parser.add_argument('--shared-settings', action='store_true',
+                        help="Set each learner's level on the shared service like the app does")
+    parser.add_argument('--prompt-delay', type=float, default=DEFAULT_PROMPT_DELAY,
+                        help="Pause before the shared system prompt is built (s); 0 disables it")
+    parser.add_argument('--switch-interval', type=float,
+                        help="Thread switch interval (s); tiny values make races show up sooner")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.switch_interval:
+        sys.setswitchinterval(args.switch_interval)
+    results = run(args.learners, args.turns, args.latency, args.jitter, args.error_rate,
+                  args.concurrency, args.shared_settings, args.think_time, args.seed,
+                  args.tail_rate, args.tail_latency, args.hedge, args.prompt_delay)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+    return 1 if results['bleed']['count'] or results['bleed']['mixed_history_requests'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
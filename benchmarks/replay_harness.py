@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Replay harness for LearnwithAI
+
+Replays recorded conversations through AIChatService under a matrix of
+configurations (model x temperature x max_tokens) and reports, for each one,
+time to first token, total latency, tokens used, the rate of replies the chat
+view can parse as JSON, and the rate of canned fallback replies (API errors).
+Every configuration sees the same inputs: the history of each learner turn is
+the recorded one, not the replies of the configuration under test.
+
+By default the API is simulated (per-model speed, JSON slips growing with the
+temperature, truncation at max_tokens); --live replays against Groq with the
+GROQ_API_KEY of the .env file.
+
+Usage:
+    python benchmarks/replay_harness.py
+    python benchmarks/replay_harness.py --models llama-3.1-8b-instant llama-3.3-70b-versatile \\
+        --temperatures 0.3 0.7 --max-tokens 150 300 500 --concurrency 4
+    python benchmarks/replay_harness.py --corpus sessions.json --live --json results.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+import contextlib
+import statistics
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Ajouter le chemin src pour importer le module
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+from learnwithai.prompts.teaching_prompts import get_prompt
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.conversation import ASSISTANT_SENDER, USER_SENDER, Conversation, Role
+from learnwithai.services.model_router import DEFAULT_FAST_MODEL, DEFAULT_STRONG_MODEL, ModelRouter
+from learnwithai.services.response_parser import is_structured_reply
+
+from load_generator import percentile
+from fakes import isolated_ai_service
+
+DEFAULT_LEVEL = 'intermediate'
+MIN_VALID_RATE = 0.95
+MAX_FALLBACK_RATE = 0.02
+
+# Conversations enregistrées rejouées quand aucun corpus n'est donné
+RECORDED_CORPUS = [
+    {'level': 'beginner', 'messages': [
+        {'sender': USER_SENDER, 'message': "Hello, my name is Sam and I am from Lyon."},
+        {'sender': ASSISTANT_SENDER, 'message': "Nice to meet you, Sam! What do you like to do in Lyon?"},
+        {'sender': USER_SENDER, 'message': "I like go to the river and eat in restaurants."},
+        {'sender': ASSISTANT_SENDER, 'message': "That sounds lovely! What is your favourite restaurant?"},
+        {'sender': USER_SENDER, 'message': "Yesterday I goed to a small italian restaurant with my sister."},
+    ]},
+    {'level': 'intermediate', 'messages': [
+        {'sender': USER_SENDER, 'message': "I have been studying English since three years."},
+        {'sender': ASSISTANT_SENDER, 'message': "Great! Why did you decide to learn English?"},
+        {'sender': USER_SENDER, 'message': "For my job, I work in a hospital and we have many foreign patients."},
+        {'sender': ASSISTANT_SENDER, 'message': "That must be interesting. What is the hardest part?"},
+        {'sender': USER_SENDER, 'message': "Explaining the treatments. Can you give me useful phrases?"},
+        {'sender': ASSISTANT_SENDER, 'message': "Of course! For example: 'You need to take this twice a day.'"},
+        {'sender': USER_SENDER, 'message': "What is the difference between 'must' and 'have to'?"},
+    ]},
+    {'level': 'advanced', 'messages': [
+        {'sender': USER_SENDER, 'message': "If I would have known about the strike, I would have taken the train earlier."},
+        {'sender': ASSISTANT_SENDER, 'message': "Bad luck! How did you get to work in the end?"},
+        {'sender': USER_SENDER, 'message': "I had to share a taxi with a colleague whom I barely know."},
+        {'sender': ASSISTANT_SENDER, 'message': "Did the ride turn out to be pleasant?"},
+        {'sender': USER_SENDER, 'message': "Surprisingly yes, although the traffic was so dense that we arrived late anyway."},
+    ]},
+    {'level': 'intermediate', 'messages': [
+        {'sender': USER_SENDER, 'message': "I want to travel to London next summer."},
+        {'sender': ASSISTANT_SENDER, 'message': "Exciting! What would you like to visit there?"},
+        {'sender': USER_SENDER, 'message': "The museums and maybe a football match. How do I buy tickets?"},
+        {'sender': ASSISTANT_SENDER, 'message': "Most clubs sell them online. Which team do you support?"},
+        {'sender': USER_SENDER, 'message': "I am supporter of Arsenal since I am child."},
+    ]},
+]
+
+# Profils simulés : (délai avant le premier token en s, tokens/s, taux de JSON invalide à température 0)
+SIMULATED_MODELS = {
+    DEFAULT_FAST_MODEL: (0.12, 800.0, 0.04),
+    DEFAULT_STRONG_MODEL: (0.30, 250.0, 0.01),
+}
+DEFAULT_PROFILE = (0.20, 400.0, 0.02)
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class SimulatedCompletions:
+    def __init__(self, time_scale=1.0, error_rate=0.0, seed=1):
+        """
+        Groq-compatible streaming endpoint with per-model speed and quality
+
+        Replies longer than max_tokens are cut (and so are not valid JSON);
+        the chance of a malformed reply grows with the temperature.
+        """
+        self.time_scale = time_scale
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, temperature=0.7, max_tokens=500, stream=False, **kwargs):
+        first_token, tokens_per_second, invalid_rate = SIMULATED_MODELS.get(model, DEFAULT_PROFILE)
+        with self._lock:
+            fail = self._random.random() < self.error_rate
+            malformed = self._random.random() < invalid_rate * (1 + 2 * temperature)
+            length = self._random.randint(40, 220)
+        prompt_tokens = sum(estimate_tokens(message['content']) for message in messages)
+        reply = json.dumps({
+            "response": "That is a good question! " + "Let me explain with an example. " * (length // 8),
+            "tips": "Say 'I went', not 'I goed'." if "goed" in messages[-1]['content'] else ""
+        })
+        if malformed:
+            reply = "Sure! " + reply.replace('"response"', 'response', 1)
+        # Coupure à max_tokens : le JSON reste ouvert
+        reply = reply[:max_tokens * 4]
+        completion_tokens = estimate_tokens(reply)
+        chunks = [reply[start:start + 16] for start in range(0, len(reply), 16)]
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                total_tokens=prompt_tokens + completion_tokens)
+        return self._stream(chunks, first_token, completion_tokens / tokens_per_second, fail, usage)
+
+    def _stream(self, chunks, first_token, generation, fail, usage):
+        time.sleep(first_token * self.time_scale)
+        if fail:
+            raise RuntimeError("injected API error")
+        pause = generation * self.time_scale / max(1, len(chunks))
+        for position, chunk in enumerate(chunks):
+            time.sleep(pause)
+            last = position == len(chunks) - 1
+            # Comme Groq : l'usage arrive avec le dernier morceau (x_groq)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))],
+                                  x_groq=SimpleNamespace(usage=usage) if last else None)
+
+
+class MeasuringCompletions:
+    def __init__(self, completions):
+        """
+        Wraps a completions endpoint and times each call of the current turn
+
+        Non-streamed calls from AIChatService are streamed underneath so the
+        first token can be timed; the service still gets a regular completion.
+        """
+        self.completions = completions
+        self._turn = threading.local()
+
+    def start_turn(self):
+        self._turn.calls = []
+        self._turn.started = time.perf_counter()
+
+    def turn_calls(self):
+        return self._turn.calls
+
+    def create(self, **kwargs):
+        call = {'ttft': None, 'prompt_tokens': 0, 'completion_tokens': 0, 'error': None}
+        self._turn.calls.append(call)
+        try:
+            stream = self.completions.create(**dict(kwargs, stream=True))
+            parts = []
+            usage = None
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if call['ttft'] is None:
+                        call['ttft'] = time.perf_counter() - self._turn.started
+                    parts.append(delta)
+                x_groq = getattr(chunk, 'x_groq', None)
+                usage = getattr(x_groq, 'usage', None) or getattr(chunk, 'usage', None) or usage
+        except Exception as e:
+            call['error'] = str(e)
+            raise
+        content = "".join(parts)
+        if usage is not None:
+            call['prompt_tokens'] = usage.prompt_tokens
+            call['completion_tokens'] = usage.completion_tokens
+        else:
+            call['prompt_tokens'] = sum(estimate_tokens(message['content']) for message in kwargs['messages'])
+            call['completion_tokens'] = estimate_tokens(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def load_corpus(path=None):
+    """
+    Conversations to replay
+
+    A corpus file is a JSON list of conversations; a conversation is either a
+    list of messages or {"level": ..., "messages": [...]}, and a message is a
+    {"sender", "message", "type"} dict (the chat's legacy format) or a plain
+    string for a learner turn.
+
+    Returns:
+        list: (level, list of ChatMessage)
+    """
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw_corpus = json.load(f)
+    else:
+        raw_corpus = RECORDED_CORPUS
+    corpus = []
+    for raw in raw_corpus:
+        if isinstance(raw, dict):
+            level, messages = raw.get('level', DEFAULT_LEVEL).lower(), raw.get('messages', [])
+        else:
+            level, messages = DEFAULT_LEVEL, raw
+        conversation = Conversation()
+        for message in messages:
+            if isinstance(message, str):
+                conversation.append(USER_SENDER, message)
+            else:
+                conversation.append(message.get('sender', USER_SENDER), message['message'], message.get('type'))
+        corpus.append((level, list(conversation)))
+    return corpus
+
+
+def replay_jobs(corpus):
+    """One job per learner turn: (system prompt, history, message)"""
+    jobs = []
+    for level, messages in corpus:
+        system_prompt = get_prompt('conversation', level)
+        for position, entry in enumerate(messages):
+            if entry.role is Role.USER:
+                jobs.append((system_prompt, messages[max(0, position - 10):position], entry.message))
+    return jobs
+
+
+def make_service(completions, model, temperature, max_tokens, cascade=False):
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = isolated_ai_service()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    service.model = model
+    service.temperature = temperature
+    service.max_tokens = max_tokens
+    # Sans cascade, chaque configuration mesure son modèle seul
+    service.router = ModelRouter(model, DEFAULT_STRONG_MODEL if cascade and model != DEFAULT_STRONG_MODEL else None)
+    service.hedger = None
+    service.memory = None
+    return service
+
+
+def replay_config(completions, jobs, model, temperature, max_tokens, concurrency=4, cascade=False):
+    """
+    Replay every turn under one configuration
+
+    Returns:
+        dict: Metrics of the configuration
+    """
+    measuring = MeasuringCompletions(completions)
+    service = make_service(measuring, model, temperature, max_tokens, cascade)
+
+    def replay_turn(job):
+        system_prompt, history, message = job
+        measuring.start_turn()
+        started = time.perf_counter()
+        raw = service.send_message(message, history, system_prompt=system_prompt)
+        latency = time.perf_counter() - started
+        calls = measuring.turn_calls()
+        answered = [call for call in calls if call['error'] is None]
+        return {
+            'latency': latency,
+            # Premier token de la réponse retenue (la dernière en cas d'escalade)
+            'ttft': answered[-1]['ttft'] if answered and answered[-1]['ttft'] is not None else latency,
+            'tokens': sum(call['prompt_tokens'] + call['completion_tokens'] for call in calls),
+            'completion_tokens': sum(call['completion_tokens'] for call in calls),
+            'valid': is_structured_reply(raw),
+            'fallback': bool(calls) and calls[-1]['error'] is not None,
+            'escalated': len(calls) > 1,
+        }
+
+    started = time.perf_counter()
+    # Les impressions de débogage du service sont coupées pendant le rejeu
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            turns = list(pool.map(replay_turn, jobs))
+    elapsed = time.perf_counter() - started
+
+    latencies = [turn['latency'] for turn in turns]
+    ttfts = [turn['ttft'] for turn in turns]
+    count = max(1, len(turns))
+    return {
+        'model': model,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+        'turns': len(turns),
+        'elapsed_s': round(elapsed, 3),
+        'ttft_ms': {'p50': round(percentile(ttfts, 0.50) * 1000, 1), 'p95': round(percentile(ttfts, 0.95) * 1000, 1)},
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 1),
+            'p95': round(percentile(latencies, 0.95) * 1000, 1),
+            'mean': round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        },
+        'tokens_per_turn': round(sum(turn['tokens'] for turn in turns) / count, 1),
+        'completion_tokens_per_turn': round(sum(turn['completion_tokens'] for turn in turns) / count, 1),
+        'json_valid_rate': round(sum(turn['valid'] for turn in turns) / count, 4),
+        'fallback_rate': round(sum(turn['fallback'] for turn in turns) / count, 4),
+        'escalation_rate': round(sum(turn['escalated'] for turn in turns) / count, 4),
+    }
+
+
+def pick_best(results, min_valid=MIN_VALID_RATE, max_fallback=MAX_FALLBACK_RATE):
+    """Fastest configuration (median latency, then TTFT) that meets the quality bar, or None"""
+    eligible = [result for result in results
+                if result['json_valid_rate'] >= min_valid and result['fallback_rate'] <= max_fallback]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: (result['latency_ms']['p50'], result['ttft_ms']['p50']))
+
+
+def run(models, temperatures, max_tokens_values, corpus_path=None, concurrency=4, repeat=1,
+        live=False, cascade=False, time_scale=1.0, error_rate=0.0, seed=1):
+    """
+    Replay the corpus under every configuration of the matrix, one configuration at a time
+
+    Returns:
+        list: Metrics per configuration
+    """
+    jobs = replay_jobs(load_corpus(corpus_path)) * repeat
+    if live:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = isolated_ai_service().client
+        if client is None:
+            raise RuntimeError("Groq client unavailable: set GROQ_API_KEY in .env to replay live")
+        completions = client.chat.completions
+
+    results = []
+    for model, temperature, max_tokens in itertools.product(models, temperatures, max_tokens_values):
+        if not live:
+            # Même graine pour chaque configuration : mêmes tirages d'erreurs et de longueurs
+            completions = SimulatedCompletions(time_scale, error_rate, seed)
+        results.append(replay_config(completions, jobs, model, temperature, max_tokens, concurrency, cascade))
+    return results
+
+
+def print_report(results, best, min_valid, max_fallback):
+    print(f"\n🔁 Replay of {results[0]['turns'] if results else 0} learner turns per configuration")
+    print(f"{'model':<26} {'temp':>5} {'max_tok':>7} {'TTFT p50':>9} {'TTFT p95':>9} {'lat p50':>8} "
+          f"{'lat p95':>8} {'tok/turn':>9} {'JSON ok':>8} {'fallback':>9} {'escal.':>7}")
+    for r in sorted(results, key=lambda result: result['latency_ms']['p50']):
+        marker = "  ⭐" if r is best else ""
+        print(f"{r['model']:<26} {r['temperature']:>5} {r['max_tokens']:>7} {r['ttft_ms']['p50']:>9} "
+              f"{r['ttft_ms']['p95']:>9} {r['latency_ms']['p50']:>8} {r['latency_ms']['p95']:>8} "
+              f"{r['tokens_per_turn']:>9} {r['json_valid_rate']:>8.1%} {r['fallback_rate']:>9.1%} "
+              f"{r['escalation_rate']:>7.1%}{marker}")
+    if best:
+        print(f"\n✅ Fastest configuration with JSON ok >= {min_valid:.0%} and fallback <= {max_fallback:.0%}:")
+        print(f"   GROQ_MODEL={best['model']}\n   TEMPERATURE={best['temperature']}\n   MAX_TOKENS={best['max_tokens']}")
+    else:
+        print(f"\n❌ No configuration reaches JSON ok >= {min_valid:.0%} with fallback <= {max_fallback:.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded conversations under a matrix of configurations")
+    parser.add_argument('--models', nargs='+', default=[DEFAULT_FAST_MODEL, DEFAULT_STRONG_MODEL])
+    parser.add_argument('--temperatures', type=float, nargs='+', default=[0.3, 0.7])
+    parser.add_argument('--max-tokens', type=int, nargs='+', default=[150, 300, 500])
+    parser.add_argument('--corpus', help="JSON file of recorded conversations (built-in sample by default)")
+    parser.add_argument('--repeat', type=int, default=1, help="Replay the corpus this many times per configuration")
+    parser.add_argument('--concurrency', type=int, default=4, help="Turns replayed at the same time")
+    parser.add_argument('--cascade', action='store_true', help="Escalate invalid replies to the strong model")
+    parser.add_argument('--live', action='store_true', help="Call the Groq API instead of the simulator")
+    parser.add_argument('--time-scale', type=float, default=0.2,
+                        help="Simulator only: multiply the simulated delays by this factor")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Simulator only: fraction of failed calls")
+    parser.add_argument('--min-valid', type=float, default=MIN_VALID_RATE, help="Required JSON validity rate")
+    parser.add_argument('--max-fallback', type=float, default=MAX_FALLBACK_RATE, help="Allowed fallback rate")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.models, args.temperatures, args.max_tokens, args.corpus, args.concurrency,
+                  args.repeat, args.live, args.cascade, args.time_scale, args.error_rate, args.seed)
+    best = pick_best(results, args.min_valid, args.max_fallback)
+    print_report(results, best, args.min_valid, args.max_fallback)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results, 'best': best}, f, indent=4)
+    return 0 if best else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,13 @@ Learn with AI - Application pour apprendre l'anglais
 import toga
 from toga.style.pack import COLUMN, ROW
 from .views.home_view import HomeView
+from .views.router import ViewRouter
 from .services.ai_service import AIChatService
 from .services.audio_service import AudioService
+from .services.review_scheduler import ReviewScheduler
+from .services.exercise_prefetch import ExerciseStore, ExercisePrefetcher
+from .services.profiling import configure_from_environment, profiler
+from .services.task_executor import default_executor
 
 
 class LearnwithAI(toga.App):
@@ -15,24 +20,81 @@ class LearnwithAI(toga.App):
 
         Initialize the app with the home view containing navigation options.
         """
+        # Blocking work (network, audio, file I/O) runs on the shared executor;
+        # completion callbacks come back on the UI loop
+        self.executor = default_executor()
+        self.executor.bind_loop(self.loop)
+        
         # Initialize services (shared across all views)
         self.ai_service = AIChatService()
         self.audio_service = AudioService()
         
-        # Create the home view
-        home_view = HomeView(self)
-        main_box = home_view.create_view()
-
-        # Create and show the main window
+        # Opt-in profiling (LEARNWITHAI_PROFILE or the 'profiling' setting)
+        configure_from_environment(self.ai_service.settings)
+        
+        # Review cards are loaded and today's queue is built in the background
+        self.review_scheduler = ReviewScheduler()
+        self.review_scheduler.load_in_background(self.executor)
+        
+        # Exercises of the next lessons are generated while the chat is idle,
+        # once the store has been read in the background
+        self.exercise_store = ExerciseStore()
+        self.exercise_prefetcher = ExercisePrefetcher(
+            self.ai_service.generate_exercises,
+            self.exercise_store,
+            wait_until_idle=self.ai_service.wait_until_idle,
+            executor=self.executor
+        )
+        self.exercise_store.load_in_background(self.executor, on_done=self.exercise_prefetcher.start)
+        
+        # Create the main window
         self.main_window = toga.MainWindow(title=self.formal_name)
-        self.main_window.content = main_box
+        
+        # Views are built lazily on first navigation and then kept alive
+        self.router = ViewRouter(self)
+        self.router.register('home', HomeView)
+        self.router.register('courses', self._create_courses_view, evict_on_hide=True)
+        self.router.register('chat', self._create_ai_chat_view)
+        self.router.register('settings', self._create_settings_view)
+        
+        # Show the home view
+        self.router.show('home')
         self.main_window.show()
     
+    def _create_courses_view(self, app):
+        from .views.courses_view import CoursesView
+        return CoursesView(app)
+    
+    def _create_ai_chat_view(self, app):
+        from .views.ai_chat_view import AIChatView
+        return AIChatView(app)
+    
+    def _create_settings_view(self, app):
+        from .views.settings_view import SettingsView
+        return SettingsView(app)
+    
     def on_exit(self):
         """Clean up resources when the app exits"""
         try:
             if hasattr(self, 'audio_service'):
                 self.audio_service.cleanup()
+            if hasattr(self, 'review_scheduler') and self.review_scheduler.dirty:
+                self.review_scheduler.save()
+            if hasattr(self, 'ai_service') and self.ai_service.error_profile.dirty:
+                self.ai_service.error_profile.save()
+            if hasattr(self, 'router') and self.router.is_built('chat'):
+                # Session en cours : la mémoriser avant de quitter (sur ce thread, l'exécuteur s'arrête)
+                self.ai_service.remember_session(self.router.get_view('chat').take_new_messages())
+            if hasattr(self, 'exercise_prefetcher'):
+                self.exercise_prefetcher.stop()
+                if self.exercise_store.dirty:
+                    self.exercise_store.save()
+            if hasattr(self, 'ai_service') and self.ai_service.hedger:
+                self.ai_service.hedger.shutdown()
+            if hasattr(self, 'executor'):
+                print(f"🧵 Background tasks: {self.executor.stats()['lanes']}")
+                self.executor.shutdown()
+            profiler.shutdown()
         except Exception as e:
             print(f"Error during cleanup: {e}")
         
@@ -109,6 +109,55 @@ Guidelines:
 - Do not include any text outside the JSON object.
 """
 
+# Prompt de génération d'exercices pour les cours (tous les exercices en une requête)
+EXERCISE_GENERATOR = """
+{level}
+You are an English teacher writing practice exercises for a lesson.
+Lesson: {title}
+Key phrases: {phrases}
+
+Write exactly {count} exercises based on this lesson, in this order:
+{slots}
+Always reply in valid JSON format with the following structure:
+{{
+"exercises": [
+{{"type": "<fill_blank, translation or qa>", "question": "<The exercise shown to the student>", "answer": "<The expected answer>"}}
+]
+}}
+
+Guidelines:
+- Match the difficulty to the student's level.
+- Every exercise must be different.
+- Do not include any text outside the JSON object.
+"""
+
+# Mode parallèle : la réponse et la correction sont demandées séparément
+REPLY_ONLY_ADDENDUM = """
+Corrections are handled separately in this conversation: always leave 'tips' as an empty string ("")
+and keep your reply short and conversational.
+"""
+
+CORRECTION = """
+{level}
+You are an English teacher reviewing a single message written by a student.
+Always reply in valid JSON format with the following structure:
+{{
+"tips": "<A short correction and explanation of the student's mistakes, otherwise an empty string>"
+}}
+
+Guidelines:
+- Only look at grammar, vocabulary and phrasing; do not answer the message itself.
+- If there are no mistakes, keep 'tips' as an empty string ("").
+- Do not include any text outside the JSON object.
+"""
+
+# Types d'exercices générés pour les cours
+EXERCISE_KINDS = {
+    "fill_blank": "fill-in-the-blank (use ___ for the blank in the question)",
+    "translation": "French-to-English translation",
+    "qa": "short question-and-answer comprehension",
+}
+
 # Dictionnaire des prompts disponibles
 AVAILABLE_PROMPTS = {
     "default": DEFAULT_ENGLISH_TEACHER,
@@ -130,6 +179,20 @@ def get_prompt(prompt_type: str = "default", level: str = "beginner") -> str:
     Returns:
         str: Le prompt système correspondant
     """
+    # Get the prompt template and format it with the level context
+    prompt_template = AVAILABLE_PROMPTS.get(prompt_type.lower(), DEFAULT_ENGLISH_TEACHER)
+    return prompt_template.format(level=get_level_context(level))
+
+def get_level_context(level: str = "beginner") -> str:
+    """
+    Retourne la consigne adaptée au niveau de l'élève
+    
+    Args:
+        level (str): Niveau d'anglais (beginner, intermediate, advanced)
+    
+    Returns:
+        str: Consigne de niveau insérée en tête des prompts
+    """
     beginner = """You are a patient English teacher for beginners. 
         Use simple words, speak slowly in your responses, correct mistakes very gently, 
         and always encourage students. Explain grammar rules in simple terms with easy examples."""
@@ -150,10 +213,45 @@ def get_prompt(prompt_type: str = "default", level: str = "beginner") -> str:
         context = advanced
     else:
         context = beginner  # Default to beginner if unknown level
+    return context
 
-    # Get the prompt template and format it with the level context
-    prompt_template = AVAILABLE_PROMPTS.get(prompt_type.lower(), DEFAULT_ENGLISH_TEACHER)
-    return prompt_template.format(level=context)
+def get_correction_prompt(level: str = "beginner") -> str:
+    """
+    Construit le prompt de correction seule (mode parallèle)
+    
+    Args:
+        level (str): Niveau d'anglais
+    
+    Returns:
+        str: Le prompt système correspondant
+    """
+    return CORRECTION.format(level=get_level_context(level))
+
+def get_exercise_prompt(lesson: dict, kinds: list, level: str = "beginner") -> str:
+    """
+    Construit le prompt de génération d'une série d'exercices pour une leçon
+    
+    Args:
+        lesson (dict): Leçon (titre et phrases clés)
+        kinds (list): Type de chaque exercice demandé, dans l'ordre (voir EXERCISE_KINDS)
+        level (str): Niveau d'anglais
+    
+    Returns:
+        str: Le prompt système correspondant
+    """
+    phrases = []
+    for phrase in lesson.get("phrases", []):
+        phrases.append(phrase.get("en", "") if isinstance(phrase, dict) else str(phrase))
+    slots = "\n".join(
+        f"{number}. {kind}: {EXERCISE_KINDS.get(kind, kind)}" for number, kind in enumerate(kinds, 1)
+    )
+    return EXERCISE_GENERATOR.format(
+        level=get_level_context(level),
+        title=lesson.get("title", ""),
+        phrases="; ".join(p for p in phrases if p) or "(none)",
+        count=len(kinds),
+        slots=slots
+    )
 
 def get_available_prompt_types() -> list:
     """
@@ -5,6 +5,8 @@ Handles communication with Groq AI API for language learning
 
 import os
 import json
+import time
+import threading
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
@@ -16,26 +18,76 @@ except ImportError:
     print("Groq not available. Install with: pip install groq")
 
 # Import prompts system
-from ..prompts.teaching_prompts import get_prompt, get_available_prompt_types
+from ..prompts.teaching_prompts import (get_prompt, get_available_prompt_types, get_exercise_prompt,
+                                       get_correction_prompt, REPLY_ONLY_ADDENDUM)
+from .conversation import ChatMessage, api_role
+from .error_profile import ErrorProfile
+from .learner_memory import NUMPY_AVAILABLE, TOKEN_BUDGET, LearnerMemory
+from .exercise_generation import plan_slots, split_exercises
+from .profiling import profiled
+from .model_router import DEFAULT_FAST_MODEL, DEFAULT_STRONG_MODEL, ROUTE_ESCALATED, ModelRouter
+from .response_parser import is_structured_reply, parse_tips
+from .hedging import Cancellation, HedgedCompleter
+from .task_executor import LANE_INTERACTIVE, Task, default_executor
+from .transcription import (DEFAULT_WHISPER_MODEL, DEFAULT_WORKERS, GroqWhisperBackend, SegmentedTranscriber,
+                            TranscriptionFailed)
+
+# Nouvelles tentatives pour les exercices invalides, et tokens prévus par exercice
+EXERCISE_RETRIES = 2
+EXERCISE_TOKENS = 120
 
 # Load environment variables
 load_dotenv()
 
 class AIChatService:
-    def __init__(self, prompt_type: str = "default"):
-        """Initialize the AI chat service with Groq API"""
+    def __init__(self, prompt_type: str = "default", memory_file: Optional[str] = None,
+                 error_profile_file: Optional[str] = None):
+        """Initialize the AI chat service with Groq API
+        
+        Args:
+            prompt_type (str): Prompt used when PROMPT_TYPE is not set
+            memory_file (str): Learner memory store (defaults to LEARNER_MEMORY_FILE, then resources/)
+            error_profile_file (str): Error profile store (defaults to ERROR_PROFILE_FILE, then resources/)
+        """
         # Load configuration
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+        self.model = os.getenv("GROQ_MODEL", DEFAULT_FAST_MODEL)
         self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("MAX_TOKENS", "500"))
         
+        # Cascade (opt-in, MODEL_ROUTING=cascade): fast model first, strong model for hard turns
+        strong_model = None
+        if os.getenv("MODEL_ROUTING", "off").lower() == "cascade":
+            strong_model = os.getenv("GROQ_STRONG_MODEL", DEFAULT_STRONG_MODEL)
+        self.router = ModelRouter(self.model, strong_model)
+        
+        # Hedging (HEDGING=on): a late request is duplicated on GROQ_HEDGE_MODEL / GROQ_HEDGE_API_KEY
+        self.hedger = HedgedCompleter() if os.getenv("HEDGING", "off").lower() == "on" else None
+        self.hedge_model = os.getenv("GROQ_HEDGE_MODEL")
+        self.hedge_client = None
+        
         # Load prompt type from environment or use parameter
         self.prompt_type = os.getenv("PROMPT_TYPE", prompt_type)
         
         # Load user settings if available
         self.settings = self.load_user_settings()
         
+        # Parallel mode (PARALLEL_CORRECTIONS=on or the setting): reply and correction as two requests
+        self.parallel_corrections = (
+            os.getenv("PARALLEL_CORRECTIONS", "off").lower() == "on"
+            or bool(self.settings.get('parallel_corrections', False))
+        )
+        
+        # Learner weaknesses learned from the tips, appended to the system prompt
+        self.error_profile = ErrorProfile(error_profile_file or os.getenv("ERROR_PROFILE_FILE"))
+        self._prompt_cache = (None, None)  # ((base prompt, addendum), full prompt)
+        
+        # Memories of past sessions retrieved for each message (LEARNER_MEMORY=off to disable)
+        self.memory = None
+        if os.getenv("LEARNER_MEMORY", "on").lower() != "off" and NUMPY_AVAILABLE:
+            self.memory = LearnerMemory(memory_file or os.getenv("LEARNER_MEMORY_FILE"))
+        self.memory_token_budget = int(os.getenv("MEMORY_TOKEN_BUDGET", str(TOKEN_BUDGET)))
+        
         # Adjust prompt type based on settings and get system prompt
         self.apply_settings_to_prompt()
         
@@ -44,6 +96,13 @@ class AIChatService:
         print(f"� Level: {self.settings.get('level', 'Beginner')}")
         print(f"📝 System prompt activated")
         
+        # Interactive requests in flight; background work waits until they are done
+        self._activity_lock = threading.Lock()
+        self._interactive_requests = 0
+        self._last_interactive = 0.0
+        self.idle = threading.Event()
+        self.idle.set()
+        
         # Initialize Groq client
         self.client = None
         self._initialize_groq()
@@ -63,6 +122,10 @@ class AIChatService:
             self.client = Groq(api_key=self.api_key)
             print(f"✅ Groq AI initialized successfully with model: {self.model}")
             
+            hedge_key = os.getenv("GROQ_HEDGE_API_KEY")
+            if self.hedger and hedge_key:
+                self.hedge_client = Groq(api_key=hedge_key)
+            
         except Exception as e:
             print(f"❌ Error initializing Groq: {e}")
             self.client = None
@@ -146,6 +209,57 @@ class AIChatService:
         print(f"🔄 Settings refreshed - Level: {self.settings.get('level', 'Beginner')}, Focus: {self.settings.get('focus', 'Conversation')}")
         print(f"📝 System prompt updated")
     
+    def get_system_prompt(self) -> str:
+        """
+        System prompt including the learner's error profile
+        
+        The combined string is cached and only rebuilt when the base prompt or
+        the profile addendum changes.
+        """
+        base_prompt = self.system_prompt
+        addendum = self.error_profile.prompt_addendum()
+        key = (base_prompt, addendum)
+        # Clé et valeur remplacées ensemble : un autre thread ne voit jamais un mélange
+        cached_key, cached_prompt = self._prompt_cache
+        if key != cached_key:
+            cached_prompt = base_prompt + addendum
+            self._prompt_cache = (key, cached_prompt)
+        return cached_prompt
+    
+    def record_tips(self, tips: str) -> List[str]:
+        """
+        Update the learner's error profile with a correction from the model
+        
+        Returns:
+            list: Error categories found in the tips
+        """
+        return self.error_profile.record(tips)
+    
+    def recall(self, message: str) -> str:
+        """Memories relevant to a message, as a prompt addendum within the token budget"""
+        if self.memory is None or not len(self.memory):
+            return ""
+        return self.memory.prompt_addendum(message, token_budget=self.memory_token_budget)
+    
+    def remember_session(self, messages) -> int:
+        """
+        Store the facts, corrections and summary of a finished session
+        
+        Args:
+            messages: ChatMessage objects of the session
+            
+        Returns:
+            int: Number of new memories
+        """
+        if self.memory is None:
+            return 0
+        added = self.memory.remember_session(messages)
+        if self.memory.dirty:
+            self.memory.save()
+        if added:
+            print(f"🧠 Remembered {added} new item(s) about the learner ({len(self.memory)} in total)")
+        return added
+    
     def get_current_prompt_info(self) -> Dict[str, str]:
         """
         Retourne les informations sur le prompt actuel
@@ -178,13 +292,17 @@ class AIChatService:
             for prompt_type in available_types
         ]
         
-    def send_message(self, message: str, conversation_history: Optional[List[Dict]] = None) -> str:
+    @profiled('ai.send_message')
+    def send_message(self, message: str, conversation_history: Optional[List[Dict]] = None,
+                     system_prompt: Optional[str] = None) -> str:
         """
         Send message to Groq AI and get response
         
         Args:
             message (str): User's message
-            conversation_history (list): Previous conversation context
+            conversation_history (list): Previous conversation context (ChatMessage or legacy dicts)
+            system_prompt (str): Prompt for this conversation only, used as is (defaults to
+                                 the shared one built from the settings, plus relevant memories)
             
         Returns:
             str: AI response
@@ -192,46 +310,254 @@ class AIChatService:
         if not self.client:
             return self._fallback_response(message)
         
+        self._begin_interactive()
         try:
             # Print system prompt to terminal for debugging
             print("\n" + "="*50)
             print("🔍 CURRENT SYSTEM PROMPT:")
             print("-"*50)
-            print(self.system_prompt)
+            if system_prompt is None:
+                system_prompt = self.get_system_prompt() + self.recall(message)
+            print(system_prompt)
             print("="*50 + "\n")
             
             # Build conversation context in Groq format
-            messages = [{"role": "system", "content": self.system_prompt}]
+            messages = [{"role": "system", "content": system_prompt}]
             
-            # Add conversation history (exclude tips and keep only actual conversation)
+            # Add conversation history (only learner and assistant turns, tips excluded)
             if conversation_history:
                 for hist_msg in conversation_history[-10:]:  # Keep last 10 messages for context
-                    # Skip tip messages to avoid polluting the conversation context
-                    if hist_msg.get('type') == 'tip':
-                        continue
-                    
-                    if hist_msg['sender'] == 'Vous':
-                        messages.append({"role": "user", "content": hist_msg['message']})
-                    elif hist_msg['sender'] == 'AI Assistant':
-                        messages.append({"role": "assistant", "content": hist_msg['message']})
+                    role = api_role(hist_msg)
+                    if role:
+                        content = hist_msg.message if isinstance(hist_msg, ChatMessage) else hist_msg['message']
+                        messages.append({"role": role, "content": content})
             
             # Add current message
             messages.append({"role": "user", "content": message})
             
-            # Get response from Groq
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                stream=False
-            )
+            # Sans cascade : un seul modèle, ni validation ni statistiques de routage
+            if not self.router.enabled:
+                return self._complete(self.router.fast_model, messages)
+            
+            # Route the turn: fast model unless the learner or the message needs the strong one
+            level = self.settings.get('level', 'Beginner')
+            model, route = self.router.choose(message, level)
+            started = time.perf_counter()
+            content = self._complete(model, messages)
             
-            return completion.choices[0].message.content
+            escalated = self.router.should_escalate(model, is_structured_reply(content))
+            if escalated:
+                print(f"⬆️ Reply from {model} failed validation, escalating to {self.router.strong_model}")
+                content = self._complete(self.router.strong_model, messages)
+                route = ROUTE_ESCALATED
+            self.router.record(route, time.perf_counter() - started, escalated)
+            
+            return content
             
         except Exception as e:
             print(f"Error getting Groq AI response: {e}")
             return self._fallback_response(message)
+        finally:
+            self._end_interactive()
+    
+    def send_message_parallel(self, message: str, conversation_history: Optional[List[Dict]] = None,
+                              on_reply=None, on_tips=None, on_error=None, executor=None) -> List[Task]:
+        """
+        Ask for the conversational reply and the correction as two concurrent requests
+        
+        The reply request is told to leave 'tips' empty so it stays short; the
+        correction only analyses the learner's message. Both run on the
+        executor's interactive lane and each callback is delivered (on the UI
+        loop when the executor is bound to it) as soon as its result arrives.
+        
+        Args:
+            message (str): User's message
+            conversation_history (list): Previous conversation context
+            on_reply: Called with the raw reply (same format as send_message)
+            on_tips: Called with the correction text ("" when there is nothing to correct)
+            on_error: Called with the exception if a request could not run
+            executor: TaskExecutor to use (defaults to the shared one)
+            
+        Returns:
+            list: The reply task and the correction task
+        
+        Raises:
+            QueueFull: Too many interactive requests are already pending
+        """
+        executor = executor or default_executor()
+        # Prompt de base figé à l'envoi ; la recherche en mémoire se fait sur la voie interactive
+        reply_task = executor.submit(
+            self._send_reply_only, self.get_system_prompt(), message, conversation_history,
+            lane=LANE_INTERACTIVE, name='chat.reply', on_done=on_reply, on_error=on_error
+        )
+        tips_task = executor.submit(self.correct_message, message, lane=LANE_INTERACTIVE,
+                                    name='chat.correction', on_done=on_tips, on_error=on_error)
+        return [reply_task, tips_task]
+    
+    def _send_reply_only(self, base_prompt: str, message: str, conversation_history=None) -> str:
+        """Reply half of send_message_parallel (worker thread: memory recall included)"""
+        reply_prompt = base_prompt + self.recall(message) + REPLY_ONLY_ADDENDUM
+        return self.send_message(message, conversation_history, system_prompt=reply_prompt)
+    
+    def correct_message(self, message: str) -> str:
+        """
+        Correction of the learner's message alone (parallel mode)
+        
+        Returns:
+            str: Tips, or "" when there is nothing to correct or the request failed
+        """
+        if not self.client:
+            return ""
+        
+        level = self.settings.get('level', 'Beginner').lower()
+        messages = [
+            {"role": "system", "content": get_correction_prompt(level)},
+            {"role": "user", "content": message}
+        ]
+        self._begin_interactive()
+        try:
+            # La correction est courte : le modèle rapide suffit
+            content = self._complete(self.router.fast_model, messages)
+            return parse_tips(content)
+        except Exception as e:
+            print(f"Error getting correction: {e}")
+            return ""
+        finally:
+            self._end_interactive()
+    
+    def _complete(self, model: str, messages: List[Dict]) -> str:
+        """One chat completion on the given model (hedged when hedging is on)"""
+        if self.hedger:
+            hedge_client = self.hedge_client or self.client
+            hedge_model = self.hedge_model or model
+            return self.hedger.complete(
+                lambda cancel, on_first_token: self._stream(self.client, model, messages, cancel, on_first_token),
+                lambda cancel, on_first_token: self._stream(hedge_client, hedge_model, messages, cancel, on_first_token)
+            )
+        
+        completion = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=False
+        )
+        return completion.choices[0].message.content
+    
+    def _stream(self, client, model: str, messages: List[Dict], cancel: Cancellation, on_first_token) -> str:
+        """Streamed completion, closed as soon as `cancel` is set (even before its first token)"""
+        if cancel.is_set():
+            return ""
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        # Fermer la connexion de la requête perdante, même si elle attend encore son premier token
+        close = getattr(stream, 'close', None)
+        if close:
+            cancel.on_cancel(close)
+        parts = []
+        for chunk in stream:
+            if cancel.is_set():
+                break
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if not parts:
+                    on_first_token()
+                parts.append(delta)
+        return "".join(parts)
+    
+    def _begin_interactive(self):
+        with self._activity_lock:
+            self._interactive_requests += 1
+            self.idle.clear()
+    
+    def _end_interactive(self):
+        with self._activity_lock:
+            self._interactive_requests -= 1
+            self._last_interactive = time.time()
+            if self._interactive_requests == 0:
+                self.idle.set()
+    
+    def wait_until_idle(self, quiet_period: float = 2.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no interactive request has run for `quiet_period` seconds
+        
+        Used by background work (prefetching) so it never competes with the chat.
+        
+        Returns:
+            bool: True when idle, False on timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            if not self.idle.wait(remaining):
+                return False
+            quiet_for = time.time() - self._last_interactive
+            if quiet_for >= quiet_period and self.idle.is_set():
+                return True
+            delay = quiet_period - quiet_for
+            if deadline is not None:
+                if time.time() + delay > deadline:
+                    return False
+            time.sleep(max(delay, 0.01))
+    
+    def generate_exercises(self, lesson: Dict, count: int = 3, kinds: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Generate several exercises for a lesson in one completion
+        
+        The reply is validated and split into items; only the slots whose item
+        is missing or invalid are requested again (at most EXERCISE_RETRIES times).
+        
+        Args:
+            lesson (dict): Lesson with 'title' and 'phrases'
+            count (int): Number of exercises
+            kinds (list): Kinds to cycle through ('fill_blank', 'translation', 'qa')
+            
+        Returns:
+            list: Valid exercises ('type', 'question', 'answer'), in slot order
+        """
+        if not self.client:
+            return []
+        
+        slots = plan_slots(count, kinds)
+        results = [None] * len(slots)
+        pending = list(range(len(slots)))
+        seen = set()
+        level = self.settings.get('level', 'Beginner').lower()
+        
+        for _ in range(1 + EXERCISE_RETRIES):
+            requested = [slots[index] for index in pending]
+            try:
+                completion = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": get_exercise_prompt(lesson, requested, level)},
+                        {"role": "user", "content": "Write the exercises."}
+                    ],
+                    temperature=self.temperature,
+                    # Le budget de tokens grandit avec le nombre d'exercices demandés
+                    max_tokens=max(self.max_tokens, EXERCISE_TOKENS * len(requested)),
+                    stream=False
+                )
+                content = completion.choices[0].message.content
+            except Exception as e:
+                print(f"Error generating exercises: {e}")
+                break
+            
+            items, failed = split_exercises(content, requested, seen)
+            for position, item in enumerate(items):
+                if item is not None:
+                    results[pending[position]] = item
+            pending = [pending[position] for position in failed]
+            if not pending:
+                break
+            print(f"🔁 {len(pending)} exercise(s) failed validation, requesting them again")
+        
+        return [item for item in results if item is not None]
     
     def _fallback_response(self, message: str) -> str:
         """Fallback response when AI service is not available"""
@@ -244,18 +570,50 @@ class AIChatService:
         import random
         return random.choice(responses)
     
-    def process_audio_to_text(self, audio_file_path):
+    def get_transcriber(self, backend=None) -> Optional[SegmentedTranscriber]:
+        """
+        Transcriber for recordings (Groq Whisper unless another backend is given)
+        
+        Long recordings are split at pauses and the segments are transcribed
+        concurrently by TRANSCRIPTION_WORKERS requests at most.
+        """
+        if backend is None:
+            if not self.client:
+                return None
+            backend = GroqWhisperBackend(self.client, os.getenv("GROQ_WHISPER_MODEL", DEFAULT_WHISPER_MODEL))
+        workers = int(os.getenv("TRANSCRIPTION_WORKERS", str(DEFAULT_WORKERS)))
+        return SegmentedTranscriber(backend, workers=workers)
+    
+    @profiled('ai.transcribe')
+    def process_audio_to_text(self, audio_file_path, backend=None):
         """
         Convert audio to text using speech recognition
         
         Args:
             audio_file_path (str): Path to audio file
+            backend: Transcription backend (defaults to Groq Whisper)
             
         Returns:
-            str: Transcribed text
+            str: Transcribed text ("" when transcription is not available or failed,
+                including when only part of the recording could be transcribed)
         """
-        # TODO: Implement speech-to-text (Whisper API, Google Speech, etc.)
-        return "Audio transcription will be implemented here"
+        transcriber = self.get_transcriber(backend)
+        if transcriber is None:
+            print("❌ Transcription not available: Groq client not initialized")
+            return ""
+        
+        try:
+            text = transcriber.transcribe_file(audio_file_path)
+            stats = transcriber.last_stats
+            print(f"📝 Transcribed {stats['audio_seconds']}s of audio in {stats['segments']} segment(s) "
+                  f"({stats['wall_seconds']}s)")
+            return text
+        except TranscriptionFailed as e:
+            print(f"❌ Incomplete transcription of {audio_file_path}: {e}")
+            return ""
+        except Exception as e:
+            print(f"❌ Error transcribing {audio_file_path}: {e}")
+            return ""
     
     def text_to_speech(self, text, output_path):
         """
@@ -0,0 +1,247 @@
+"""
+Audio I/O backends for LearnwithAI
+AudioService talks to a PyAudio-compatible object. Besides PyAudio itself, a
+virtual device replays WAV files as microphone input (in real time or faster)
+and discards or captures output, so capture and playback run headless.
+"""
+
+import os
+import time
+import wave
+import threading
+from typing import Callable, List, Optional
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+# Constantes de format PortAudio (mêmes valeurs que pyaudio.paInt16, etc.)
+PA_FLOAT32 = 1
+PA_INT32 = 2
+PA_INT24 = 4
+PA_INT16 = 8
+PA_INT8 = 16
+PA_UINT8 = 32
+
+SAMPLE_SIZES = {PA_FLOAT32: 4, PA_INT32: 4, PA_INT24: 3, PA_INT16: 2, PA_INT8: 1, PA_UINT8: 1}
+FORMATS_BY_WIDTH = {1: PA_UINT8, 2: PA_INT16, 3: PA_INT24, 4: PA_FLOAT32}
+
+VIRTUAL_HOST_API = 'Virtual'
+VIRTUAL_INPUT_NAME = 'Virtual WAV input'
+VIRTUAL_OUTPUT_NAME = 'Virtual output'
+
+
+class VirtualStream:
+    def __init__(self, device, rate: int, channels: int, sample_width: int,
+                 is_input: bool, frames_per_buffer: int):
+        """Stream opened on a VirtualAudio device"""
+        self.device = device
+        self.rate = rate
+        self.channels = channels
+        self.frame_size = sample_width * channels
+        self.is_input = is_input
+        self.frames_per_buffer = frames_per_buffer
+        self.frames_processed = 0
+        self.active = True
+        self._started_at = time.perf_counter()
+
+    def _pace(self, frames: int):
+        """Sleep so frames flow at `speed` times real time (speed 0 = no pacing)"""
+        self.frames_processed += frames
+        if self.device.speed <= 0:
+            return
+        due = self._started_at + self.frames_processed / float(self.rate) / self.device.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        """Return the next num_frames of the replayed WAV input"""
+        if not self.is_input:
+            raise IOError("Not an input stream")
+        data = self.device.next_input_frames(num_frames, self.frame_size)
+        self._pace(num_frames)
+        return data
+
+    def write(self, data: bytes, num_frames: Optional[int] = None, exception_on_underflow: bool = False):
+        """Consume output frames (discarded, or captured if the device asks for it)"""
+        if self.is_input:
+            raise IOError("Not an output stream")
+        self.device.capture_output(data)
+        self._pace(num_frames if num_frames is not None else len(data) // self.frame_size)
+
+    def get_read_available(self) -> int:
+        return self.frames_per_buffer
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+
+    def start_stream(self):
+        self.active = True
+        self._started_at = time.perf_counter()
+        self.frames_processed = 0
+
+    def close(self):
+        self.active = False
+
+
+class VirtualAudio:
+    def __init__(self, input_files: Optional[List[str]] = None, speed: float = 1.0,
+                 loop: bool = True, capture_output: bool = False, open_latency: float = 0.0):
+        """
+        PyAudio-compatible virtual device
+
+        Args:
+            input_files (list): WAV files replayed as microphone input, in order.
+                                They must share the same sample rate, width and channels.
+            speed (float): 1.0 = real time, 10.0 = ten times faster, 0 = as fast as possible
+            loop (bool): Restart from the first file when the input runs out
+                         (otherwise silence is returned)
+            capture_output (bool): Keep played audio in `captured_output` instead of discarding it
+            open_latency (float): Simulated delay of opening a stream, in seconds
+        """
+        self.input_files = list(input_files or [])
+        self.speed = speed
+        self.loop = loop
+        self.keep_output = capture_output
+        self.open_latency = open_latency
+        self.captured_output = bytearray()
+        self.output_bytes = 0
+        self._lock = threading.Lock()
+
+        self.rate, self.channels, self.sample_width = 16000, 1, 2
+        self._input_data = b''
+        if self.input_files:
+            self._load_inputs()
+        self._input_pos = 0
+
+    def _load_inputs(self):
+        chunks = []
+        for i, path in enumerate(self.input_files):
+            with wave.open(path, 'rb') as wf:
+                params = (wf.getframerate(), wf.getnchannels(), wf.getsampwidth())
+                if i == 0:
+                    self.rate, self.channels, self.sample_width = params
+                elif params != (self.rate, self.channels, self.sample_width):
+                    raise ValueError(f"{os.path.basename(path)} does not match the format of the first input file")
+                chunks.append(wf.readframes(wf.getnframes()))
+        self._input_data = b''.join(chunks)
+
+    def next_input_frames(self, num_frames: int, frame_size: int) -> bytes:
+        """Next block of input, looping or padding with silence at the end"""
+        wanted = num_frames * frame_size
+        with self._lock:
+            data = self._input_data
+            if not data:
+                return b'\x00' * wanted
+            out = bytearray()
+            while len(out) < wanted:
+                if self._input_pos >= len(data):
+                    if not self.loop:
+                        out.extend(b'\x00' * (wanted - len(out)))
+                        break
+                    self._input_pos = 0
+                take = min(wanted - len(out), len(data) - self._input_pos)
+                out.extend(data[self._input_pos:self._input_pos + take])
+                self._input_pos += take
+            return bytes(out)
+
+    def capture_output(self, data: bytes):
+        with self._lock:
+            self.output_bytes += len(data)
+            if self.keep_output:
+                self.captured_output.extend(data)
+
+    def rewind(self):
+        """Restart the input from the beginning"""
+        with self._lock:
+            self._input_pos = 0
+
+    # --- PyAudio interface ---
+
+    def _device_info(self, index: int):
+        if index == 0:
+            return {'index': 0, 'name': VIRTUAL_INPUT_NAME, 'hostApi': 0,
+                    'maxInputChannels': self.channels, 'maxOutputChannels': 0,
+                    'defaultSampleRate': float(self.rate)}
+        if index == 1:
+            return {'index': 1, 'name': VIRTUAL_OUTPUT_NAME, 'hostApi': 0,
+                    'maxInputChannels': 0, 'maxOutputChannels': 2,
+                    'defaultSampleRate': float(self.rate)}
+        raise IOError("Invalid device index")
+
+    def get_device_count(self) -> int:
+        return 2
+
+    def get_device_info_by_index(self, index: int):
+        return self._device_info(index)
+
+    def get_default_input_device_info(self):
+        return self._device_info(0)
+
+    def get_default_output_device_info(self):
+        return self._device_info(1)
+
+    def get_host_api_info_by_index(self, index: int):
+        return {'index': 0, 'name': VIRTUAL_HOST_API, 'deviceCount': 2}
+
+    def get_device_info_by_host_api_device_index(self, host_api_index: int, host_api_device_index: int):
+        return self._device_info(host_api_device_index)
+
+    def is_format_supported(self, rate, input_device=None, input_channels=None, input_format=None,
+                            output_device=None, output_channels=None, output_format=None):
+        if input_device is not None:
+            if (rate != self.rate or input_channels > self.channels
+                    or SAMPLE_SIZES.get(input_format) != self.sample_width):
+                raise ValueError("Invalid sample rate")
+        return True
+
+    def get_sample_size(self, format) -> int:
+        return SAMPLE_SIZES[format]
+
+    def get_format_from_width(self, width: int, unsigned: bool = True) -> int:
+        return FORMATS_BY_WIDTH[width]
+
+    def open(self, rate, channels, format, input=False, output=False, input_device_index=None,
+             output_device_index=None, frames_per_buffer=1024, start=True, **kwargs) -> VirtualStream:
+        if self.open_latency:
+            time.sleep(self.open_latency)
+        if input:
+            self.is_format_supported(rate, input_device=input_device_index or 0,
+                                     input_channels=channels, input_format=format)
+        return VirtualStream(self, rate, channels, SAMPLE_SIZES[format], bool(input), frames_per_buffer)
+
+    def terminate(self):
+        pass
+
+
+def virtual_backend_factory(input_files: Optional[List[str]] = None, speed: float = 1.0,
+                            **kwargs) -> Callable[[], VirtualAudio]:
+    """
+    Factory for AudioService(backend_factory=...) that always returns the same
+    virtual device, so re-initialisation (device monitor) keeps its state
+    """
+    device = VirtualAudio(input_files, speed=speed, **kwargs)
+    return lambda: device
+
+
+def default_backend_factory() -> Optional[Callable]:
+    """
+    Backend selected by the AUDIO_BACKEND environment variable
+
+    'pyaudio' (default) uses the real sound card. 'virtual' replays the WAV files
+    listed in AUDIO_VIRTUAL_INPUT (separated by os.pathsep) at AUDIO_VIRTUAL_SPEED.
+    Returns None when no backend is available.
+    """
+    backend = os.getenv("AUDIO_BACKEND", "pyaudio").lower()
+    if backend == "virtual":
+        files = [path for path in os.getenv("AUDIO_VIRTUAL_INPUT", "").split(os.pathsep) if path]
+        return virtual_backend_factory(files, speed=float(os.getenv("AUDIO_VIRTUAL_SPEED", "1.0")))
+    if PYAUDIO_AVAILABLE:
+        return pyaudio.PyAudio
+    return None
@@ -0,0 +1,230 @@
+"""
+Zero-copy audio buffers for LearnwithAI
+16-bit PCM audio held once (a memory-mapped WAV file or bytes already in
+memory) and handed to metering, resampling, scoring and playback as views:
+time slices and int16 arrays share the same memory, and float32 conversion
+only allocates the output, block by block.
+"""
+
+import mmap
+import struct
+from typing import Iterable, Iterator, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+FULL_SCALE = 32768.0
+SAMPLE_WIDTH = 2
+# Échantillons convertis par bloc : la taille des temporaires ne dépend pas de la durée
+CONVERT_BLOCK = 1 << 16
+WRITE_BATCH_BYTES = 128 * 1024
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _find_pcm_data(data) -> tuple:
+    """
+    Locate the PCM samples of a WAV file image
+
+    Returns:
+        tuple: (rate, channels, data offset, data size in bytes)
+
+    Raises:
+        ValueError: Not a 16-bit PCM WAV file
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("not a RIFF/WAVE file")
+    fmt = None
+    position = 12
+    while position + 8 <= len(data):
+        chunk_id = bytes(data[position:position + 4])
+        size = struct.unpack_from('<I', data, position + 4)[0]
+        body = position + 8
+        if chunk_id == b'fmt ':
+            tag, channels, rate, _, _, bits = struct.unpack_from('<HHIIHH', data, body)
+            if tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_EXTENSIBLE) or bits != 16:
+                raise ValueError(f"only 16-bit PCM is supported (format {tag:#x}, {bits} bits)")
+            fmt = (rate, channels)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            # Fichier tronqué (enregistrement interrompu) : garder les trames complètes
+            size = min(size, len(data) - body)
+            return fmt[0], fmt[1], body, size - size % (SAMPLE_WIDTH * fmt[1])
+        # Les chunks sont alignés sur 2 octets
+        position = body + size + (size & 1)
+    raise ValueError("no data chunk")
+
+
+def write_wav(file_path: str, chunks: Iterable[bytes], rate: int, channels: int = 1,
+              sample_width: int = SAMPLE_WIDTH) -> int:
+    """
+    Write PCM chunks as a WAV file without joining the whole recording in memory
+
+    Returns:
+        int: Size of the audio data in bytes
+    """
+    chunks = list(chunks)
+    size = sum(map(len, chunks))
+    frame_size = sample_width * channels
+    header = struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + size + (size & 1), b'WAVE',
+                         b'fmt ', 16, _WAVE_FORMAT_PCM, channels, rate, rate * frame_size,
+                         frame_size, sample_width * 8, b'data', size)
+    # Les morceaux capturés ont tous la même taille : quelques gros write, copie bornée à WRITE_BATCH_BYTES
+    per_write = max(1, WRITE_BATCH_BYTES // max(1, len(chunks[0]) if chunks else 1))
+    with open(file_path, 'wb') as f:
+        f.write(header)
+        for start in range(0, len(chunks), per_write):
+            f.write(b''.join(chunks[start:start + per_write]))
+        if size & 1:
+            f.write(b'\x00')
+    return size
+
+
+def _mono_float32(samples: "np.ndarray", scale: float) -> "np.ndarray":
+    """Samples (or frames of shape (n, channels), mixed to mono) as scaled float32, block by block"""
+    output = np.empty(samples.shape[0], dtype=np.float32)
+    for start in range(0, samples.shape[0], CONVERT_BLOCK):
+        block = samples[start:start + CONVERT_BLOCK].astype(np.float32)
+        if block.ndim > 1:
+            block = block.mean(axis=1)
+        output[start:start + block.shape[0]] = block * scale
+    return output
+
+
+def resample(samples: "np.ndarray", from_rate: int, to_rate: int, scale: float = 1.0) -> "np.ndarray":
+    """
+    Linear-interpolation resampling (good enough for speech features)
+
+    Works block by block, so `samples` can be a view on a whole recording
+    (int16, or frames of shape (n, channels) which are mixed to mono): only
+    the float32 output is allocated in full. The output is always mono
+    float32 and scaled, even when the rates already match.
+
+    Args:
+        scale (float): Factor applied to the output (1 / 32768 for int16 input)
+    """
+    if from_rate == to_rate or samples.shape[0] == 0:
+        if samples.dtype == np.float32 and samples.ndim == 1 and scale == 1.0:
+            return samples  # Déjà au bon format : aucune copie
+        return _mono_float32(samples, scale)
+    count = int(samples.shape[0] / float(from_rate) * to_rate)
+    output = np.empty(count, dtype=np.float32)
+    step = from_rate / float(to_rate)
+    last = samples.shape[0] - 1
+    for start in range(0, count, CONVERT_BLOCK):
+        position = np.arange(start, min(count, start + CONVERT_BLOCK)) * step
+        left = np.minimum(position.astype(np.int64), last)
+        right = np.minimum(left + 1, last)
+        fraction = (position - left).astype(np.float32)
+        before = samples[left].astype(np.float32)
+        after = samples[right].astype(np.float32)
+        if before.ndim > 1:
+            before, after = before.mean(axis=1), after.mean(axis=1)
+        output[start:start + fraction.size] = (before + (after - before) * fraction) * scale
+    return output
+
+
+class AudioBuffer:
+    def __init__(self, data, rate: int, channels: int = 1, source=None):
+        """
+        16-bit interleaved PCM audio
+
+        Args:
+            data: Bytes-like object holding the samples (kept, not copied)
+            rate (int): Sample rate
+            channels (int): Interleaved channels
+            source: Object owning the memory (the mmap of a file), closed by close()
+        """
+        self.data = memoryview(data).cast('B')
+        self.rate = rate
+        self.channels = channels
+        self._source = source
+
+    @classmethod
+    def from_bytes(cls, data, rate: int, channels: int = 1) -> "AudioBuffer":
+        """Wrap PCM bytes already in memory"""
+        return cls(data, rate, channels)
+
+    @classmethod
+    def from_wav(cls, file_path: str) -> "AudioBuffer":
+        """
+        Memory-map a 16-bit WAV file: samples are read from the page cache on demand
+
+        Raises:
+            ValueError: Not a 16-bit PCM WAV file
+        """
+        with open(file_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            rate, channels, offset, size = _find_pcm_data(mapped)
+        except Exception:
+            mapped.close()
+            raise
+        return cls(memoryview(mapped)[offset:offset + size], rate, channels, source=mapped)
+
+    def __len__(self) -> int:
+        """Number of frames"""
+        return len(self.data) // (SAMPLE_WIDTH * self.channels)
+
+    @property
+    def frame_size(self) -> int:
+        return SAMPLE_WIDTH * self.channels
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return len(self) / float(self.rate)
+
+    @property
+    def int16(self) -> "np.ndarray":
+        """Interleaved int16 samples (a view, read-only for files)"""
+        return np.frombuffer(self.data, dtype='<i2')
+
+    def slice(self, start: float = 0.0, end: Optional[float] = None) -> "AudioBuffer":
+        """The audio between two times in seconds, sharing this buffer's memory"""
+        first = min(len(self), max(0, int(round(start * self.rate))))
+        last = len(self) if end is None else min(len(self), max(first, int(round(end * self.rate))))
+        # La tranche n'est pas propriétaire du fichier : close() reste celui du tampon d'origine
+        return AudioBuffer(self.data[first * self.frame_size:last * self.frame_size], self.rate, self.channels)
+
+    def chunks(self, frames: int) -> Iterator[memoryview]:
+        """Consecutive blocks of `frames` frames, as memoryviews (for stream.write)"""
+        step = frames * self.frame_size
+        for start in range(0, len(self.data), step):
+            yield self.data[start:start + step]
+
+    def to_float32(self, rate: Optional[int] = None) -> "np.ndarray":
+        """
+        Mono float32 samples in -1.0 - 1.0, resampled to `rate` if given
+
+        This is the only full-size allocation: channels are mixed and samples
+        converted one block at a time.
+        """
+        samples = self.int16
+        if self.channels > 1:
+            samples = samples[:samples.size - samples.size % self.channels].reshape(-1, self.channels)
+        return resample(samples, self.rate, self.rate if rate is None else rate, scale=1.0 / FULL_SCALE)
+
+    def close(self):
+        """Release the file mapping (left to the garbage collector while views are still in use)"""
+        source = self._source
+        if source is None:
+            return
+        try:
+            self.data.release()
+            source.close()
+            self._source = None
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "AudioBuffer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,241 @@
+"""
+Capture-path DSP for LearnwithAI
+Streaming noise suppression (STFT spectral gating against a tracked noise
+floor) followed by automatic gain control and a soft limiter, applied to each
+16-bit mono chunk as it is read from the microphone. Work per chunk is a
+fixed number of FFTs, and the added latency is one FFT frame (~21 ms).
+"""
+
+import math
+from typing import Dict
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+FULL_SCALE = 32768.0
+FRAME_SECONDS = 0.02  # Trame FFT d'environ 20 ms, arrondie à une puissance de 2
+
+# Suppression de bruit
+OVER_SUBTRACTION = 2.0  # Marge au-dessus du plancher de bruit avant de laisser passer
+MAX_REDUCTION_DB = 15.0  # Atténuation maximale (évite l'effet "sous l'eau")
+NOISE_RISE_DB_PER_SECOND = 3.0  # Remontée lente du plancher quand le bruit augmente
+NOISE_FALL = 0.5  # Descente rapide vers les minima observés
+SMOOTHING_SECONDS = 0.05  # Lissage temporel de la puissance avant le suivi des minima
+
+# Contrôle automatique de gain et limiteur
+TARGET_DBFS = -20.0
+SPEECH_GATE_DBFS = -50.0  # En dessous, le gain est gelé (on n'amplifie pas le silence)
+SPEECH_MARGIN_DB = 10.0  # ... de même à moins de 10 dB au-dessus du plancher de bruit
+MIN_GAIN_DB = -12.0
+MAX_GAIN_DB = 20.0
+ATTACK_SECONDS = 0.01
+RELEASE_SECONDS = 0.5
+LIMITER_CEILING = 0.89  # -1 dBFS
+
+
+def _db_to_gain(db: float) -> float:
+    return 10.0 ** (db / 20.0)
+
+
+def _gain_to_db(gain: float) -> float:
+    return 20.0 * math.log10(max(gain, 1e-12))
+
+
+def frame_size_for_rate(rate: int) -> int:
+    """Power-of-two FFT size closest to FRAME_SECONDS at `rate`"""
+    return 2 ** max(6, int(round(math.log2(rate * FRAME_SECONDS))))
+
+
+class CaptureProcessor:
+    def __init__(self, rate: int, noise_suppression: bool = True, agc: bool = True,
+                 n_fft: int = None, max_reduction_db: float = MAX_REDUCTION_DB,
+                 target_dbfs: float = TARGET_DBFS):
+        """
+        Streaming DSP stage for 16-bit mono audio
+
+        Args:
+            rate (int): Sample rate of the captured audio
+            noise_suppression (bool): Apply spectral gating
+            agc (bool): Apply automatic gain control and the limiter
+            n_fft (int): FFT size (defaults to ~20 ms at `rate`)
+        """
+        self.rate = rate
+        self.noise_suppression = noise_suppression
+        self.agc = agc
+        self.n_fft = n_fft or frame_size_for_rate(rate)
+        self.hop = self.n_fft // 2
+        # Racine de Hann périodique en analyse et en synthèse : reconstruction exacte à 50% de recouvrement
+        self.window = np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.n_fft) / self.n_fft)).astype(np.float32)
+        self.min_gain = _db_to_gain(-max_reduction_db)
+        self.target_rms = _db_to_gain(target_dbfs)
+        frames_per_second = rate / float(self.hop)
+        self.noise_rise = _db_to_gain(NOISE_RISE_DB_PER_SECOND / frames_per_second)
+        self.smoothing = math.exp(-1.0 / (SMOOTHING_SECONDS * frames_per_second))
+        self.noise_floor = None
+        self._power = None
+        self._level_floor = None  # Plancher large bande, quand le débruitage est désactivé
+        self.reset()
+
+    @property
+    def latency_seconds(self) -> float:
+        """Delay added between input and output"""
+        return self.n_fft / float(self.rate) if self.noise_suppression else 0.0
+
+    def reset(self, keep_noise_floor: bool = True):
+        """Start a new stream (the learned noise floor survives unless asked otherwise)"""
+        # Pré-remplissage d'une demi-trame : le premier échantillon est couvert par deux trames
+        self._input = np.zeros(self.hop, dtype=np.float32)
+        self._overlap = np.zeros(self.hop, dtype=np.float32)
+        self._to_skip = self.hop
+        self._samples_in = 0
+        self._samples_out = 0
+        if not keep_noise_floor:
+            self.noise_floor = None
+            self._power = None
+            self._level_floor = None
+        self.gain = 1.0
+        self.chunks = 0
+
+    def _update_noise_floor(self, magnitudes: "np.ndarray"):
+        """
+        Track the per-bin noise floor
+
+        The chunk's power is smoothed over time (a single frame of noise is too
+        erratic), then the floor follows its minima: quickly downwards, and
+        upwards by at most NOISE_RISE_DB_PER_SECOND so speech is not learned as noise.
+        """
+        frames = magnitudes.shape[0]
+        power = np.mean(magnitudes ** 2, axis=0)
+        if self._power is None:
+            self._power = power
+        else:
+            weight = self.smoothing ** frames
+            self._power = weight * self._power + (1.0 - weight) * power
+        level = np.sqrt(self._power)
+        if self.noise_floor is None:
+            self.noise_floor = level
+            return
+        rising = self.noise_floor * (self.noise_rise ** frames)
+        self.noise_floor = np.where(level < self.noise_floor,
+                                    self.noise_floor + NOISE_FALL * (level - self.noise_floor),
+                                    np.minimum(rising, level))
+
+    def _gate(self, spectrum: "np.ndarray") -> "np.ndarray":
+        """Spectral gating of a (frames, bins) spectrum"""
+        magnitudes = np.abs(spectrum)
+        self._update_noise_floor(magnitudes)
+        # Soustraction de puissance (Wiener simplifié), bornée par l'atténuation maximale
+        ratio = (OVER_SUBTRACTION * self.noise_floor) ** 2 / (magnitudes ** 2 + 1e-12)
+        mask = np.sqrt(np.clip(1.0 - ratio, 0.0, 1.0))
+        # Lissage fréquentiel sur 3 bandes : moins de "bruit musical"
+        mask[:, 1:-1] = 0.25 * mask[:, :-2] + 0.5 * mask[:, 1:-1] + 0.25 * mask[:, 2:]
+        return spectrum * np.maximum(mask, self.min_gain)
+
+    def _suppress_noise(self, samples: "np.ndarray") -> "np.ndarray":
+        """Streaming STFT -> gate -> overlap-add; returns the samples now complete"""
+        buffer = np.concatenate((self._input, samples))
+        count = (buffer.size - self.n_fft) // self.hop + 1 if buffer.size >= self.n_fft else 0
+        if count == 0:
+            self._input = buffer
+            return samples[:0]
+
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop][:count]
+        spectrum = self._gate(np.fft.rfft(frames * self.window, axis=1))
+        frames_out = np.fft.irfft(spectrum, n=self.n_fft, axis=1).astype(np.float32) * self.window
+
+        # Recouvrement de 50% : chaque bloc de `hop` reçoit la fin d'une trame et le début de la suivante
+        blocks = np.zeros((count + 1, self.hop), dtype=np.float32)
+        blocks[0] = self._overlap
+        blocks[:-1] += frames_out[:, :self.hop]
+        blocks[1:] += frames_out[:, self.hop:]
+        self._overlap = blocks[-1].copy()
+        self._input = buffer[count * self.hop:]
+
+        output = blocks[:-1].reshape(-1)
+        if self._to_skip:
+            skipped = min(self._to_skip, output.size)
+            self._to_skip -= skipped
+            output = output[skipped:]
+        return output
+
+    def noise_floor_rms(self) -> float:
+        """Broadband level of the tracked noise floor (0 until one is learned)"""
+        if self.noise_floor is None:
+            return self._level_floor or 0.0
+        # Bruit blanc de RMS r : E|X|^2 = r^2 * sum(w^2), et sum(w^2) = n_fft / 2 pour cette fenêtre
+        return float(np.sqrt(np.mean(self.noise_floor ** 2) / (self.n_fft / 2.0)))
+
+    def _apply_gain(self, samples: "np.ndarray") -> "np.ndarray":
+        """AGC (smoothed per chunk, ramped per sample) then soft limiting"""
+        if samples.size == 0:
+            return samples
+        rms = float(np.sqrt(np.dot(samples, samples) / samples.size))
+        previous = self.gain
+        if not self.noise_suppression:
+            # Sans STFT, suivi des minima du niveau des blocs (même dynamique que par bande)
+            frames = samples.size / float(self.hop)
+            if self._level_floor is None or rms < self._level_floor:
+                self._level_floor = rms if self._level_floor is None else (
+                    self._level_floor + NOISE_FALL * (rms - self._level_floor))
+            else:
+                self._level_floor = min(self._level_floor * self.noise_rise ** frames, rms)
+        gate = max(_db_to_gain(SPEECH_GATE_DBFS), self.noise_floor_rms() * _db_to_gain(SPEECH_MARGIN_DB))
+        if rms > gate:
+            desired = min(max(self.target_rms / rms, _db_to_gain(MIN_GAIN_DB)), _db_to_gain(MAX_GAIN_DB))
+            seconds = samples.size / float(self.rate)
+            tau = ATTACK_SECONDS if desired < self.gain else RELEASE_SECONDS
+            self.gain += (desired - self.gain) * (1.0 - math.exp(-seconds / tau))
+        # Rampe linéaire entre l'ancien et le nouveau gain : pas de "zipper noise"
+        output = samples * np.linspace(previous, self.gain, samples.size, dtype=np.float32)
+
+        # Limiteur doux : au-dessus du plafond, compression tanh (jamais au-delà de la pleine échelle)
+        over = np.abs(output) > LIMITER_CEILING
+        if over.any():
+            headroom = 1.0 - LIMITER_CEILING
+            excess = np.abs(output[over]) - LIMITER_CEILING
+            output[over] = np.sign(output[over]) * (LIMITER_CEILING + headroom * np.tanh(excess / headroom))
+        return output
+
+    def process(self, data: bytes) -> bytes:
+        """
+        Process one captured chunk of 16-bit mono PCM
+
+        Returns:
+            bytes: Processed audio; the first calls return up to one FFT frame
+                   less than they receive (see flush)
+        """
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / FULL_SCALE
+        self._samples_in += samples.size
+        self.chunks += 1
+        if self.noise_suppression:
+            samples = self._suppress_noise(samples)
+        if self.agc:
+            samples = self._apply_gain(samples)
+        self._samples_out += samples.size
+        return np.rint(np.clip(samples * FULL_SCALE, -FULL_SCALE, FULL_SCALE - 1)).astype('<i2').tobytes()
+
+    def flush(self) -> bytes:
+        """Return the audio still held back by the STFT at the end of a stream"""
+        if not self.noise_suppression:
+            return b''
+        missing = self._samples_in - self._samples_out
+        samples_in, noise_floor, power = self._samples_in, self.noise_floor, self._power
+        # Des zéros poussent la dernière trame ; ils ne doivent pas fausser le plancher de bruit
+        data = self.process(np.zeros(self.n_fft, dtype='<i2').tobytes())
+        self._samples_in = self._samples_out = samples_in
+        self.noise_floor, self._power = noise_floor, power
+        return data[:missing * 2]
+
+    def stats(self) -> Dict:
+        """Current gain and average noise floor (dBFS)"""
+        floor_rms = self.noise_floor_rms()
+        return {
+            'chunks': self.chunks,
+            'gain_db': round(_gain_to_db(self.gain), 1),
+            'noise_floor_dbfs': round(_gain_to_db(floor_rms), 1) if floor_rms else None,
+            'latency_ms': round(self.latency_seconds * 1000, 1),
+        }
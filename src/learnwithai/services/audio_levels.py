@@ -0,0 +1,192 @@
+"""
+Audio level metering and waveform peak tables for LearnwithAI
+Live RMS/peak levels for the capture path and multi-resolution min/max tables
+cached next to each recording so waveforms can be drawn at any zoom.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+from .audio_buffer import AudioBuffer
+
+FULL_SCALE = 32768.0
+
+# Taille de bloc du niveau le plus fin et facteur de réduction entre niveaux
+PEAK_BASE_BLOCK = 256
+PEAK_LEVEL_FACTOR = 4
+PEAK_MIN_BUCKETS = 64
+PEAKS_SUFFIX = '.peaks.npz'
+
+
+def chunk_levels(data) -> Tuple[float, float]:
+    """
+    Compute the RMS and peak level of 16-bit PCM audio
+
+    Works directly on the buffer returned by stream.read or on an AudioBuffer
+    (no copy of the samples), so it is cheap enough to run for every captured
+    chunk.
+
+    Returns:
+        tuple: (rms, peak), both normalised to 0.0 - 1.0
+    """
+    if not NUMPY_AVAILABLE:
+        return 0.0, 0.0
+
+    samples = data.int16 if isinstance(data, AudioBuffer) else np.frombuffer(data, dtype='<i2')
+    if samples.size == 0:
+        return 0.0, 0.0
+    as_float = samples.astype(np.float32)
+    rms = float(np.sqrt(np.dot(as_float, as_float) / samples.size)) / FULL_SCALE
+    peak = max(-float(samples.min()), float(samples.max())) / FULL_SCALE
+    return min(rms, 1.0), min(peak, 1.0)
+
+
+class LevelMeter:
+    def __init__(self, peak_decay: float = 0.9):
+        """Smoothed level meter fed from the capture thread"""
+        self.peak_decay = peak_decay
+        self.rms = 0.0
+        self.peak = 0.0
+        self.peak_hold = 0.0
+
+    def update(self, data: bytes):
+        """Feed one captured chunk"""
+        self.rms, self.peak = chunk_levels(data)
+        # Maintien de crête avec décroissance pour un affichage lisible
+        self.peak_hold = max(self.peak, self.peak_hold * self.peak_decay)
+
+    def reset(self):
+        """Reset the meter between recordings"""
+        self.rms = self.peak = self.peak_hold = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current levels for the UI"""
+        return {'rms': self.rms, 'peak': self.peak, 'peak_hold': self.peak_hold}
+
+
+def peaks_path(wav_path: str) -> str:
+    """Path of the peak table cached next to a recording"""
+    return os.path.splitext(wav_path)[0] + PEAKS_SUFFIX
+
+
+def build_peak_pyramid(samples, channels: int = 1, base_block: int = PEAK_BASE_BLOCK,
+                       factor: int = PEAK_LEVEL_FACTOR, min_buckets: int = PEAK_MIN_BUCKETS) -> List[Dict]:
+    """
+    Build multi-resolution min/max tables from int16 samples
+
+    Level 0 holds the min/max of every `base_block` frames; each next level
+    merges `factor` buckets of the previous one, until fewer than
+    `min_buckets` would remain.
+
+    Args:
+        samples: int16 NumPy array (interleaved if channels > 1)
+        channels (int): Number of interleaved channels
+
+    Returns:
+        list: One dict per level with 'block' (frames per bucket), 'min' and 'max' arrays
+    """
+    if channels > 1:
+        frames = samples[:samples.size - samples.size % channels].reshape(-1, channels)
+        mins_src, maxs_src = frames.min(axis=1), frames.max(axis=1)
+    else:
+        mins_src = maxs_src = samples
+
+    if mins_src.size == 0:
+        return []
+    # Blocs complets réduits sur une vue ; le dernier bloc partiel à part (pas de copie pour le compléter)
+    full = mins_src.size // base_block * base_block
+    mins = mins_src[:full].reshape(-1, base_block).min(axis=1)
+    maxs = maxs_src[:full].reshape(-1, base_block).max(axis=1)
+    if full < mins_src.size:
+        mins = np.append(mins, mins_src[full:].min())
+        maxs = np.append(maxs, maxs_src[full:].max())
+    levels = [{'block': base_block, 'min': mins, 'max': maxs}]
+
+    block = base_block
+    while mins.size // factor >= min_buckets:
+        starts = np.arange(0, mins.size, factor)
+        mins = np.minimum.reduceat(mins, starts)
+        maxs = np.maximum.reduceat(maxs, starts)
+        block *= factor
+        levels.append({'block': block, 'min': mins, 'max': maxs})
+    return levels
+
+
+def save_peaks(wav_path: str, audio, channels: int = 1) -> Optional[List[Dict]]:
+    """
+    Compute the peak tables and cache them next to the WAV file
+
+    Args:
+        audio: AudioBuffer of the recording, or raw PCM bytes
+        channels (int): Interleaved channels of raw bytes (an AudioBuffer knows its own)
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    if isinstance(audio, AudioBuffer):
+        samples, channels = audio.int16, audio.channels
+    else:
+        samples = np.frombuffer(audio, dtype='<i2')
+    levels = build_peak_pyramid(samples, channels)
+    arrays = {'blocks': np.array([level['block'] for level in levels], dtype=np.int64),
+              'source_mtime': np.array(os.path.getmtime(wav_path))}
+    for i, level in enumerate(levels):
+        arrays[f'min_{i}'] = level['min']
+        arrays[f'max_{i}'] = level['max']
+    # np.savez ajoute .npz si le nom ne se termine pas déjà ainsi
+    np.savez(peaks_path(wav_path), **arrays)
+    return levels
+
+
+def load_peaks(wav_path: str) -> Optional[List[Dict]]:
+    """
+    Load the cached peak tables of a recording, rebuilding them if missing or stale
+
+    Returns:
+        list: Peak levels (see build_peak_pyramid), or None without NumPy
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    cache_path = peaks_path(wav_path)
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                if float(cached['source_mtime']) == os.path.getmtime(wav_path):
+                    return [
+                        {'block': int(block), 'min': cached[f'min_{i}'], 'max': cached[f'max_{i}']}
+                        for i, block in enumerate(cached['blocks'])
+                    ]
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable peak cache {os.path.basename(cache_path)}: {e}")
+
+    with AudioBuffer.from_wav(wav_path) as audio:
+        return save_peaks(wav_path, audio)
+
+
+def peaks_for_width(levels: List[Dict], width: int) -> Tuple[list, list]:
+    """
+    Return `width` min/max pairs (normalised to -1.0 - 1.0) for drawing
+
+    Uses the coarsest level that still has at least `width` buckets, so the
+    cost depends on the display width, not on the recording length.
+    """
+    if not levels or width <= 0:
+        return [], []
+
+    level = levels[0]
+    for candidate in levels:
+        if candidate['min'].size >= width:
+            level = candidate
+
+    mins, maxs = level['min'], level['max']
+    if mins.size > width:
+        starts = (np.arange(width) * mins.size) // width
+        mins = np.minimum.reduceat(mins, starts)
+        maxs = np.maximum.reduceat(maxs, starts)
+    return (mins / FULL_SCALE).tolist(), (maxs / FULL_SCALE).tolist()
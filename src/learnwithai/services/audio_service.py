@@ -3,9 +3,9 @@ Audio recording and playback service for LearnwithAI
 """
 
 import os
-import wave
 import threading
 import time
+import uuid
 from datetime import datetime
 
 try:
@@ -15,37 +15,97 @@ except ImportError:
     PYAUDIO_AVAILABLE = False
     print("PyAudio not available. Install with: pip install pyaudio")
 
+from .audio_backends import PA_INT16, default_backend_factory
+from .device_cache import DeviceCapabilityCache, device_key, probe_device, best_sample_rate
+from .recordings_catalog import RecordingsCatalog
+from .audio_buffer import SAMPLE_WIDTH, AudioBuffer, write_wav
+from .audio_levels import LevelMeter, save_peaks, load_peaks, peaks_for_width, peaks_path
+from .audio_dsp import CaptureProcessor
+from .pronunciation import score_pronunciation
+from .profiling import profiled
+
+# Re-validation des périphériques : une fois au démarrage, puis à la demande
+# (échec d'ouverture, request_device_rescan) ; > 0 ajoute un passage toutes les N secondes
+DEVICE_RESCAN_INTERVAL = float(os.getenv("AUDIO_DEVICE_RESCAN_INTERVAL", "0"))
+DEVICE_PROFILE_MAX_AGE = 7 * 24 * 3600
+
+# Politique de rétention des enregistrements : rien n'est supprimé sans choix explicite (0 = illimité)
+RECORDINGS_MAX_BYTES = int(os.getenv("RECORDINGS_MAX_MB", "0")) * 1024 * 1024
+RECORDINGS_MAX_AGE = float(os.getenv("RECORDINGS_MAX_AGE_DAYS", "0")) * 24 * 3600
+CATALOG_MAINTENANCE_INTERVAL = 3600
+
+# Traitement du signal à la capture : off, on (débruitage + gain), denoise, agc
+AUDIO_DSP_MODES = {'off': (False, False), 'on': (True, True), 'denoise': (True, False), 'agc': (False, True)}
+
 class AudioService:
-    def __init__(self):
-        """Initialize audio service"""
+    def __init__(self, device_cache=None, backend_factory=None, recordings_dir=None, dsp=None):
+        """Initialize audio service
+        
+        Args:
+            device_cache: DeviceCapabilityCache to use (defaults to resources/audio_devices.json)
+            backend_factory: Callable returning a PyAudio-compatible object
+                             (defaults to PyAudio, or the AUDIO_BACKEND selection)
+            recordings_dir (str): Where recordings are saved
+            dsp (str): Capture processing, one of AUDIO_DSP_MODES (defaults to AUDIO_DSP, 'off')
+        """
         self.is_recording = False
+        self.is_playing = False
         self.current_recording = None
         self.audio = None
+        self.backend_factory = backend_factory or default_backend_factory()
         self.stream = None
         self.frames = []
         self.recording_thread = None
         self.recording_start_time = None
+        self.level_meter = LevelMeter()
+        
+        # Optional noise suppression / AGC on captured chunks (mono 16-bit only)
+        self.dsp_mode = (dsp or os.getenv("AUDIO_DSP", "off")).lower()
+        if self.dsp_mode not in AUDIO_DSP_MODES:
+            print(f"⚠️ Unknown AUDIO_DSP mode '{self.dsp_mode}', capture processing disabled")
+            self.dsp_mode = 'off'
+        self.capture_processor = None
+        
+        # Device capabilities cached on disk, re-validated by a background monitor
+        self.device_cache = device_cache or DeviceCapabilityCache()
+        self.input_device_index = None
+        self._audio_lock = threading.RLock()
+        self._validated_devices = set()
+        self._monitor_stop = threading.Event()
+        self._rescan_wake = threading.Event()
+        self._opening = False  # Flux en cours d'ouverture (protégé par _audio_lock)
+        self._monitor_thread = None
         
         # Audio configuration with auto-detection
         self.chunk = 1024
-        self.sample_format = pyaudio.paInt16 if PYAUDIO_AVAILABLE else None
+        self.sample_format = PA_INT16
         self.channels = 1  # Mono pour la plupart des micros intégrés
+        self.fs = 44100
         
         # Create recordings directory
-        self.recordings_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'recordings')
+        self.recordings_dir = recordings_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'recordings')
         os.makedirs(self.recordings_dir, exist_ok=True)
         
+        # Recordings index, reconciled and pruned in the background
+        self.session_id = uuid.uuid4().hex[:12]
+        self.catalog = RecordingsCatalog(self.recordings_dir)
+        self._maintenance_wake = threading.Event()
+        self._maintenance_stop = threading.Event()
+        self._maintenance_thread = None
+        self.start_catalog_maintenance()
+        
         # Initialize PyAudio and detect best sample rate
         self._initialize_audio()
+        self.start_device_monitor()
         
     def _initialize_audio(self):
         """Initialize PyAudio and detect best sample rate"""
-        if not PYAUDIO_AVAILABLE:
+        if self.backend_factory is None:
             print("❌ PyAudio not available. Audio recording disabled.")
             return
             
         try:
-            self.audio = pyaudio.PyAudio()
+            self.audio = self.backend_factory()
             # Detect best sample rate after initializing PyAudio
             self.fs = self._detect_best_sample_rate()
             print(f"✅ Audio service initialized with sample rate: {self.fs} Hz")
@@ -54,40 +114,68 @@ class AudioService:
             self.audio = None
             self.fs = 44100  # Fallback
     
-    def _detect_best_sample_rate(self):
-        """Détecte le meilleur taux d'échantillonnage supporté par le microphone"""
+    def _host_api_name(self, device_info):
+        """Return the host API name of a device (ALSA, CoreAudio, WASAPI...)"""
+        try:
+            return self.audio.get_host_api_info_by_index(device_info['hostApi'])['name']
+        except Exception:
+            return ''
+    
+    def _first_input_device_info(self):
+        """Return the first device with input channels, or None"""
+        for i in range(self.audio.get_device_count()):
+            device_info = self.audio.get_device_info_by_index(i)
+            if device_info['maxInputChannels'] > 0:
+                return device_info
+        return None
+    
+    def _detect_best_sample_rate(self, force_probe=False):
+        """Détecte le meilleur taux d'échantillonnage supporté par le microphone
+        
+        Le profil du périphérique est lu depuis le cache disque quand il existe ;
+        is_format_supported n'est appelé que pour un périphérique inconnu
+        (ou si force_probe est vrai).
+        """
         if not self.audio:
             return 44100  # Fallback si PyAudio n'est pas disponible
         
         try:
             # Obtenir le périphérique d'entrée par défaut
-            default_device = self.audio.get_default_input_device_info()
-            device_index = default_device['index']
+            try:
+                default_device = self.audio.get_default_input_device_info()
+            except Exception:
+                default_device = self._first_input_device_info()
+            if default_device is None:
+                print("❌ No input device available")
+                return 44100
             
-            print(f"🎤 Testing audio device: {default_device['name']}")
+            key = device_key(default_device, self._host_api_name(default_device))
+            profile = None if force_probe else self.device_cache.get(key)
             
-            # Tester différents taux d'échantillonnage par ordre de préférence
-            test_rates = [44100, 48000, 22050, 16000, 8000]
+            if profile and profile.get('supported_rates'):
+                print(f"🎤 Using cached capabilities for: {default_device['name']}")
+                profile['index'] = default_device['index']
+            else:
+                print(f"🎤 Testing audio device: {default_device['name']}")
+                profile = probe_device(self.audio, default_device, self._host_api_name(default_device), self.sample_format)
+                self._validated_devices.add(key)
+                self.device_cache.put(key, profile)
             
-            for rate in test_rates:
-                try:
-                    # Tester si ce taux est supporté
-                    if self.audio.is_format_supported(
-                        rate=rate,
-                        input_device=device_index,
-                        input_channels=self.channels,
-                        input_format=self.sample_format
-                    ):
-                        print(f"✓ Sample rate {rate} Hz is supported")
-                        return rate
-                except Exception as e:
-                    print(f"✗ Sample rate {rate} Hz not supported: {e}")
-                    continue
-            
-            # Si aucun taux standard ne fonctionne, utiliser le taux par défaut
-            default_rate = int(default_device['defaultSampleRate'])
-            print(f"⚠️ Using device default sample rate: {default_rate} Hz")
-            return default_rate
+            self.device_cache.set_default_input(key)
+            self.device_cache.save()
+            self.input_device_index = default_device['index']
+            
+            supported_channels = profile.get('supported_channels') or []
+            if supported_channels and self.channels not in supported_channels:
+                self.channels = supported_channels[0]
+            
+            rate = best_sample_rate(profile)
+            if profile.get('supported_rates'):
+                print(f"✓ Sample rate {rate} Hz is supported")
+            else:
+                # Si aucun taux standard ne fonctionne, utiliser le taux par défaut
+                print(f"⚠️ Using device default sample rate: {rate} Hz")
+            return rate
             
         except Exception as e:
             print(f"❌ Error detecting sample rate: {e}")
@@ -98,28 +186,173 @@ class AudioService:
         if not self.audio:
             return None
         
+        # Périphérique résolu au démarrage (ou par le moniteur de périphériques)
+        if self.input_device_index is not None:
+            return self.input_device_index
+        
         try:
             # Essayer le périphérique par défaut d'abord
             default_device = self.audio.get_default_input_device_info()
-            return default_device['index']
+            self.input_device_index = default_device['index']
         except:
             # Si pas de périphérique par défaut, chercher le premier avec entrée
+            device_info = self._first_input_device_info()
+            self.input_device_index = device_info['index'] if device_info else None
+        return self.input_device_index
+    
+    def _open_input_stream(self, input_device):
+        """Open the capture stream with the current settings"""
+        with self._audio_lock:
+            return self.audio.open(
+                format=self.sample_format,
+                channels=self.channels,
+                rate=self.fs,
+                frames_per_buffer=self.chunk,
+                input=True,
+                input_device_index=input_device
+            )
+    
+    def start_device_monitor(self, interval=None):
+        """Start the background task that re-validates cached device profiles
+        
+        It makes one pass shortly after start, then one per request_device_rescan
+        (and every `interval` seconds if > 0).
+        """
+        if not self.audio or (self._monitor_thread and self._monitor_thread.is_alive()):
+            return
+        
+        self._monitor_stop.clear()
+        self._monitor_thread = threading.Thread(
+            target=self._monitor_devices,
+            args=(DEVICE_RESCAN_INTERVAL if interval is None else interval,)
+        )
+        self._monitor_thread.daemon = True
+        self._monitor_thread.start()
+    
+    def stop_device_monitor(self):
+        """Stop the background device monitor"""
+        self._monitor_stop.set()
+        self._rescan_wake.set()
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout=1.0)
+            self._monitor_thread = None
+    
+    def _monitor_devices(self, interval):
+        """Internal loop of the device monitor thread"""
+        # Premier passage peu après le démarrage pour re-valider le profil lu en cache
+        delay = 2.0
+        while True:
+            self._rescan_wake.wait(delay)
+            if self._monitor_stop.is_set():
+                return
+            self._rescan_wake.clear()
+            delay = interval if interval > 0 else None
+            try:
+                self.revalidate_devices()
+            except Exception as e:
+                print(f"⚠️ Device monitor error: {e}")
+    
+    def request_device_rescan(self):
+        """Ask the device monitor for a new pass (e.g. after a device was plugged in)"""
+        self._rescan_wake.set()
+    
+    def _device_busy(self):
+        """True while a stream is open or being opened (call with _audio_lock held)"""
+        return self.is_recording or self.is_playing or self._opening
+    
+    def _reset_backend(self):
+        """Re-create PyAudio so PortAudio enumerates devices again (call with _audio_lock held)"""
+        self.audio.terminate()
+        self.audio = self.backend_factory()
+    
+    def revalidate_devices(self):
+        """
+        Re-probe input devices and pick up hot-plugged ones
+        
+        PortAudio only enumerates devices when it is initialised, so PyAudio is
+        re-created while idle. New devices and devices not yet validated in this
+        session are probed; unplugged devices are dropped from the cache.
+        
+        Returns:
+            bool: True if a pass was made, False if skipped (recording or playing)
+        """
+        with self._audio_lock:
+            if not self.audio or self._device_busy():
+                return False
+            
+            self._reset_backend()
+            
+            present = {}
             for i in range(self.audio.get_device_count()):
                 device_info = self.audio.get_device_info_by_index(i)
                 if device_info['maxInputChannels'] > 0:
-                    return i
-            return None
-            self.fs = 44100  # Fallback
+                    present[device_key(device_info, self._host_api_name(device_info))] = device_info
+        
+        changed = False
+        for key, device_info in present.items():
+            profile = self.device_cache.get(key)
+            needs_probe = key not in self._validated_devices or self.device_cache.is_stale(key, DEVICE_PROFILE_MAX_AGE)
             
+            if needs_probe:
+                with self._audio_lock:
+                    # Ne jamais sonder pendant un enregistrement ou une lecture
+                    if self._device_busy():
+                        break
+                    new_profile = probe_device(self.audio, device_info, self._host_api_name(device_info), self.sample_format)
+                self._validated_devices.add(key)
+                if profile is None:
+                    print(f"🔌 New audio device detected: {device_info['name']}")
+                if profile is None or profile.get('supported_rates') != new_profile['supported_rates'] \
+                        or profile.get('supported_channels') != new_profile['supported_channels']:
+                    changed = True
+                self.device_cache.put(key, new_profile)
+            elif profile.get('index') != device_info['index']:
+                profile['index'] = device_info['index']
+                changed = True
+        
+        for key in self.device_cache.keys():
+            if key not in present:
+                print(f"🔌 Audio device removed: {key}")
+                self.device_cache.remove(key)
+                changed = True
+        
+        with self._audio_lock:
+            if not self._device_busy():
+                try:
+                    default_device = self.audio.get_default_input_device_info()
+                except Exception:
+                    default_device = self._first_input_device_info()
+                
+                if default_device is not None:
+                    key = device_key(default_device, self._host_api_name(default_device))
+                    profile = self.device_cache.get(key)
+                    if key != self.device_cache.default_input or default_device['index'] != self.input_device_index:
+                        print(f"🎤 Default input device: {default_device['name']}")
+                        self.device_cache.set_default_input(key)
+                        changed = True
+                    self.input_device_index = default_device['index']
+                    if profile:
+                        self.fs = best_sample_rate(profile)
+                else:
+                    self.input_device_index = None
+        
+        if changed:
+            self.device_cache.save()
+        return True
+            
+    @profiled('audio.start_recording')
     def start_recording(self):
         """Start recording audio from microphone"""
-        if not PYAUDIO_AVAILABLE or not self.audio:
+        if not self.audio:
             print("❌ Audio recording not available")
             return False
             
-        if self.is_recording:
-            print("⚠️ Already recording")
-            return False
+        with self._audio_lock:
+            if self.is_recording or self._opening:
+                print("⚠️ Already recording")
+                return False
+            # Le moniteur ne doit pas réinitialiser PortAudio sous le flux qu'on ouvre
+            self._opening = True
             
         try:
             # Get best input device
@@ -128,22 +361,32 @@ class AudioService:
                 print("❌ No input device available")
                 return False
             
-            # Start recording with auto-detected settings
-            self.stream = self.audio.open(
-                format=self.sample_format,
-                channels=self.channels,
-                rate=self.fs,
-                frames_per_buffer=self.chunk,
-                input=True,
-                input_device_index=input_device
-            )
+            # Start recording with the cached device settings
+            try:
+                self.stream = self._open_input_stream(input_device)
+            except Exception as e:
+                # Le profil en cache peut être périmé (périphérique remplacé) : ré-énumérer et re-sonder une fois
+                print(f"⚠️ Cached audio settings failed ({e}), probing device again")
+                with self._audio_lock:
+                    if not self.is_playing:
+                        self._reset_backend()
+                self.input_device_index = None
+                self.fs = self._detect_best_sample_rate(force_probe=True)
+                input_device = self._get_best_input_device()
+                if input_device is None:
+                    print("❌ No input device available")
+                    return False
+                self.stream = self._open_input_stream(input_device)
             
             self.frames = []
+            self.level_meter.reset()
+            self._prepare_capture_processor()
             self.is_recording = True
             self.recording_start_time = time.time()
             
-            # Start recording thread
-            self.recording_thread = threading.Thread(target=self._record_audio)
+            # Capture sur un thread dédié : jamais en file derrière la lecture ou l'enregistrement
+            # d'un fichier sur l'exécuteur partagé, sinon le tampon du micro déborde
+            self.recording_thread = threading.Thread(target=self._record_audio, name='audio.capture')
             self.recording_thread.daemon = True
             self.recording_thread.start()
             
@@ -154,17 +397,37 @@ class AudioService:
             print(f"❌ Error starting recording: {e}")
             self.is_recording = False
             return False
+        finally:
+            with self._audio_lock:
+                self._opening = False
         
+    def _prepare_capture_processor(self):
+        """Create or reset the DSP stage for a new recording (keeps the learned noise floor)"""
+        noise_suppression, agc = AUDIO_DSP_MODES[self.dsp_mode]
+        if not (noise_suppression or agc) or self.channels != 1 or self.sample_format != PA_INT16:
+            self.capture_processor = None
+            return
+        processor = self.capture_processor
+        if processor is None or processor.rate != self.fs:
+            processor = CaptureProcessor(self.fs, noise_suppression=noise_suppression, agc=agc)
+        processor.reset()
+        self.capture_processor = processor
+    
     def _record_audio(self):
-        """Internal method to record audio in a separate thread"""
+        """Capture loop, run on its own thread until stop_recording"""
+        processor = self.capture_processor
         try:
             while self.is_recording:
                 data = self.stream.read(self.chunk, exception_on_overflow=False)
+                if processor is not None:
+                    data = processor.process(data)
                 self.frames.append(data)
+                self.level_meter.update(data)
         except Exception as e:
             print(f"❌ Error during recording: {e}")
             self.is_recording = False
         
+    @profiled('audio.stop_recording')
     def stop_recording(self):
         """Stop recording and save file"""
         if not self.is_recording:
@@ -174,9 +437,10 @@ class AudioService:
         try:
             self.is_recording = False
             
-            # Wait for recording thread to finish
+            # Wait for the capture thread to finish
             if self.recording_thread:
                 self.recording_thread.join(timeout=1.0)
+                self.recording_thread = None
             
             # Stop and close the stream
             if self.stream:
@@ -184,19 +448,36 @@ class AudioService:
                 self.stream.close()
                 self.stream = None
             
+            # Audio still held back by the STFT
+            if self.capture_processor is not None:
+                self.frames.append(self.capture_processor.flush())
+            
             # Generate filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"recording_{timestamp}.wav"
             file_path = os.path.join(self.recordings_dir, filename)
             
-            # Save the recorded data as a WAV file
-            with wave.open(file_path, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.sample_format))
-                wf.setframerate(self.fs)
-                wf.writeframes(b''.join(self.frames))
+            # Save the recorded chunks as a WAV file (written one by one, never joined in memory)
+            sample_width = self.audio.get_sample_size(self.sample_format)
+            data_size = write_wav(file_path, self.frames, self.fs, self.channels, sample_width)
+            
+            # Tables de crêtes calculées sur le fichier projeté en mémoire (aucune copie des échantillons)
+            try:
+                with AudioBuffer.from_wav(file_path) as recording:
+                    save_peaks(file_path, recording)
+            except Exception as e:
+                print(f"⚠️ Could not compute waveform peaks: {e}")
             
             self.current_recording = file_path
+            self.catalog.add(
+                file_path,
+                duration=data_size / float(sample_width * self.channels * self.fs),
+                sample_rate=self.fs,
+                channels=self.channels,
+                session_id=self.session_id
+            )
+            # Laisser la tâche de maintenance vérifier le quota disque
+            self._maintenance_wake.set()
             print(f"⏹️ Recording stopped and saved: {filename}")
             return file_path
             
@@ -206,7 +487,7 @@ class AudioService:
     
     def play_audio(self, file_path=None):
         """Play audio file"""
-        if not PYAUDIO_AVAILABLE or not self.audio:
+        if not self.audio:
             print("❌ Audio playback not available")
             return False
             
@@ -219,23 +500,22 @@ class AudioService:
             return False
             
         try:
-            # Open the audio file
-            with wave.open(file_path, 'rb') as wf:
+            with self._audio_lock:
+                self.is_playing = True
+            # Map the audio file and play it chunk by chunk from the mapping
+            with AudioBuffer.from_wav(file_path) as recording:
                 # Create a stream for playback
                 stream = self.audio.open(
-                    format=self.audio.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
+                    format=self.audio.get_format_from_width(SAMPLE_WIDTH),
+                    channels=recording.channels,
+                    rate=recording.rate,
                     output=True
                 )
                 
                 print(f"▶️ Playing audio: {os.path.basename(file_path)}")
                 
-                # Read and play the audio data
-                data = wf.readframes(self.chunk)
-                while data:
+                for data in recording.chunks(self.chunk):
                     stream.write(data)
-                    data = wf.readframes(self.chunk)
                 
                 # Stop and close the stream
                 stream.stop_stream()
@@ -247,7 +527,31 @@ class AudioService:
         except Exception as e:
             print(f"❌ Error playing audio: {e}")
             return False
+        finally:
+            self.is_playing = False
+        
+    def score_recording(self, reference_path, file_path=None, segments=5):
+        """
+        Score a recording's pronunciation against a reference clip
         
+        Args:
+            reference_path (str): Reference WAV for the same sentence
+            file_path (str): Learner recording (defaults to the current recording)
+            segments (int): Number of segments scored along the reference
+            
+        Returns:
+            dict: 'score' (0-100), per-segment scores and 'duration_ratio', or None on error
+        """
+        file_path = file_path or self.current_recording
+        if not file_path or not os.path.exists(file_path) or not os.path.exists(reference_path):
+            print("❌ Audio file not found")
+            return None
+        try:
+            return score_pronunciation(file_path, reference_path, segments=segments)
+        except Exception as e:
+            print(f"❌ Error scoring pronunciation: {e}")
+            return None
+    
     def get_recording_status(self):
         """Get current recording status"""
         duration = 0
@@ -258,35 +562,117 @@ class AudioService:
             'is_recording': self.is_recording,
             'duration': round(duration, 1),
             'current_file': self.current_recording,
-            'recordings_dir': self.recordings_dir
+            'recordings_dir': self.recordings_dir,
+            'level': self.level_meter.snapshot() if self.is_recording else None
         }
     
-    def list_recordings(self):
-        """List all saved recordings"""
-        if not os.path.exists(self.recordings_dir):
-            return []
+    def get_input_level(self):
+        """Current RMS/peak levels of the microphone (0.0 - 1.0) for a level meter"""
+        return self.level_meter.snapshot()
+    
+    def get_waveform(self, file_path=None, width=400):
+        """
+        Get min/max pairs to draw a recording's waveform
+        
+        Args:
+            file_path (str): Recording to draw (defaults to the current recording)
+            width (int): Number of horizontal buckets (usually pixels)
+            
+        Returns:
+            tuple: (mins, maxs) lists normalised to -1.0 - 1.0, empty if unavailable
+        """
+        file_path = file_path or self.current_recording
+        if not file_path or not os.path.exists(file_path):
+            return [], []
+        try:
+            levels = load_peaks(file_path)
+            return peaks_for_width(levels, width) if levels else ([], [])
+        except Exception as e:
+            print(f"❌ Error loading waveform: {e}")
+            return [], []
+    
+    def list_recordings(self, page=None, page_size=50, session_id=None):
+        """
+        List saved recordings, newest first
+        
+        Args:
+            page (int): Page number starting at 0, or None for every recording
+            page_size (int): Recordings per page
+            session_id (str): Only list recordings from this session
             
-        recordings = []
-        for filename in os.listdir(self.recordings_dir):
-            if filename.endswith('.wav'):
-                file_path = os.path.join(self.recordings_dir, filename)
-                file_info = {
-                    'filename': filename,
-                    'path': file_path,
-                    'size': os.path.getsize(file_path),
-                    'modified': os.path.getmtime(file_path)
-                }
-                recordings.append(file_info)
-        
-        # Sort by modification time (newest first)
-        recordings.sort(key=lambda x: x['modified'], reverse=True)
-        return recordings
+        Returns:
+            list: Recording dicts (filename, path, size, modified, duration, sample_rate, session_id)
+        """
+        if page is None and session_id is None:
+            return self.catalog.all()
+        return self.catalog.query(page=page or 0, page_size=page_size, session_id=session_id)
+    
+    def count_recordings(self, session_id=None):
+        """Number of saved recordings"""
+        return self.catalog.count(session_id=session_id)
+    
+    def start_catalog_maintenance(self, interval=CATALOG_MAINTENANCE_INTERVAL):
+        """Start the background task that reconciles the catalog and applies retention"""
+        if self._maintenance_thread and self._maintenance_thread.is_alive():
+            return
+        
+        self._maintenance_stop.clear()
+        self._maintenance_thread = threading.Thread(
+            target=self._catalog_maintenance,
+            args=(interval,)
+        )
+        self._maintenance_thread.daemon = True
+        self._maintenance_thread.start()
+    
+    def _catalog_maintenance(self, interval):
+        """Internal loop of the catalog maintenance thread"""
+        try:
+            changes = self.catalog.reconcile()
+            if any(changes.values()):
+                print(f"🗂️ Recordings catalog reconciled: {changes}")
+        except Exception as e:
+            print(f"⚠️ Error reconciling recordings catalog: {e}")
+        
+        while not self._maintenance_stop.is_set():
+            self.prune_recordings()
+            self._maintenance_wake.wait(interval)
+            self._maintenance_wake.clear()
+    
+    def prune_recordings(self, max_bytes=None, max_age=None):
+        """
+        Apply the retention policy (oldest recordings are deleted first)
+        
+        Nothing is deleted unless a limit is given or set with RECORDINGS_MAX_MB /
+        RECORDINGS_MAX_AGE_DAYS.
+        
+        Returns:
+            list: Paths of the deleted recordings
+        """
+        max_bytes = RECORDINGS_MAX_BYTES if max_bytes is None else max_bytes
+        max_age = RECORDINGS_MAX_AGE if max_age is None else max_age
+        if not (max_bytes or max_age):
+            return []
+        try:
+            deleted = self.catalog.prune(
+                max_bytes=max_bytes or None,
+                max_age=max_age or None,
+                protect=[self.current_recording]
+            )
+            if deleted:
+                print(f"🗑️ Retention policy removed {len(deleted)} recording(s)")
+            return deleted
+        except Exception as e:
+            print(f"⚠️ Error pruning recordings: {e}")
+            return []
     
     def delete_recording(self, file_path):
         """Delete a recording file"""
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
+                if os.path.exists(peaks_path(file_path)):
+                    os.remove(peaks_path(file_path))
+                self.catalog.remove(file_path)
                 if self.current_recording == file_path:
                     self.current_recording = None
                 print(f"🗑️ Recording deleted: {os.path.basename(file_path)}")
@@ -301,6 +687,12 @@ class AudioService:
     def cleanup(self):
         """Clean up audio resources"""
         try:
+            self.stop_device_monitor()
+            self._maintenance_stop.set()
+            self._maintenance_wake.set()
+            if self._maintenance_thread:
+                self._maintenance_thread.join(timeout=1.0)
+            
             if self.is_recording:
                 self.stop_recording()
                 
@@ -309,6 +701,8 @@ class AudioService:
                 
             if self.audio:
                 self.audio.terminate()
+            
+            self.catalog.close()
                 
             print("🧹 Audio service cleaned up")
         except Exception as e:
@@ -316,7 +710,7 @@ class AudioService:
     
     def get_available_devices(self):
         """Get list of available audio devices"""
-        if not PYAUDIO_AVAILABLE or not self.audio:
+        if not self.audio:
             return []
             
         devices = []
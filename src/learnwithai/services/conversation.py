@@ -0,0 +1,216 @@
+"""
+Conversation model for LearnwithAI
+Chat messages with stable ids so the transcript can update one message in place.
+Messages are compact slotted records; only the most recent ones stay in memory,
+older ones are spilled to a temporary file.
+"""
+
+import sys
+import json
+import time
+import tempfile
+import itertools
+from collections import deque
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Union
+
+# Messages gardés en mémoire ; les plus anciens partent sur disque
+DEFAULT_MAX_IN_MEMORY = 500
+
+USER_SENDER = "Vous"
+ASSISTANT_SENDER = "AI Assistant"
+TIP_SENDER = "💡 Conseil"
+
+_clock = (None, "")  # (minute, libellé HH:MM) : strftime une fois par minute
+
+
+def current_time_label() -> str:
+    """Current local time as HH:MM (the same string object within a minute)"""
+    global _clock
+    minute = int(time.time() // 60)
+    if _clock[0] != minute:
+        _clock = (minute, sys.intern(time.strftime("%H:%M")))
+    return _clock[1]
+
+
+class Role(Enum):
+    USER = "user"
+    ASSISTANT = "assistant"
+    TIP = "tip"
+    STATUS = "status"  # Messages de l'application (audio, erreurs...)
+
+    @property
+    def api_role(self) -> Optional[str]:
+        """Role in the chat completion API (None: not sent to the model)"""
+        return self.value if self in (Role.USER, Role.ASSISTANT) else None
+
+
+def role_for(sender: str, type: Optional[str] = None) -> Role:
+    """Role of a message from its sender label and optional type"""
+    if type == 'tip':
+        return Role.TIP
+    if sender == USER_SENDER:
+        return Role.USER
+    if sender == ASSISTANT_SENDER:
+        return Role.ASSISTANT
+    return Role.STATUS
+
+
+def api_role(entry: Union["ChatMessage", Dict]) -> Optional[str]:
+    """API role of a history entry (ChatMessage or legacy dict)"""
+    if isinstance(entry, ChatMessage):
+        return entry.role.api_role
+    return role_for(entry.get('sender', ''), entry.get('type')).api_role
+
+
+class ChatMessage:
+    __slots__ = ('id', 'role', 'sender', 'message', 'timestamp')
+
+    def __init__(self, id: int, sender: str, message: str, timestamp: Optional[str] = None,
+                 type: Optional[str] = None, role: Optional[Role] = None):
+        self.id = id
+        self.role = role or role_for(sender, type)
+        # Les expéditeurs sont quelques chaînes répétées : une seule copie en mémoire
+        self.sender = sys.intern(sender)
+        self.message = message
+        self.timestamp = timestamp or current_time_label()  # Heure d'envoi (HH:MM)
+
+    def __repr__(self) -> str:
+        return f"ChatMessage(id={self.id}, role={self.role.name}, sender={self.sender!r}, message={self.message!r})"
+
+    @property
+    def type(self) -> Optional[str]:
+        return 'tip' if self.role is Role.TIP else None
+
+    @property
+    def is_tip(self) -> bool:
+        return self.role is Role.TIP
+
+    def format(self) -> str:
+        """Text of this message as shown in the chat display"""
+        if self.is_tip:
+            return f"[{self.timestamp}] {TIP_SENDER}: {self.message}\n\n"
+        return f"[{self.timestamp}] {self.sender}: {self.message}\n\n"
+
+    def to_dict(self) -> Dict[str, str]:
+        """Legacy dict format"""
+        entry = {'sender': self.sender, 'message': self.message, 'timestamp': self.timestamp}
+        if self.type:
+            entry['type'] = self.type
+        return entry
+
+
+class Conversation:
+    def __init__(self, max_in_memory: int = DEFAULT_MAX_IN_MEMORY):
+        """
+        Ordered messages indexed by id
+
+        Args:
+            max_in_memory (int): Recent messages kept in memory; older ones are
+                                 written to a temporary file (still iterable)
+        """
+        self.max_in_memory = max_in_memory
+        self._messages = deque()
+        self._by_id: Dict[int, ChatMessage] = {}
+        self._ids = itertools.count(1)
+        self._spill = None
+        self._spilled = 0
+
+    def append(self, sender: str, message: str, type: Optional[str] = None) -> ChatMessage:
+        """Add a message at the end and return it"""
+        entry = ChatMessage(next(self._ids), sender, message, type=type)
+        self._messages.append(entry)
+        self._by_id[entry.id] = entry
+        if len(self._messages) > self.max_in_memory:
+            self._spill_oldest()
+        return entry
+
+    def _spill_oldest(self):
+        entry = self._messages.popleft()
+        del self._by_id[entry.id]
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile('w+', encoding='utf-8')
+        record = [entry.id, entry.role.value, entry.sender, entry.message, entry.timestamp]
+        self._spill.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._spilled += 1
+
+    def _iter_spilled(self) -> Iterator[ChatMessage]:
+        if self._spill is None:
+            return
+        self._spill.flush()
+        self._spill.seek(0)
+        lines = self._spill.readlines()
+        self._spill.seek(0, 2)
+        for line in lines:
+            message_id, role, sender, message, timestamp = json.loads(line)
+            yield ChatMessage(message_id, sender, message, timestamp, role=Role(role))
+
+    def get(self, message_id: int) -> Optional[ChatMessage]:
+        """Message by id (None once it has been spilled to disk)"""
+        return self._by_id.get(message_id)
+
+    def update(self, message_id: int, message: Optional[str] = None, sender: Optional[str] = None) -> ChatMessage:
+        """Change a message in place (e.g. replace the "Thinking..." placeholder)"""
+        entry = self._by_id[message_id]
+        if message is not None:
+            entry.message = message
+        if sender is not None:
+            entry.sender = sys.intern(sender)
+        return entry
+
+    def remove(self, message_id: int) -> Optional[ChatMessage]:
+        """Remove a message (O(1) for the last one, which is the usual case)"""
+        entry = self._by_id.pop(message_id, None)
+        if entry is None:
+            return None
+        if self._messages and self._messages[-1] is entry:
+            self._messages.pop()
+        else:
+            self._messages.remove(entry)
+        return entry
+
+    def last(self) -> Optional[ChatMessage]:
+        return self._messages[-1] if self._messages else None
+
+    def recent(self, limit: int) -> List[ChatMessage]:
+        """The `limit` most recent messages, oldest first"""
+        if limit <= 0:
+            return []
+        entries = list(itertools.islice(reversed(self._messages), limit))
+        entries.reverse()
+        return entries
+
+    def since(self, message_id: int) -> List[ChatMessage]:
+        """Messages newer than `message_id`, oldest first
+
+        Walks the in-memory tail backwards; the spill file is only read when
+        messages newer than `message_id` have already been spilled.
+        """
+        entries = []
+        for entry in reversed(self._messages):
+            if entry.id <= message_id:
+                break
+            entries.append(entry)
+        else:
+            # Toute la mémoire est plus récente : des messages plus anciens peuvent être sur disque
+            entries.extend(entry for entry in reversed(list(self._iter_spilled())) if entry.id > message_id)
+        entries.reverse()
+        return entries
+
+    def to_history(self, limit: int = 10) -> List[Dict[str, str]]:
+        """Most recent messages in the legacy dict format"""
+        return [entry.to_dict() for entry in self.recent(limit)]
+
+    def close(self):
+        """Drop the spill file"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._messages)
+
+    def __iter__(self) -> Iterator[ChatMessage]:
+        """All messages, oldest first (spilled ones are read back from disk)"""
+        yield from self._iter_spilled()
+        yield from list(self._messages)
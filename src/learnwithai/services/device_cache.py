@@ -0,0 +1,179 @@
+"""
+Audio device capability cache for LearnwithAI
+Keeps a per-device profile (name, host API, supported rates and channels) on disk
+so startup and record-start don't have to probe slow USB/Bluetooth devices again.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+# Taux testés par ordre de préférence (identique à l'ancien _detect_best_sample_rate)
+PREFERRED_SAMPLE_RATES = [44100, 48000, 22050, 16000, 8000]
+PROBED_CHANNELS = [1, 2]
+
+CACHE_VERSION = 1
+
+
+def device_key(device_info: Dict, host_api_name: str) -> str:
+    """
+    Build a stable key for a device
+
+    Device indexes change when devices are plugged in or out, so the cache is
+    keyed by host API and device name instead.
+    """
+    return f"{host_api_name}::{device_info.get('name', '')}"
+
+
+def probe_device(audio, device_info: Dict, host_api_name: str, sample_format,
+                 rates: Optional[List[int]] = None,
+                 channels: Optional[List[int]] = None) -> Dict:
+    """
+    Probe an input device with is_format_supported and build its capability profile
+
+    Args:
+        audio: PyAudio instance (or compatible backend)
+        device_info (dict): Result of get_device_info_by_index
+        host_api_name (str): Name of the device's host API
+        sample_format: PyAudio sample format to test
+        rates (list): Sample rates to test, in order of preference
+        channels (list): Channel counts to test
+
+    Returns:
+        dict: Capability profile
+    """
+    rates = rates or PREFERRED_SAMPLE_RATES
+    channels = channels or PROBED_CHANNELS
+    max_channels = int(device_info.get('maxInputChannels', 0))
+
+    supported_channels = []
+    supported_rates = []
+    for channel_count in channels:
+        if channel_count > max_channels:
+            continue
+        channel_rates = []
+        for rate in rates:
+            try:
+                if audio.is_format_supported(
+                    rate=rate,
+                    input_device=device_info['index'],
+                    input_channels=channel_count,
+                    input_format=sample_format
+                ):
+                    channel_rates.append(rate)
+            except Exception:
+                # PyAudio lève ValueError pour les formats non supportés
+                continue
+        if channel_rates:
+            supported_channels.append(channel_count)
+            # Les taux retenus sont ceux du mono (ou du premier nombre de canaux valide)
+            if not supported_rates:
+                supported_rates = channel_rates
+
+    return {
+        'name': device_info.get('name', ''),
+        'host_api': host_api_name,
+        'index': device_info['index'],
+        'max_input_channels': max_channels,
+        'default_sample_rate': int(device_info.get('defaultSampleRate', 0) or 0),
+        'supported_rates': supported_rates,
+        'supported_channels': supported_channels,
+        'probed_at': time.time()
+    }
+
+
+def best_sample_rate(profile: Dict, preferred: Optional[List[int]] = None) -> int:
+    """Pick the preferred sample rate from a profile, falling back to the device default"""
+    preferred = preferred or PREFERRED_SAMPLE_RATES
+    supported = profile.get('supported_rates') or []
+    for rate in preferred:
+        if rate in supported:
+            return rate
+    return profile.get('default_sample_rate') or 44100
+
+
+class DeviceCapabilityCache:
+    def __init__(self, cache_file: Optional[str] = None):
+        """Initialize the cache and load it from disk"""
+        self.cache_file = cache_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'resources', 'audio_devices.json'
+        )
+        self._lock = threading.Lock()
+        self.profiles = {}
+        self.default_input = None
+        self.load()
+
+    def load(self):
+        """Load cached profiles from disk (an unreadable cache is simply ignored)"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    with self._lock:
+                        self.profiles = data.get('devices', {})
+                        self.default_input = data.get('default_input')
+        except Exception as e:
+            print(f"⚠️ Could not read audio device cache: {e}")
+            self.profiles = {}
+            self.default_input = None
+
+    def save(self):
+        """Write the cache atomically so a crash never leaves a truncated file"""
+        with self._lock:
+            data = {
+                'version': CACHE_VERSION,
+                'default_input': self.default_input,
+                'devices': dict(self.profiles)
+            }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Could not write audio device cache: {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached profile for a device key"""
+        with self._lock:
+            return self.profiles.get(key)
+
+    def put(self, key: str, profile: Dict):
+        """Store a device profile"""
+        with self._lock:
+            self.profiles[key] = profile
+
+    def remove(self, key: str):
+        """Forget a device (e.g. after it was unplugged)"""
+        with self._lock:
+            self.profiles.pop(key, None)
+            if self.default_input == key:
+                self.default_input = None
+
+    def keys(self) -> List[str]:
+        """Keys of all cached devices"""
+        with self._lock:
+            return list(self.profiles.keys())
+
+    def set_default_input(self, key: Optional[str]):
+        """Remember which device was the default input at the last probe"""
+        with self._lock:
+            self.default_input = key
+
+    def get_default_profile(self) -> Optional[Dict]:
+        """Profile of the last known default input device"""
+        with self._lock:
+            if self.default_input is None:
+                return None
+            return self.profiles.get(self.default_input)
+
+    def is_stale(self, key: str, max_age: float) -> bool:
+        """True if the device has never been probed or its profile is older than max_age seconds"""
+        profile = self.get(key)
+        if not profile:
+            return True
+        return time.time() - profile.get('probed_at', 0) > max_age
@@ -0,0 +1,164 @@
+"""
+Learner error profile for LearnwithAI
+Classifies the model's correction tips into error categories and keeps
+time-decayed counters, so the system prompt can focus on recurring weaknesses.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Mots-clés repérés dans les conseils du modèle, par catégorie d'erreur
+CATEGORY_PATTERNS = {
+    'tense': r"\btenses?\b|\bpast\b|\bpresent (?:perfect|continuous|simple)\b|\bfuture\b|\bconjugat|\birregular verb|\bverb form|\bparticiple\b",
+    'articles': r"\barticles?\b|[\"'](?:a|an|the)[\"']",
+    'prepositions': r"\bprepositions?\b|[\"'](?:in|on|at|to|for|of|with|by|from|since|during)[\"']",
+    'agreement': r"\bagreement\b|\bsubject[- ]verb\b|\bthird person\b|\bplural\b|\bsingular\b",
+    'word_order': r"\bword order\b|\border of (?:the )?words\b|\bplacement\b",
+    'vocabulary': r"\bvocabulary\b|\bword choice\b|\bbetter word\b|\bmeans\b|\bsynonym|\bcollocation|\bidiom",
+    'spelling': r"\bspell(?:ing|ed)?\b|\btypo\b|\bmisspel",
+    'punctuation': r"\bpunctuation\b|\bcapital(?:ise|ize|ization|isation|s)?\b|\bcomma\b|\bapostrophe\b",
+}
+
+CATEGORY_LABELS = {
+    'tense': 'verb tenses',
+    'articles': 'articles (a/an/the)',
+    'prepositions': 'prepositions',
+    'agreement': 'subject-verb agreement and plurals',
+    'word_order': 'word order',
+    'vocabulary': 'word choice and vocabulary',
+    'spelling': 'spelling',
+    'punctuation': 'punctuation and capitalisation',
+}
+
+_COMPILED = {category: re.compile(pattern, re.IGNORECASE) for category, pattern in CATEGORY_PATTERNS.items()}
+
+HALF_LIFE = 7 * 24 * 3600  # Une erreur compte moitié moins au bout d'une semaine
+MIN_WEIGHT = 1.5  # En dessous, une catégorie n'est pas encore une faiblesse
+TOP_K = 3
+DECAY_EPOCH = 24 * 3600  # Le classement est recalculé au moins une fois par jour, même sans nouveau conseil
+
+
+def classify_tip(tip: str) -> List[str]:
+    """Error categories mentioned in a correction tip"""
+    return [category for category, pattern in _COMPILED.items() if pattern.search(tip)]
+
+
+class ErrorProfile:
+    def __init__(self, profile_file: Optional[str] = None, half_life: float = HALF_LIFE):
+        """Decayed error counters, loaded from disk if available"""
+        self.profile_file = profile_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'resources', 'error_profile.json'
+        )
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Tuple[float, float]] = {}  # category -> (weight, last update)
+        self._top: Tuple[str, ...] = ()
+        self._epoch = None  # Jour du dernier calcul du classement
+        self._addendum = ""
+        self.dirty = False
+        self.load()
+
+    def _decayed(self, weight: float, updated: float, now: float) -> float:
+        return weight * math.pow(0.5, (now - updated) / self.half_life)
+
+    def weight(self, category: str, now: Optional[float] = None) -> float:
+        """Current (decayed) weight of a category"""
+        now = time.time() if now is None else now
+        weight, updated = self.counters.get(category, (0.0, now))
+        return self._decayed(weight, updated, now)
+
+    def record(self, tip: str, now: Optional[float] = None) -> List[str]:
+        """
+        Classify a tip and update the counters
+
+        Only the counters of the matched categories are touched (decay is
+        applied lazily from their last update time), so no history is rescanned.
+
+        Returns:
+            list: Categories found in the tip
+        """
+        if not tip or not tip.strip():
+            return []
+        now = time.time() if now is None else now
+        categories = classify_tip(tip)
+        if not categories:
+            return []
+
+        with self._lock:
+            for category in categories:
+                self.counters[category] = (self.weight(category, now) + 1.0, now)
+            self.dirty = True
+            self._refresh_addendum(now)
+        return categories
+
+    def top_weaknesses(self, k: int = TOP_K, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The k heaviest categories above MIN_WEIGHT, heaviest first"""
+        now = time.time() if now is None else now
+        weights = [(category, self.weight(category, now)) for category in self.counters]
+        weights = [item for item in weights if item[1] >= MIN_WEIGHT]
+        weights.sort(key=lambda item: item[1], reverse=True)
+        return weights[:k]
+
+    def _refresh_addendum(self, now: float):
+        self._epoch = int(now // DECAY_EPOCH)
+        top = tuple(category for category, _ in self.top_weaknesses(now=now))
+        if top == self._top:
+            return
+        # Le texte n'est reconstruit que lorsque le classement change
+        self._top = top
+        if not top:
+            self._addendum = ""
+        else:
+            labels = ", ".join(CATEGORY_LABELS[category] for category in top)
+            self._addendum = (
+                "\nLearner profile: this student often makes mistakes with "
+                f"{labels}. Watch for these in particular and explain them briefly in 'tips'.\n"
+            )
+
+    def prompt_addendum(self, now: Optional[float] = None) -> str:
+        """Cached addendum for the system prompt ("" when nothing stands out yet)
+
+        The cache is keyed by the day, so weaknesses that decayed below the
+        threshold drop out even when no new tip is recorded.
+        """
+        now = time.time() if now is None else now
+        if int(now // DECAY_EPOCH) != self._epoch:
+            with self._lock:
+                self._refresh_addendum(now)
+        return self._addendum
+
+    def load(self):
+        """Load counters from disk"""
+        try:
+            if os.path.exists(self.profile_file):
+                with open(self.profile_file, 'r') as f:
+                    data = json.load(f)
+                self.counters = {
+                    category: (float(weight), float(updated))
+                    for category, (weight, updated) in data.get('counters', {}).items()
+                    if category in CATEGORY_PATTERNS
+                }
+        except Exception as e:
+            print(f"Error loading error profile: {e}")
+            self.counters = {}
+        self._refresh_addendum(time.time())
+
+    def save(self):
+        """Save counters to disk"""
+        with self._lock:
+            data = {'counters': {category: list(value) for category, value in self.counters.items()}}
+            self.dirty = False
+        try:
+            # Écriture dans un fichier temporaire puis remplacement atomique
+            tmp_path = self.profile_file + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, self.profile_file)
+        except Exception as e:
+            self.dirty = True
+            print(f"❌ Error saving error profile: {e}")
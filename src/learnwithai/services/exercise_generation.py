@@ -0,0 +1,104 @@
+"""
+Exercise batches for LearnwithAI
+Plans the exercises requested in one completion, then validates and splits the
+model's reply so only the items that failed need to be requested again.
+"""
+
+import re
+import json
+from typing import Dict, List, Optional, Tuple
+
+from ..prompts.teaching_prompts import EXERCISE_KINDS
+
+DEFAULT_KINDS = ("fill_blank", "translation", "qa")
+MAX_FIELD_LENGTH = 500
+BLANK_RE = re.compile(r"_{2,}")
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def plan_slots(count: int, kinds: Optional[List[str]] = None) -> List[str]:
+    """Kind of each of the `count` exercises, cycling through `kinds`"""
+    kinds = [kind for kind in (kinds or DEFAULT_KINDS) if kind in EXERCISE_KINDS] or list(DEFAULT_KINDS)
+    return [kinds[i % len(kinds)] for i in range(count)]
+
+
+def validate_exercise(item, kind: Optional[str] = None) -> Optional[Dict]:
+    """
+    Check one generated exercise
+
+    Returns:
+        dict: Normalised exercise ('type', 'question', 'answer'), or None if invalid
+    """
+    if not isinstance(item, dict):
+        return None
+    item_kind = str(item.get('type', kind or '')).strip().lower()
+    question = item.get('question')
+    answer = item.get('answer')
+    if item_kind not in EXERCISE_KINDS or (kind and item_kind != kind):
+        return None
+    if not isinstance(question, str) or not isinstance(answer, str):
+        return None
+    question, answer = question.strip(), answer.strip()
+    if not question or not answer or len(question) > MAX_FIELD_LENGTH or len(answer) > MAX_FIELD_LENGTH:
+        return None
+    if item_kind == 'fill_blank' and not BLANK_RE.search(question):
+        return None
+    return {'type': item_kind, 'question': question, 'answer': answer}
+
+
+def parse_exercises(content: str) -> list:
+    """Raw exercise list from a completion ([] if it is not the expected JSON)"""
+    if not content:
+        return []
+    match = _JSON_RE.search(content)
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+    if isinstance(data, dict):
+        data = data.get('exercises', [data] if 'question' in data else [])
+    return data if isinstance(data, list) else []
+
+
+def split_exercises(content: str, slots: List[str], seen: Optional[set] = None) -> Tuple[List[Optional[Dict]], List[int]]:
+    """
+    Assign the valid items of a reply to the requested slots
+
+    Items are matched by kind in reply order, so a missing or malformed item
+    only invalidates its own slot. Duplicate questions are rejected.
+
+    Args:
+        content (str): Completion text
+        slots (list): Requested kind of each exercise
+        seen (set): Lower-cased questions already accepted (updated in place)
+
+    Returns:
+        tuple: (exercise or None for each slot, indexes of the failed slots)
+    """
+    seen = set() if seen is None else seen
+    in_reply = set()
+    valid_by_kind: Dict[str, List[Dict]] = {}
+    for item in parse_exercises(content):
+        exercise = validate_exercise(item)
+        if exercise is None:
+            continue
+        key = exercise['question'].lower()
+        if key in seen or key in in_reply:
+            continue
+        in_reply.add(key)
+        valid_by_kind.setdefault(exercise['type'], []).append(exercise)
+
+    results: List[Optional[Dict]] = []
+    failed = []
+    for index, kind in enumerate(slots):
+        candidates = valid_by_kind.get(kind)
+        if candidates:
+            exercise = candidates.pop(0)
+            seen.add(exercise['question'].lower())
+            results.append(exercise)
+        else:
+            results.append(None)
+            failed.append(index)
+    return results, failed
@@ -0,0 +1,302 @@
+"""
+Exercise prefetching for LearnwithAI
+Predicts the next lessons from the learner's level and progress and generates
+their exercises while the chat is idle, so opening a lesson needs no wait.
+"""
+
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .task_executor import LANE_BACKGROUND, QueueFull, default_executor
+
+DEFAULT_MAX_LESSONS = 100
+DEFAULT_TTL = 3 * 24 * 3600  # Les exercices générés restent valables 3 jours
+LOOKAHEAD = 3
+IDLE_CHECK_SECONDS = 0.5  # Attente d'inactivité par tranches, pour voir l'annulation à temps
+
+# Niveaux de la file : leçons demandées par l'apprenant avant les leçons prédites
+TIER_URGENT = 0
+TIER_PREDICTED = 1
+
+
+class ExerciseStore:
+    def __init__(self, store_file: Optional[str] = None, max_lessons: int = DEFAULT_MAX_LESSONS,
+                 ttl: float = DEFAULT_TTL):
+        """Bounded LRU store of generated exercises with a time-to-live, plus the lessons completed"""
+        self.store_file = store_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'resources', 'exercise_cache.json'
+        )
+        self.max_lessons = max_lessons
+        self.ttl = ttl
+        self._items = OrderedDict()  # lesson key -> (created, exercises)
+        self.completed = set()  # ids of lessons the learner has opened
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[List[Dict]]:
+        """Fresh exercises for a lesson, or None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or now - item[0] > self.ttl:
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def contains_fresh(self, key: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        with self._lock:
+            item = self._items.get(key)
+            return item is not None and now - item[0] <= self.ttl
+
+    def put(self, key: str, exercises: List[Dict], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._items[key] = (now, exercises)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_lessons:
+                self._items.popitem(last=False)
+            self.dirty = True
+
+    def mark_completed(self, lesson_id: int):
+        with self._lock:
+            if lesson_id not in self.completed:
+                self.completed.add(lesson_id)
+                self.dirty = True
+
+    def load(self):
+        """Read the store from disk, dropping expired entries
+
+        Entries added while the file was being read are kept (they are newer).
+        """
+        if not os.path.exists(self.store_file):
+            return
+        try:
+            with open(self.store_file, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            with self._lock:
+                # Les entrées lues sont plus anciennes que celles déjà en mémoire : en tête de l'ordre LRU
+                for key, created, exercises in reversed(data.get('items', [])):
+                    if now - created <= self.ttl and key not in self._items:
+                        self._items[key] = (created, exercises)
+                        self._items.move_to_end(key, last=False)
+                while len(self._items) > self.max_lessons:
+                    self._items.popitem(last=False)
+                self.completed.update(data.get('completed', []))
+        except Exception as e:
+            print(f"Error loading exercise store: {e}")
+
+    def load_in_background(self, executor=None, on_done: Optional[Callable[[], None]] = None):
+        """Read the store on the background lane so startup does no file I/O
+
+        Args:
+            executor: TaskExecutor to use (defaults to the shared one)
+            on_done: Called once the store is loaded (on the UI loop when one is bound)
+
+        Returns:
+            Task: The load task (None if the lane could not take it and the store
+                  was loaded on this thread)
+        """
+        try:
+            return (executor or default_executor()).submit(
+                self.load, lane=LANE_BACKGROUND, name='exercises.load',
+                on_done=(lambda _: on_done()) if on_done else None
+            )
+        except (QueueFull, RuntimeError) as e:
+            print(f"⚠️ Exercise store loaded in the foreground: {e}")
+            self.load()
+            if on_done:
+                on_done()
+            return None
+
+    def save(self):
+        """Write the store to disk"""
+        with self._lock:
+            items = [[key, created, exercises] for key, (created, exercises) in self._items.items()]
+            data = {'completed': sorted(self.completed), 'items': items}
+            self.dirty = False
+        try:
+            # Écriture dans un fichier temporaire puis remplacement atomique
+            tmp_path = self.store_file + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.store_file)
+        except Exception as e:
+            self.dirty = True
+            print(f"❌ Error saving exercise store: {e}")
+
+
+def lesson_key(lesson: Dict) -> str:
+    """Store key of a lesson (pack id when available, else its title)"""
+    return str(lesson.get('id', lesson.get('title', '')))
+
+
+def predict_next_lessons(lesson_ids: Sequence[int], completed: Iterable[int], count: int = LOOKAHEAD) -> List[int]:
+    """
+    Predict the next lessons of a level
+
+    Lessons are taken in course order, starting after the furthest lesson the
+    learner has completed in this level and wrapping around to the ones skipped.
+
+    Args:
+        lesson_ids: Ids of the level's lessons, in course order
+        completed: Ids of completed lessons
+        count (int): Number of lessons to predict
+    """
+    completed = set(completed)
+    start = 0
+    for position in range(len(lesson_ids) - 1, -1, -1):
+        if lesson_ids[position] in completed:
+            start = position + 1
+            break
+
+    predicted = []
+    for position in itertools.chain(range(start, len(lesson_ids)), range(0, start)):
+        lesson_id = lesson_ids[position]
+        if lesson_id not in completed:
+            predicted.append(lesson_id)
+            if len(predicted) == count:
+                break
+    return predicted
+
+
+class ExercisePrefetcher:
+    def __init__(self, generate: Callable[[Dict], List[Dict]], store: ExerciseStore,
+                 wait_until_idle: Optional[Callable[..., bool]] = None, executor=None):
+        """
+        Args:
+            generate: Callable returning the exercises of a lesson (AIChatService.generate_exercises)
+            store (ExerciseStore): Where generated exercises are kept
+            wait_until_idle: Blocks until interactive work is done, False after `timeout`
+                             seconds (AIChatService.wait_until_idle)
+            executor: TaskExecutor whose background lane runs the generation (defaults to the shared one)
+        """
+        self.generate = generate
+        self.store = store
+        self.wait_until_idle = wait_until_idle or (lambda timeout=None: True)
+        self.executor = executor or default_executor()
+        self._queue = []  # (tier, rank, order, lesson)
+        self._queued_keys = set()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = True
+        self._task = None  # Tâche en cours sur la voie de fond (une leçon à la fois)
+
+    def start(self):
+        """Start generating queued lessons on the background lane"""
+        with self._lock:
+            self._stop = False
+            self._kick()
+
+    def stop(self):
+        with self._lock:
+            self._stop = True
+            if self._task is not None:
+                self._task.cancel()
+
+    def _kick(self):
+        """Submit the next lesson if nothing is running (lock held)"""
+        if self._stop or not self._queue or (self._task is not None and not self._task.done):
+            return
+        try:
+            self._task = self.executor.submit(self._run_next, lane=LANE_BACKGROUND,
+                                              name='prefetch.exercises', with_token=True)
+        except (QueueFull, RuntimeError) as e:
+            self._task = None
+            print(f"⚠️ Exercise prefetch postponed: {e}")
+
+    def schedule(self, lessons: List[Dict], urgent: bool = False):
+        """
+        Queue lessons for prefetching, most likely first
+        
+        Args:
+            lessons (list): Lessons in order of likelihood
+            urgent (bool): The learner is waiting for them: they go before every
+                           predicted lesson, the latest request first
+        """
+        with self._lock:
+            for position, lesson in enumerate(lessons):
+                key = lesson_key(lesson)
+                if self.store.contains_fresh(key):
+                    continue
+                order = next(self._order)
+                if key in self._queued_keys:
+                    if not urgent:
+                        continue
+                    # Déjà prédite : la remonter dans le niveau urgent
+                    self._queue = [entry for entry in self._queue if lesson_key(entry[-1]) != key]
+                    heapq.heapify(self._queue)
+                self._queued_keys.add(key)
+                # Urgent : rang décroissant, la dernière demande passe devant les précédentes
+                entry = (TIER_URGENT, -order, order, lesson) if urgent else (TIER_PREDICTED, position, order, lesson)
+                heapq.heappush(self._queue, entry)
+            self._kick()
+
+    def prefetch_next(self, pack, level: str, count: int = LOOKAHEAD) -> List[int]:
+        """Predict the next lessons of a level and queue them"""
+        catalog = pack.level_catalog(level)
+        # Les identifiants d'un niveau sont contigus : aucun titre n'est décodé
+        lesson_ids = range(catalog.first, catalog.first + len(catalog))
+        predicted = predict_next_lessons(lesson_ids, self.store.completed, count)
+        self.schedule([pack.get_lesson(lesson_id) for lesson_id in predicted])
+        return predicted
+
+    def get_exercises(self, lesson: Dict) -> Optional[List[Dict]]:
+        """Prefetched exercises of a lesson, or None (the lesson is then queued first)"""
+        exercises = self.store.get(lesson_key(lesson))
+        if exercises is None:
+            self.schedule([lesson], urgent=True)
+        return exercises
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def _run_next(self, token):
+        """Generate the most likely lesson, then queue the next one (one lesson per task)"""
+        with self._lock:
+            if self._stop or not self._queue:
+                return
+            entry = heapq.heappop(self._queue)
+
+        lesson = entry[-1]
+        key = lesson_key(lesson)
+        cancelled = False
+        try:
+            # Passer derrière le chat : attendre qu'aucune requête interactive ne tourne
+            while not token.cancelled and not self.wait_until_idle(timeout=IDLE_CHECK_SECONDS):
+                pass
+            cancelled = token.cancelled
+            if not cancelled and not self.store.contains_fresh(key):
+                exercises = self.generate(lesson)
+                if exercises:
+                    self.store.put(key, exercises)
+                    print(f"📦 Prefetched {len(exercises)} exercise(s) for: {lesson.get('title', key)}")
+        except Exception as e:
+            print(f"⚠️ Error prefetching exercises: {e}")
+        finally:
+            with self._lock:
+                if cancelled:
+                    # Arrêtée pendant l'attente : la leçon reste en file pour le prochain start()
+                    heapq.heappush(self._queue, entry)
+                else:
+                    self._queued_keys.discard(key)
+                # Rendre la main entre deux leçons : le travail plus prioritaire passe entre-temps
+                self._task = None
+                self._kick()
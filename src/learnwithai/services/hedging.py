@@ -0,0 +1,188 @@
+"""
+Hedged chat completions for LearnwithAI
+A request that has not streamed its first token within an adaptive threshold
+(rolling p90 of first-token latency) gets a duplicate on a second model or API
+key. The first reply to complete wins and the other is cancelled, closing its
+response even before its first token. Hedges are capped to a fraction of
+requests so quota use stays bounded, and attempts run on a bounded pool.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+WINDOW = 200  # Dernières requêtes prises en compte
+MIN_SAMPLES = 20  # En dessous, le seuil par défaut est utilisé
+DEFAULT_DELAY = 1.0
+MIN_DELAY = 0.2
+MAX_DELAY = 5.0
+MAX_HEDGE_RATE = 0.1  # Au plus 10% de requêtes doublées
+MAX_WORKERS = 8  # Tentatives simultanées (principales et doublons)
+
+# Une tentative : start(cancellation, on_first_token) -> texte de la réponse
+Attempt = Callable[["Cancellation", Callable[[], None]], str]
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * (len(ordered) - 1)))]
+
+
+class Cancellation(threading.Event):
+    """Cancel event of one attempt, which also closes the attempt's open response"""
+
+    def __init__(self):
+        super().__init__()
+        self._closers_lock = threading.Lock()
+        self._closers = []
+
+    def on_cancel(self, close: Callable[[], None]):
+        """Call `close` when the attempt is cancelled (right away if it already is)"""
+        with self._closers_lock:
+            if not self.is_set():
+                self._closers.append(close)
+                return
+        _close_quietly(close)
+
+    def set(self):
+        with self._closers_lock:
+            super().set()
+            closers, self._closers = self._closers, []
+        for close in closers:
+            _close_quietly(close)
+
+
+def _close_quietly(close):
+    try:
+        close()
+    except Exception as e:
+        print(f"⚠️ Error closing cancelled completion: {e}")
+
+
+class HedgedCompleter:
+    def __init__(self, percentile: float = 0.9, max_hedge_rate: float = MAX_HEDGE_RATE,
+                 default_delay: float = DEFAULT_DELAY, min_delay: float = MIN_DELAY, max_delay: float = MAX_DELAY,
+                 max_workers: int = MAX_WORKERS):
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._first_token = deque(maxlen=WINDOW)
+        self._latencies = deque(maxlen=WINDOW)
+        self._hedged = deque(maxlen=WINDOW)  # une entrée par requête : doublée ou non
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedging')
+
+    def threshold(self) -> float:
+        """Seconds to wait for the first token before hedging"""
+        with self._lock:
+            if len(self._first_token) < MIN_SAMPLES:
+                return self.default_delay
+            delay = _percentile(self._first_token, self.percentile)
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            recent = len(self._hedged)
+            return recent == 0 or (sum(self._hedged) + 1) / (recent + 1) <= self.max_hedge_rate
+
+    def complete(self, primary: Attempt, hedge: Optional[Attempt] = None) -> str:
+        """
+        Run `primary`, duplicating it with `hedge` if its first token is late
+
+        Returns:
+            str: Reply of the first attempt to finish successfully
+
+        Raises:
+            Exception: The last error when every attempt failed
+        """
+        started = time.perf_counter()
+        results = queue.Queue()
+        attempts = []
+        progress = threading.Event()  # premier token ou fin de la requête principale
+
+        def launch(name, attempt):
+            cancel = Cancellation()
+            first_token = threading.Event()
+
+            def on_first_token():
+                if not first_token.is_set():
+                    first_token.set()
+                    progress.set()
+                    if name == 'primary':
+                        with self._lock:
+                            self._first_token.append(time.perf_counter() - started)
+
+            def run():
+                try:
+                    results.put((name, attempt(cancel, on_first_token), None))
+                except Exception as e:
+                    results.put((name, None, e))
+                finally:
+                    progress.set()
+
+            attempts.append((name, cancel, self._pool.submit(run)))
+            return first_token
+
+        primary_first_token = launch('primary', primary)
+        hedged = False
+        if hedge is not None and not progress.wait(self.threshold()) and self._allow_hedge():
+            hedged = True
+            launch('hedge', hedge)
+
+        winner, content, error = None, None, None
+        for _ in range(len(attempts)):
+            name, content, error = results.get()
+            if error is None:
+                winner = name
+                break
+            print(f"⚠️ {name} completion failed: {error}")
+            # Tant qu'une autre tentative tourne, on l'attend
+
+        # Annuler la tentative perdante : retirée du pool si elle n'a pas démarré, sinon sa réponse est fermée
+        for name, cancel, future in attempts:
+            if name != winner:
+                cancel.set()
+                future.cancel()
+
+        with self._lock:
+            self.requests += 1
+            self._hedged.append(hedged)
+            if hedged:
+                self.hedges += 1
+                if winner == 'hedge':
+                    self.hedge_wins += 1
+            if winner is not None:
+                self._latencies.append(time.perf_counter() - started)
+            if not primary_first_token.is_set():
+                # Requête principale abandonnée sans token : compter au moins le temps écoulé
+                self._first_token.append(time.perf_counter() - started)
+
+        if winner is None:
+            raise error
+        return content
+
+    def stats(self) -> Dict:
+        """Hedge rate, hedge win rate and latency percentiles (ms) over the recent window"""
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = {
+                'requests': self.requests,
+                'hedge_rate': round(self.hedges / self.requests, 3) if self.requests else 0.0,
+                'hedge_win_rate': round(self.hedge_wins / self.hedges, 3) if self.hedges else 0.0,
+            }
+        stats['threshold_ms'] = round(self.threshold() * 1000, 1)
+        for label, fraction in (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99)):
+            stats[label] = round(_percentile(latencies, fraction) * 1000, 1) if latencies else 0.0
+        return stats
+
+    def shutdown(self):
+        """Cancel the attempts still queued and stop the pool's threads once they are idle"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
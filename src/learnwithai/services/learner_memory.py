@@ -0,0 +1,336 @@
+"""
+Long-term learner memory for LearnwithAI
+Compact facts, session summaries and recurring corrections from past sessions,
+embedded with a local hashed-feature encoder (no model download, no API call).
+The memories closest to the current message are found with one matrix-vector
+product and added to the system prompt within a fixed token budget.
+"""
+
+import os
+import re
+import time
+import zlib
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+from .conversation import Role
+
+DIMENSIONS = 256
+MAX_ITEMS = 50000
+TOP_K = 5
+MIN_SCORE = 0.2  # Similarité cosinus minimale pour qu'un souvenir soit jugé pertinent
+DUPLICATE_SCORE = 0.92  # Au-delà, un nouveau souvenir rafraîchit l'ancien au lieu de s'ajouter
+TOKEN_BUDGET = 150
+RECENCY_WEIGHT = 0.1  # Bonus maximal d'un souvenir récent
+RECENCY_HALF_LIFE = 30 * 24 * 3600
+
+# Types de souvenirs
+KIND_FACT = 0
+KIND_SUMMARY = 1
+KIND_TIP = 2
+KIND_NAMES = {KIND_FACT: 'fact', KIND_SUMMARY: 'summary', KIND_TIP: 'tip'}
+
+PROMPT_HEADER = "\nWhat you remember about this learner from previous sessions (use it naturally, do not list it):\n"
+
+_WORD_RE = re.compile(r"[a-zà-ÿ0-9']+")
+# Phrases où l'élève parle de lui : conservées comme faits
+_FACT_RE = re.compile(
+    r"\b(?:i am|i'm|im|my|i live|i work|i study|i like|i love|i hate|i have|i've|i want|i need|"
+    r"i usually|i often|i was born|i speak|i'm learning|mine)\b",
+    re.IGNORECASE
+)
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]?")
+STOPWORDS = frozenset((
+    "the", "a", "an", "and", "or", "but", "is", "are", "was", "were", "be", "been", "to", "of", "in",
+    "on", "at", "for", "with", "it", "this", "that", "i", "you", "he", "she", "we", "they", "my",
+    "your", "me", "do", "did", "does", "have", "has", "had", "not", "so", "very", "what", "how",
+    "can", "yes", "no", "im", "i'm", "its", "it's", "there", "about", "would", "like", "just",
+    "really", "some", "from", "will", "go", "went", "goed", "get", "got", "too", "also", "then",
+))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class HashedEncoder:
+    def __init__(self, dimensions: int = DIMENSIONS):
+        """
+        Signed feature hashing of words, word bigrams and character trigrams
+
+        Stable across runs (crc32, not Python's salted hash) so stored vectors
+        stay comparable with new queries.
+        """
+        self.dimensions = dimensions
+
+    def features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = [f"w:{word}" for word in words if word not in STOPWORDS]
+        features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        # Trigrammes de caractères : "goed" et "go", "studies" et "studying" se rapprochent
+        for word in words:
+            padded = f"#{word}#"
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def encode(self, text: str) -> "np.ndarray":
+        """Unit-length vector of a text (all zeros when it has no features)"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        counts = Counter(self.features(text))
+        for feature, count in counts.items():
+            h = zlib.crc32(feature.encode('utf-8'))
+            weight = 1.0 + np.log(count)
+            # Un bit du hash donne le signe : les collisions se compensent en moyenne
+            vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+def extract_memories(messages: Iterable, now: Optional[float] = None) -> List[Tuple[int, str]]:
+    """
+    Compact memories from one session's messages (ChatMessage objects)
+
+    - facts: learner sentences about themselves ("I work as a nurse")
+    - tips: the corrections the learner received
+    - one summary: date and the topics talked about most
+
+    Returns:
+        list: (kind, text) pairs
+    """
+    now = time.time() if now is None else now
+    memories = []
+    topics = Counter()
+    learner_turns = 0
+    for entry in messages:
+        if entry.role is Role.USER:
+            learner_turns += 1
+            for sentence in _SENTENCE_RE.findall(entry.message):
+                sentence = sentence.strip()
+                if len(sentence) > 8 and _FACT_RE.search(sentence):
+                    memories.append((KIND_FACT, f"The learner said: \"{sentence[:200]}\""))
+            topics.update(word for word in _WORD_RE.findall(entry.message.lower())
+                          if word not in STOPWORDS and len(word) > 3)
+        elif entry.role is Role.TIP:
+            memories.append((KIND_TIP, f"Correction given: {entry.message[:200]}"))
+
+    if learner_turns:
+        subjects = ", ".join(word for word, _ in topics.most_common(5))
+        day = time.strftime("%Y-%m-%d", time.localtime(now))
+        summary = f"Session on {day}: {learner_turns} messages from the learner"
+        memories.append((KIND_SUMMARY, summary + (f", about {subjects}." if subjects else ".")))
+    return memories
+
+
+class LearnerMemory:
+    def __init__(self, store_file: Optional[str] = None, dimensions: int = DIMENSIONS,
+                 max_items: int = MAX_ITEMS):
+        """Embedding store of past-session memories, loaded from disk if available"""
+        self.store_file = store_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'resources', 'learner_memory.npz'
+        )
+        self.encoder = HashedEncoder(dimensions)
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)  # capacité >= nombre de souvenirs
+        self._created = np.zeros(0, dtype=np.float64)
+        self._kinds = np.zeros(0, dtype=np.int8)
+        self.texts: List[str] = []
+        self.dirty = False
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _reserve(self, count: int):
+        """Grow the arrays geometrically so adding stays amortised O(1) (lock held)"""
+        if count <= self._vectors.shape[0]:
+            return
+        capacity = max(count, 2 * self._vectors.shape[0], 64)
+        for name in ('_vectors', '_created', '_kinds'):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:old.shape[0]] = old
+            setattr(self, name, grown)
+
+    def _evict(self):
+        """Drop the oldest tenth of the memories once the store is full (lock held)"""
+        size = len(self.texts)
+        drop = max(1, self.max_items // 10)
+        keep = np.sort(np.argsort(self._created[:size], kind='stable')[drop:])
+        self._vectors[:keep.size] = self._vectors[keep]
+        self._created[:keep.size] = self._created[keep]
+        self._kinds[:keep.size] = self._kinds[keep]
+        self.texts = [self.texts[i] for i in keep]
+
+    def add(self, text: str, kind: int = KIND_FACT, now: Optional[float] = None) -> bool:
+        """
+        Remember a text
+
+        A near-duplicate of an existing memory only refreshes its date.
+
+        Returns:
+            bool: True if a new memory was stored
+        """
+        text = text.strip()
+        if not text:
+            return False
+        now = time.time() if now is None else now
+        vector = self.encoder.encode(text)
+        with self._lock:
+            size = len(self.texts)
+            if size:
+                scores = self._vectors[:size] @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= DUPLICATE_SCORE:
+                    self._created[best] = now
+                    self.dirty = True
+                    return False
+            if size >= self.max_items:
+                self._evict()
+                size = len(self.texts)
+            self._reserve(size + 1)
+            self._vectors[size] = vector
+            self._created[size] = now
+            self._kinds[size] = kind
+            self.texts.append(text)
+            self.dirty = True
+        return True
+
+    def add_many(self, items: Iterable[Tuple[int, str]], now: Optional[float] = None) -> int:
+        """
+        Remember many (kind, text) pairs at once (imports, benchmarks)
+
+        Duplicates of stored memories are dropped with one matrix product;
+        duplicates inside the batch itself are not checked.
+
+        Returns:
+            int: Number of new memories
+        """
+        now = time.time() if now is None else now
+        items = [(kind, text.strip()) for kind, text in items if text.strip()]
+        if not items:
+            return 0
+        vectors = np.stack([self.encoder.encode(text) for _, text in items])
+        with self._lock:
+            size = len(self.texts)
+            if size:
+                keep = (vectors @ self._vectors[:size].T).max(axis=1) < DUPLICATE_SCORE
+                vectors = vectors[keep]
+                items = [item for item, kept in zip(items, keep) if kept]
+            items, vectors = items[:self.max_items], vectors[:self.max_items]
+            while size + len(items) > self.max_items:
+                self._evict()
+                size = len(self.texts)
+            self._reserve(size + len(items))
+            self._vectors[size:size + len(items)] = vectors
+            self._created[size:size + len(items)] = now
+            self._kinds[size:size + len(items)] = [kind for kind, _ in items]
+            self.texts.extend(text for _, text in items)
+            self.dirty = self.dirty or bool(items)
+        return len(items)
+
+    def remember_session(self, messages: Iterable, now: Optional[float] = None) -> int:
+        """Extract and store the memories of a finished session; returns how many are new"""
+        return sum(self.add(text, kind, now) for kind, text in extract_memories(messages, now))
+
+    def search(self, query: str, k: int = TOP_K, min_score: float = MIN_SCORE,
+               now: Optional[float] = None) -> List[Tuple[float, str]]:
+        """
+        Memories most similar to a query
+
+        Cosine similarity (vectors are unit length, so one matrix-vector
+        product), plus a small bonus for recent memories.
+
+        Returns:
+            list: (score, text), best first
+        """
+        vector = self.encoder.encode(query)
+        with self._lock:
+            size = len(self.texts)
+            if not size or not vector.any():
+                return []
+            similarity = self._vectors[:size] @ vector
+            now = time.time() if now is None else now
+            age = np.maximum(now - self._created[:size], 0.0)
+            scores = similarity + RECENCY_WEIGHT * np.exp2(-age / RECENCY_HALF_LIFE) * (similarity >= min_score)
+            k = min(k, size)
+            # Sélection partielle O(n), puis tri des k meilleurs seulement
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.texts[i]) for i in top if similarity[i] >= min_score]
+
+    def prompt_addendum(self, query: str, token_budget: int = TOKEN_BUDGET, k: int = TOP_K) -> str:
+        """
+        Relevant memories formatted for the system prompt, never above token_budget
+
+        Memories are taken best first; one that does not fit is skipped so a
+        shorter, less relevant one can still be used.
+        """
+        memories = self.search(query, k=k)
+        if not memories:
+            return ""
+        used = estimate_tokens(PROMPT_HEADER)
+        lines = []
+        for _, text in memories:
+            line = f"- {text}\n"
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                continue
+            lines.append(line)
+            used += cost
+        return PROMPT_HEADER + "".join(lines) if lines else ""
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self.texts)
+            kinds = np.bincount(self._kinds[:size], minlength=len(KIND_NAMES)) if size else [0] * len(KIND_NAMES)
+        return {'items': size, **{KIND_NAMES[kind]: int(count) for kind, count in enumerate(kinds)}}
+
+    def load(self):
+        """Load memories from disk"""
+        try:
+            if os.path.exists(self.store_file):
+                with np.load(self.store_file) as data:
+                    vectors = data['vectors'].astype(np.float32)
+                    if vectors.shape[1] != self.encoder.dimensions:
+                        print("⚠️ Learner memory built with another encoder, starting afresh")
+                        return
+                    self._vectors = vectors
+                    self._created = data['created'].astype(np.float64)
+                    self._kinds = data['kinds'].astype(np.int8)
+                    self.texts = [str(text) for text in data['texts']]
+        except Exception as e:
+            print(f"Error loading learner memory: {e}")
+            self._vectors = np.zeros((0, self.encoder.dimensions), dtype=np.float32)
+            self._created = np.zeros(0, dtype=np.float64)
+            self._kinds = np.zeros(0, dtype=np.int8)
+            self.texts = []
+
+    def save(self):
+        """Save memories to disk (vectors as float16 to halve the file)"""
+        with self._lock:
+            size = len(self.texts)
+            arrays = {
+                'vectors': self._vectors[:size].astype(np.float16),
+                'created': self._created[:size].copy(),
+                'kinds': self._kinds[:size].copy(),
+                'texts': np.array(self.texts, dtype=str),
+            }
+            self.dirty = False
+        try:
+            # Fichier temporaire puis remplacement : jamais de magasin à moitié écrit
+            temp_file = self.store_file + '.tmp.npz'
+            np.savez(temp_file, **arrays)
+            os.replace(temp_file, self.store_file)
+        except Exception as e:
+            self.dirty = True
+            print(f"❌ Error saving learner memory: {e}")
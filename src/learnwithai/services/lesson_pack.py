@@ -0,0 +1,320 @@
+"""
+Lesson packs for LearnwithAI
+Compact binary file holding thousands of lessons, opened with mmap so a level's
+catalog is available in milliseconds and a lesson is only decoded when viewed.
+
+Layout (little-endian):
+    header    magic, version, flags, lesson count, offsets of the sections below
+    levels    level name -> contiguous range of lesson ids
+    index     one fixed-size record per lesson (data offset/length, title offset/length)
+    titles    UTF-8 titles, concatenated
+    terms     sorted keyword table (prefix search by binary search) + term bytes
+    postings  uint32 lesson ids for each term
+    data      one JSON document per lesson (zlib-compressed if flagged)
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import zlib
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b'LWAP'
+VERSION = 1
+FLAG_ZLIB = 1
+
+HEADER = struct.Struct('<4sHHI6Q')
+LEVEL_RANGE = struct.Struct('<II')
+INDEX_RECORD = struct.Struct('<QIIH2x')
+TERM_RECORD = struct.Struct('<IHII')
+COUNT = struct.Struct('<I')
+
+# Ordre d'affichage des niveaux connus
+LEVEL_ORDER = ('Beginner', 'Intermediate', 'Advanced')
+
+# Champs textuels indexés pour la recherche
+INDEXED_FIELDS = ('title', 'keywords', 'phrases')
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case search terms of two characters or more"""
+    return [word for word in _WORD_RE.findall(text.lower()) if len(word) > 1]
+
+
+def _lesson_terms(lesson: Dict) -> set:
+    terms = set()
+    for field in INDEXED_FIELDS:
+        value = lesson.get(field)
+        if isinstance(value, str):
+            terms.update(tokenize(value))
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                terms.update(tokenize(item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)))
+    return terms
+
+
+def write_lesson_pack(path: str, lessons: Iterable[Dict], compress: bool = True) -> int:
+    """
+    Build a lesson pack
+
+    Args:
+        path (str): Output file
+        lessons: Lesson dicts with at least 'level' and 'title'; every other
+                 field ('phrases', 'audio', ...) is stored as-is
+        compress (bool): zlib-compress each lesson document
+
+    Returns:
+        int: Number of lessons written
+    """
+    def level_key(lesson):
+        level = lesson.get('level', '')
+        return (LEVEL_ORDER.index(level) if level in LEVEL_ORDER else len(LEVEL_ORDER), level)
+
+    # Trier par niveau pour que chaque niveau soit une plage contiguë d'identifiants
+    lessons = sorted(lessons, key=level_key)
+
+    levels = []
+    index = bytearray()
+    titles = bytearray()
+    data = bytearray()
+    postings_by_term: Dict[str, List[int]] = {}
+
+    for lesson_id, lesson in enumerate(lessons):
+        level = lesson.get('level', '')
+        if not levels or levels[-1][0] != level:
+            levels.append([level, lesson_id, 0])
+        levels[-1][2] += 1
+
+        title = lesson.get('title', '').encode('utf-8')[:0xFFFF]
+        document = json.dumps(lesson, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if compress:
+            document = zlib.compress(document, 6)
+
+        index += INDEX_RECORD.pack(len(data), len(document), len(titles), len(title))
+        titles += title
+        data += document
+        for term in _lesson_terms(lesson):
+            postings_by_term.setdefault(term, []).append(lesson_id)
+
+    level_section = bytearray(COUNT.pack(len(levels)))
+    for name, first, count in levels:
+        encoded = name.encode('utf-8')
+        level_section += struct.pack('<H', len(encoded)) + encoded + LEVEL_RANGE.pack(first, count)
+
+    sorted_terms = sorted(postings_by_term, key=lambda term: term.encode('utf-8'))
+    term_records = bytearray(COUNT.pack(len(sorted_terms)))
+    term_bytes = bytearray()
+    postings = array('I')
+    for term in sorted_terms:
+        encoded = term.encode('utf-8')
+        ids = postings_by_term[term]
+        term_records += TERM_RECORD.pack(len(term_bytes), len(encoded), len(postings), len(ids))
+        term_bytes += encoded
+        postings.extend(ids)
+    if sys.byteorder != 'little':
+        postings.byteswap()
+
+    levels_offset = HEADER.size
+    index_offset = levels_offset + len(level_section)
+    titles_offset = index_offset + len(index)
+    terms_offset = titles_offset + len(titles)
+    postings_offset = terms_offset + len(term_records) + len(term_bytes)
+    data_offset = postings_offset + len(postings) * postings.itemsize
+
+    header = HEADER.pack(MAGIC, VERSION, FLAG_ZLIB if compress else 0, len(lessons),
+                         levels_offset, index_offset, titles_offset, terms_offset,
+                         postings_offset, data_offset)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for section in (header, level_section, index, titles, term_records, term_bytes,
+                        postings.tobytes(), data):
+            f.write(section)
+    os.replace(tmp_path, path)
+    return len(lessons)
+
+
+class LevelCatalog:
+    def __init__(self, pack, name: str, first: int, count: int):
+        """Lazy sequence of (lesson id, title) for one level; titles are decoded on access"""
+        self.pack = pack
+        self.name = name
+        self.first = first
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self.count))]
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        lesson_id = self.first + position
+        return lesson_id, self.pack.get_title(lesson_id)
+
+    def __contains__(self, lesson_id: int) -> bool:
+        return self.first <= lesson_id < self.first + self.count
+
+
+class LessonPack:
+    def __init__(self, path: str):
+        """Open a lesson pack (only the header and level table are read)"""
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, version, self.flags, self.lesson_count, self._levels_offset, self._index_offset,
+         self._titles_offset, self._terms_offset, self._postings_offset,
+         self._data_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{os.path.basename(path)} is not a version {VERSION} lesson pack")
+
+        self.levels = {}
+        offset = self._levels_offset
+        (level_count,) = COUNT.unpack_from(self._mm, offset)
+        offset += COUNT.size
+        for _ in range(level_count):
+            (name_len,) = struct.unpack_from('<H', self._mm, offset)
+            name = self._mm[offset + 2:offset + 2 + name_len].decode('utf-8')
+            offset += 2 + name_len
+            self.levels[name] = LEVEL_RANGE.unpack_from(self._mm, offset)
+            offset += LEVEL_RANGE.size
+
+        (self.term_count,) = COUNT.unpack_from(self._mm, self._terms_offset)
+        self._term_records_offset = self._terms_offset + COUNT.size
+        self._term_bytes_offset = self._term_records_offset + self.term_count * TERM_RECORD.size
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.lesson_count
+
+    def level_names(self) -> List[str]:
+        return list(self.levels)
+
+    def level_catalog(self, level: str) -> LevelCatalog:
+        """Lessons of a level as a lazy (id, title) sequence"""
+        first, count = self.levels.get(level, (0, 0))
+        return LevelCatalog(self, level, first, count)
+
+    def _index_record(self, lesson_id: int):
+        if not 0 <= lesson_id < self.lesson_count:
+            raise IndexError(lesson_id)
+        return INDEX_RECORD.unpack_from(self._mm, self._index_offset + lesson_id * INDEX_RECORD.size)
+
+    def get_title(self, lesson_id: int) -> str:
+        _, _, title_offset, title_len = self._index_record(lesson_id)
+        start = self._titles_offset + title_offset
+        return self._mm[start:start + title_len].decode('utf-8')
+
+    def get_lesson(self, lesson_id: int) -> Dict:
+        """Decode one lesson document"""
+        data_offset, data_len, _, _ = self._index_record(lesson_id)
+        start = self._data_offset + data_offset
+        document = self._mm[start:start + data_len]
+        if self.flags & FLAG_ZLIB:
+            document = zlib.decompress(document)
+        lesson = json.loads(document)
+        lesson['id'] = lesson_id
+        return lesson
+
+    def _term(self, position: int):
+        term_offset, term_len, postings_start, postings_count = TERM_RECORD.unpack_from(
+            self._mm, self._term_records_offset + position * TERM_RECORD.size
+        )
+        start = self._term_bytes_offset + term_offset
+        return self._mm[start:start + term_len], postings_start, postings_count
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _postings(self, start: int, count: int) -> array:
+        ids = array('I')
+        offset = self._postings_offset + start * ids.itemsize
+        ids.frombytes(self._mm[offset:offset + count * ids.itemsize])
+        if sys.byteorder != 'little':
+            ids.byteswap()
+        return ids
+
+    def prefix_matches(self, prefix: str, max_terms: int = 1000) -> set:
+        """Ids of lessons containing a term that starts with `prefix`"""
+        key = prefix.lower().encode('utf-8')
+        matches = set()
+        position = self._lower_bound(key)
+        for position in range(position, min(self.term_count, position + max_terms)):
+            term, start, count = self._term(position)
+            if not term.startswith(key):
+                break
+            matches.update(self._postings(start, count))
+        return matches
+
+    def search(self, query: str, level: Optional[str] = None, limit: int = 50) -> List[int]:
+        """
+        Find lessons whose indexed text matches every word of the query
+
+        Each word is treated as a prefix ("rest" matches "restaurant").
+
+        Returns:
+            list: Matching lesson ids, in pack order
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        result = None
+        for word in words:
+            ids = self.prefix_matches(word)
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+
+        if level is not None:
+            catalog = self.level_catalog(level)
+            result = [lesson_id for lesson_id in result if lesson_id in catalog]
+        return sorted(result)[:limit]
+
+
+def main(argv=None):
+    """Build a pack: python -m learnwithai.services.lesson_pack lessons.json lessons.pack"""
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print("Usage: python -m learnwithai.services.lesson_pack <lessons.json> <output.pack>")
+        return 1
+    with open(argv[0], 'r', encoding='utf-8') as f:
+        lessons = json.load(f)
+    count = write_lesson_pack(argv[1], lessons)
+    print(f"✅ {count} lessons written to {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
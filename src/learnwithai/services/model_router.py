@@ -0,0 +1,130 @@
+"""
+Model cascade routing for LearnwithAI
+Each turn goes to the fast model unless the learner is Advanced or the message
+looks hard; a fast reply that is not the expected JSON is retried on the strong
+model. Latency and escalations are recorded per route.
+"""
+
+import re
+import threading
+import statistics
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+DEFAULT_FAST_MODEL = "llama-3.1-8b-instant"
+DEFAULT_STRONG_MODEL = "llama-3.3-70b-versatile"
+COMPLEXITY_THRESHOLD = 0.6
+LATENCY_WINDOW = 500  # Dernières mesures gardées par route
+
+# Raisons de routage
+ROUTE_FAST = "fast"
+ROUTE_ADVANCED = "advanced"
+ROUTE_COMPLEX = "complex"
+ROUTE_ESCALATED = "escalated"
+
+_WORD_RE = re.compile(r"[a-z']+")
+# Marqueurs de phrases complexes et de questions de grammaire (mots seuls, puis expressions)
+CLAUSE_WORDS = frozenset((
+    "although", "though", "whereas", "unless", "whether", "which", "whom", "whose",
+    "if", "because", "since", "while", "would", "could", "should", "might",
+))
+CLAUSE_PHRASES = ("had been", "have been", "will have")
+META_WORDS = frozenset((
+    "explain", "why", "grammar", "rule", "subjunctive", "conditional", "passive",
+    "idiom", "nuance", "essay",
+))
+META_PHRASES = ("difference between", "phrasal verb", "correct my")
+
+
+def message_complexity(message: str) -> float:
+    """
+    Cheap 0-1 estimate of how hard a turn is to answer well
+
+    Long messages, long words, subordinate clauses and grammar questions push
+    the score up; small talk stays near 0.
+    """
+    text = message.lower()
+    words = _WORD_RE.findall(text)
+    if not words:
+        return 0.0
+    clauses = len(CLAUSE_WORDS.intersection(words)) + sum(text.count(p) for p in CLAUSE_PHRASES)
+    meta = len(META_WORDS.intersection(words)) + sum(text.count(p) for p in META_PHRASES)
+    long_words = len([word for word in words if len(word) >= 9]) / len(words)
+
+    score = (0.25 * min(len(words) / 60.0, 1.0)
+             + 0.1 * min(long_words * 4, 1.0)
+             + 0.2 * min(clauses / 4.0, 1.0)
+             + 0.4 * min(meta / 2.0, 1.0)
+             + 0.05 * min(message.count('?') / 3.0, 1.0))
+    return round(min(score, 1.0), 3)
+
+
+class ModelRouter:
+    def __init__(self, fast_model: str = DEFAULT_FAST_MODEL, strong_model: Optional[str] = DEFAULT_STRONG_MODEL,
+                 complexity_threshold: float = COMPLEXITY_THRESHOLD):
+        """
+        Args:
+            fast_model (str): Model tried first
+            strong_model (str): Model for hard turns and escalations (None disables the cascade)
+            complexity_threshold (float): message_complexity() score sending a turn to the strong model
+        """
+        self.fast_model = fast_model
+        self.strong_model = strong_model if strong_model and strong_model != fast_model else None
+        self.complexity_threshold = complexity_threshold
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self.turns = 0
+        self.escalations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.strong_model is not None
+
+    def choose(self, message: str, level: str = "beginner") -> Tuple[str, str]:
+        """
+        Pick the model for a turn
+
+        Returns:
+            tuple: (model, route reason)
+        """
+        if not self.enabled:
+            return self.fast_model, ROUTE_FAST
+        if level.lower() == "advanced":
+            return self.strong_model, ROUTE_ADVANCED
+        if message_complexity(message) >= self.complexity_threshold:
+            return self.strong_model, ROUTE_COMPLEX
+        return self.fast_model, ROUTE_FAST
+
+    def should_escalate(self, model: str, reply_is_valid: bool) -> bool:
+        """A fast-model reply that failed validation is retried on the strong model"""
+        return self.enabled and model != self.strong_model and not reply_is_valid
+
+    def record(self, route: str, latency: float, escalated: bool = False):
+        """Record one turn (latency in seconds, end to end including any escalation)"""
+        with self._lock:
+            if route not in self._latencies:
+                self._latencies[route] = deque(maxlen=LATENCY_WINDOW)
+                self._counts[route] = 0
+            self._latencies[route].append(latency)
+            self._counts[route] += 1
+            self.turns += 1
+            if escalated:
+                self.escalations += 1
+
+    def stats(self) -> Dict:
+        """Per-route turn counts and latency (ms), plus the escalation rate"""
+        with self._lock:
+            routes = {}
+            for route, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                routes[route] = {
+                    'turns': self._counts[route],
+                    'median_ms': round(statistics.median(ordered) * 1000, 1),
+                    'p90_ms': round(ordered[int(0.9 * (len(ordered) - 1))] * 1000, 1),
+                }
+            return {
+                'routes': routes,
+                'turns': self.turns,
+                'escalation_rate': round(self.escalations / self.turns, 3) if self.turns else 0.0,
+            }
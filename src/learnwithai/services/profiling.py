@@ -0,0 +1,253 @@
+"""
+Opt-in profiling for LearnwithAI
+Hot paths are wrapped in named scopes that cost a single check when profiling
+is off. Enable with LEARNWITHAI_PROFILE=cprofile|tracemalloc|sampling (or the
+"profiling" key of settings.json); reports go to a rotating directory that can
+be attached to bug reports.
+
+Modes:
+    cprofile     deterministic profile of each outermost scope call (pstats text)
+    tracemalloc  memory snapshots diffed against the session start and the previous snapshot
+    sampling     stack samples of the threads inside a scope (collapsed stacks, flamegraph-ready)
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+MODES = ('cprofile', 'tracemalloc', 'sampling')
+DEFAULT_REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles')
+MAX_REPORTS = 50  # Les rapports les plus anciens sont supprimés au-delà
+SAMPLE_INTERVAL = 0.005
+SNAPSHOT_INTERVAL = 30.0  # Secondes minimum entre deux instantanés tracemalloc
+TOP_STATS = 40
+
+
+class Profiler:
+    def __init__(self):
+        self.mode = None
+        self.reports_dir = DEFAULT_REPORTS_DIR
+        self.max_reports = MAX_REPORTS
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # tracemalloc
+        self._first_snapshot = None
+        self._last_snapshot = None
+        self._last_snapshot_time = 0.0
+        self._started_tracemalloc = False
+        # sampling
+        self._active_scopes = {}  # thread id -> scope name
+        self._samples = Counter()
+        self._sampler = None
+        self._sampling = threading.Event()
+
+    def configure(self, mode: Optional[str] = None, reports_dir: Optional[str] = None):
+        """
+        Turn profiling on or off
+
+        Args:
+            mode (str): 'cprofile', 'tracemalloc', 'sampling' or None/'off'
+            reports_dir (str): Where reports are written
+        """
+        self.shutdown()
+        mode = (mode or '').strip().lower()
+        if mode not in MODES:
+            if mode not in ('', 'off', 'none', '0'):
+                print(f"⚠️ Unknown profiling mode: {mode} (expected {', '.join(MODES)})")
+            self.mode = None
+            return
+        self.reports_dir = reports_dir or self.reports_dir
+        self.mode = mode
+
+        if mode == 'tracemalloc':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._started_tracemalloc = True
+            self._first_snapshot = self._last_snapshot = self._snapshot()
+            self._last_snapshot_time = time.time()
+        elif mode == 'sampling':
+            self._samples.clear()
+            self._sampling.set()
+            self._sampler = threading.Thread(target=self._sample_loop)
+            self._sampler.daemon = True
+            self._sampler.start()
+        print(f"🔬 Profiling enabled ({mode}), reports in {self.reports_dir}")
+
+    def shutdown(self):
+        """Write the session reports and stop profiling"""
+        if self.mode == 'tracemalloc':
+            self._write_snapshot_diff('session')
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            self._first_snapshot = self._last_snapshot = None
+        elif self.mode == 'sampling':
+            self._sampling.clear()
+            if self._sampler:
+                self._sampler.join(timeout=1)
+                self._sampler = None
+            self._write_samples()
+        self.mode = None
+
+    # --- Scopes ---
+
+    @contextmanager
+    def scope(self, name: str):
+        """Profile the enclosed block under `name` (no-op when profiling is off)"""
+        mode = self.mode
+        depth = getattr(self._local, 'depth', 0)
+        if not mode or depth:
+            # Seul le scope le plus externe est profilé (cProfile ne s'imbrique pas)
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        self._local.depth = 1
+        thread_id = threading.get_ident()
+        profile = None
+        started = time.perf_counter()
+        try:
+            if mode == 'cprofile':
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Un autre profileur est déjà actif sur ce thread
+                    profile = None
+            elif mode == 'sampling':
+                self._active_scopes[thread_id] = name
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._local.depth = 0
+            if profile is not None:
+                profile.disable()
+                self._write_cprofile(name, profile, elapsed)
+            elif mode == 'sampling':
+                self._active_scopes.pop(thread_id, None)
+            elif mode == 'tracemalloc' and time.time() - self._last_snapshot_time >= SNAPSHOT_INTERVAL:
+                self._write_snapshot_diff(name)
+
+    # --- Reports ---
+
+    def _report_path(self, kind: str, name: str, extension: str = 'txt') -> str:
+        os.makedirs(self.reports_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        safe_name = ''.join(c if c.isalnum() or c in '._-' else '_' for c in name)
+        return os.path.join(self.reports_dir, f"{stamp}-{kind}-{safe_name}.{extension}")
+
+    def _write(self, path: str, text: str):
+        try:
+            with self._lock:
+                with open(path, 'w') as f:
+                    f.write(text)
+                self._rotate()
+        except Exception as e:
+            print(f"❌ Error writing profiling report: {e}")
+
+    def _rotate(self):
+        reports = sorted(
+            entry.path for entry in os.scandir(self.reports_dir) if entry.is_file()
+        )
+        for path in reports[:-self.max_reports] if len(reports) > self.max_reports else []:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write_cprofile(self, name: str, profile: cProfile.Profile, elapsed: float):
+        output = io.StringIO()
+        output.write(f"Scope: {name}\nWall time: {elapsed * 1000:.2f} ms\n\n")
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats('cumulative').print_stats(TOP_STATS)
+        self._write(self._report_path('cprofile', name), output.getvalue())
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def _write_snapshot_diff(self, name: str):
+        if not tracemalloc.is_tracing() or self._first_snapshot is None:
+            return
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Scope: {name}", f"Traced memory: {current / 1e6:.2f} MB (peak {peak / 1e6:.2f} MB)", ""]
+        for title, reference in (("Since session start", self._first_snapshot),
+                                 ("Since previous snapshot", self._last_snapshot)):
+            lines.append(f"--- {title} ---")
+            for stat in snapshot.compare_to(reference, 'lineno')[:TOP_STATS // 2]:
+                lines.append(str(stat))
+            lines.append("")
+        self._last_snapshot = snapshot
+        self._last_snapshot_time = time.time()
+        self._write(self._report_path('tracemalloc', name), "\n".join(lines))
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while self._sampling.is_set():
+            if self._active_scopes:
+                frames = sys._current_frames()
+                for thread_id, scope_name in list(self._active_scopes.items()):
+                    frame = frames.get(thread_id)
+                    if frame is None or thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stack.append(scope_name)
+                    self._samples[";".join(reversed(stack))] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def _write_samples(self):
+        if not self._samples:
+            return
+        lines = [f"{stack} {count}" for stack, count in self._samples.most_common()]
+        self._write(self._report_path('sampling', 'session', 'collapsed'), "\n".join(lines) + "\n")
+        self._samples.clear()
+
+
+# Profileur partagé par toute l'application
+profiler = Profiler()
+
+
+def profile_scope(name: str):
+    """Context manager profiling a block under `name`"""
+    return profiler.scope(name)
+
+
+def profiled(name: str):
+    """Decorator profiling every call of a function under `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.mode:
+                return func(*args, **kwargs)
+            with profiler.scope(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_from_environment(settings: Optional[dict] = None):
+    """Enable profiling from LEARNWITHAI_PROFILE or the 'profiling' setting"""
+    mode = os.getenv('LEARNWITHAI_PROFILE') or (settings or {}).get('profiling')
+    reports_dir = os.getenv('LEARNWITHAI_PROFILE_DIR')
+    if mode:
+        profiler.configure(mode, reports_dir)
+    return profiler.mode
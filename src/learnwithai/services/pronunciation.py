@@ -0,0 +1,244 @@
+"""
+Pronunciation scoring for LearnwithAI
+Compares a learner recording with a reference clip: MFCC features computed with
+NumPy, banded dynamic time warping, and a similarity score per segment.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+from .audio_buffer import AudioBuffer, resample
+
+# Paramètres d'analyse (25 ms de fenêtre, 10 ms de pas à 16 kHz)
+ANALYSIS_RATE = 16000
+FRAME_LENGTH = 400
+HOP_LENGTH = 160
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 13
+
+# Distance cosinus moyenne à partir de laquelle un segment obtient 0/100
+MAX_SEGMENT_DISTANCE = 0.8
+SILENCE_THRESHOLD_DB = -40.0
+
+
+def read_wav_mono(file_path: str, rate: Optional[int] = None) -> Tuple["np.ndarray", int]:
+    """
+    Read a 16-bit WAV file as mono float32 samples in -1.0 - 1.0
+
+    The file is memory-mapped and converted block by block; with `rate` it is
+    resampled on the way, without a full-rate float copy.
+
+    Returns:
+        tuple: (samples, sample rate of the samples)
+    """
+    with AudioBuffer.from_wav(file_path) as audio:
+        return audio.to_float32(rate), rate or audio.rate
+
+
+@lru_cache(maxsize=8)
+def mel_filterbank(rate: int = ANALYSIS_RATE, n_fft: int = N_FFT, n_mels: int = N_MELS) -> "np.ndarray":
+    """Triangular mel filterbank of shape (n_fft // 2 + 1, n_mels)"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(rate / 2.0), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / rate).astype(int)
+
+    fbank = np.zeros((n_fft // 2 + 1, n_mels), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[left:center, m - 1] = (np.arange(left, center) - left) / float(center - left)
+        if right > center:
+            fbank[center:right, m - 1] = (right - np.arange(center, right)) / float(right - center)
+    return fbank
+
+
+@lru_cache(maxsize=8)
+def dct_matrix(n_mels: int = N_MELS, n_mfcc: int = N_MFCC) -> "np.ndarray":
+    """Orthonormal DCT-II matrix of shape (n_mels, n_mfcc)"""
+    k = np.arange(n_mfcc)[np.newaxis, :]
+    n = np.arange(n_mels)[:, np.newaxis]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2.0 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[:, 0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _window(length: int) -> "np.ndarray":
+    return np.hamming(length).astype(np.float32)
+
+
+def frame_signal(samples: "np.ndarray", frame_length: int = FRAME_LENGTH, hop: int = HOP_LENGTH) -> "np.ndarray":
+    """Split a signal into overlapping frames without copying (strided view)"""
+    if samples.size < frame_length:
+        samples = np.pad(samples, (0, frame_length - samples.size))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::hop]
+
+
+def log_mel_features(samples: "np.ndarray", rate: int = ANALYSIS_RATE) -> "np.ndarray":
+    """Log-mel energies, shape (frames, N_MELS)"""
+    if rate != ANALYSIS_RATE:
+        samples = resample(samples, rate, ANALYSIS_RATE)
+    # Pré-accentuation pour équilibrer le spectre de la voix
+    emphasized = np.append(samples[:1], samples[1:] - 0.97 * samples[:-1])
+    frames = frame_signal(emphasized) * _window(FRAME_LENGTH)
+    power = np.abs(np.fft.rfft(frames, n=N_FFT, axis=1)) ** 2 / N_FFT
+    return np.log(power @ mel_filterbank() + 1e-10)
+
+
+def mfcc_features(samples: "np.ndarray", rate: int = ANALYSIS_RATE) -> "np.ndarray":
+    """
+    MFCCs with cepstral mean normalisation, shape (frames, N_MFCC)
+
+    The mean is removed per utterance so microphone differences between the
+    learner and the reference matter less than what is actually said.
+    """
+    mfcc = log_mel_features(samples, rate) @ dct_matrix()
+    return mfcc - mfcc.mean(axis=0)
+
+
+def trim_silence(samples: "np.ndarray", threshold_db: float = SILENCE_THRESHOLD_DB) -> "np.ndarray":
+    """Drop leading and trailing silence (frame energy below peak - threshold)"""
+    if samples.size < FRAME_LENGTH:
+        return samples
+    frames = frame_signal(samples)
+    energy = 10.0 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-12)
+    voiced = np.flatnonzero(energy > energy.max() + threshold_db)
+    if voiced.size == 0:
+        return samples
+    start = voiced[0] * HOP_LENGTH
+    end = min(samples.size, voiced[-1] * HOP_LENGTH + FRAME_LENGTH)
+    return samples[start:end]
+
+
+def cosine_distance_matrix(x: "np.ndarray", y: "np.ndarray") -> "np.ndarray":
+    """Pairwise cosine distances (0 = identical direction, 2 = opposite)"""
+    x_norm = x / (np.linalg.norm(x, axis=1, keepdims=True) + 1e-10)
+    y_norm = y / (np.linalg.norm(y, axis=1, keepdims=True) + 1e-10)
+    return 1.0 - x_norm @ y_norm.T
+
+
+def banded_dtw(cost: "np.ndarray", band_ratio: float = 0.2) -> Tuple[float, List[Tuple[int, int]]]:
+    """
+    Dynamic time warping restricted to a Sakoe-Chiba band around the diagonal
+
+    Each row is solved with vectorised NumPy: with a_j = min(D[i-1, j-1], D[i-1, j])
+    and S the running sum of the row's costs, the recurrence
+    D[i, j] = c_j + min(a_j, D[i, j-1]) unrolls to
+    D[i, j] = S_j + min_{k <= j}(a_k - S_{k-1}), i.e. a cumulative minimum.
+
+    Args:
+        cost: Local distance matrix of shape (n, m)
+        band_ratio (float): Band half-width as a fraction of the longest sequence
+
+    Returns:
+        tuple: (total alignment cost, path as a list of (i, j) pairs)
+    """
+    n, m = cost.shape
+    width = max(int(band_ratio * max(n, m)), abs(n - m) // 4 + 2)
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+
+    for i in range(1, n + 1):
+        center = int(round(i * m / float(n)))
+        lo = max(1, center - width)
+        hi = min(m, center + width)
+        previous = acc[i - 1]
+        best_from_above = np.minimum(previous[lo - 1:hi], previous[lo:hi + 1])
+        row_cost = cost[i - 1, lo - 1:hi]
+        running = np.cumsum(row_cost)
+        acc[i, lo:hi + 1] = running + np.minimum.accumulate(best_from_above - (running - row_cost))
+
+    # Retour arrière depuis (n, m) pour retrouver le chemin d'alignement
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        candidates = (acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+        step = int(np.argmin(candidates))
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    path.reverse()
+    return float(acc[n, m]), path
+
+
+def score_features(learner: "np.ndarray", reference: "np.ndarray", segments: int = 5,
+                   band_ratio: float = 0.2) -> Dict:
+    """
+    Score learner features against reference features
+
+    Returns:
+        dict: Overall 'score' (0-100), per-segment scores over the reference
+              timeline and the mean aligned 'distance'
+    """
+    if learner.shape[0] == 0 or reference.shape[0] == 0:
+        return {'score': 0.0, 'distance': None, 'segments': []}
+
+    cost = cosine_distance_matrix(learner, reference)
+    total, path = banded_dtw(cost, band_ratio)
+    if not np.isfinite(total):
+        return {'score': 0.0, 'distance': None, 'segments': []}
+
+    path_array = np.asarray(path)
+    step_costs = cost[path_array[:, 0], path_array[:, 1]]
+    ref_frames = reference.shape[0]
+    segments = max(1, min(segments, ref_frames))
+    segment_index = np.minimum(path_array[:, 1] * segments // ref_frames, segments - 1)
+
+    seconds_per_frame = HOP_LENGTH / float(ANALYSIS_RATE)
+    segment_scores = []
+    for s in range(segments):
+        mask = segment_index == s
+        distance = float(step_costs[mask].mean()) if mask.any() else MAX_SEGMENT_DISTANCE
+        segment_scores.append({
+            'start': round(s * ref_frames / segments * seconds_per_frame, 2),
+            'end': round((s + 1) * ref_frames / segments * seconds_per_frame, 2),
+            'distance': round(distance, 4),
+            'score': round(100.0 * max(0.0, 1.0 - distance / MAX_SEGMENT_DISTANCE), 1)
+        })
+
+    mean_distance = float(step_costs.mean())
+    return {
+        'score': round(100.0 * max(0.0, 1.0 - mean_distance / MAX_SEGMENT_DISTANCE), 1),
+        'distance': round(mean_distance, 4),
+        'segments': segment_scores
+    }
+
+
+def score_pronunciation(learner_path: str, reference_path: str, segments: int = 5) -> Dict:
+    """
+    Compare a learner recording with a reference clip
+
+    Args:
+        learner_path (str): WAV recorded by the learner
+        reference_path (str): Reference WAV for the same sentence
+        segments (int): Number of segments to score along the reference
+
+    Returns:
+        dict: 'score' (0-100), 'segments' and 'duration_ratio' (learner / reference)
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Pronunciation scoring requires NumPy")
+
+    learner = trim_silence(read_wav_mono(learner_path, ANALYSIS_RATE)[0])
+    reference = trim_silence(read_wav_mono(reference_path, ANALYSIS_RATE)[0])
+
+    result = score_features(mfcc_features(learner), mfcc_features(reference), segments)
+    result['duration_ratio'] = round(learner.size / float(max(reference.size, 1)), 2)
+    return result
@@ -0,0 +1,256 @@
+"""
+Recordings catalog for LearnwithAI
+SQLite index of the WAV files in recordings/ with paged queries and retention
+"""
+
+import os
+import time
+import wave
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+CATALOG_FILENAME = 'catalog.sqlite3'
+
+# Fichiers dérivés stockés à côté de chaque enregistrement (tables de crêtes...)
+SIDECAR_SUFFIXES = ('.peaks.npz',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    modified REAL NOT NULL,
+    duration REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    session_id TEXT
+);
+CREATE INDEX IF NOT EXISTS recordings_modified ON recordings (modified DESC);
+CREATE INDEX IF NOT EXISTS recordings_session ON recordings (session_id, modified DESC);
+"""
+
+COLUMNS = ('filename', 'size', 'modified', 'duration', 'sample_rate', 'channels', 'session_id')
+
+
+def read_wav_header(file_path: str) -> Dict:
+    """Read duration, sample rate and channels from a WAV header (no audio is decoded)"""
+    try:
+        with wave.open(file_path, 'rb') as wf:
+            rate = wf.getframerate()
+            return {
+                'duration': wf.getnframes() / float(rate) if rate else None,
+                'sample_rate': rate,
+                'channels': wf.getnchannels()
+            }
+    except Exception:
+        return {'duration': None, 'sample_rate': None, 'channels': None}
+
+
+class RecordingsCatalog:
+    def __init__(self, recordings_dir: str, db_file: Optional[str] = None):
+        """Open (or create) the catalog for a recordings directory"""
+        self.recordings_dir = recordings_dir
+        self.db_file = db_file or os.path.join(recordings_dir, CATALOG_FILENAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _row_to_dict(self, row) -> Dict:
+        recording = dict(zip(COLUMNS, row))
+        recording['path'] = os.path.join(self.recordings_dir, recording['filename'])
+        return recording
+
+    def add(self, file_path: str, duration: Optional[float] = None, sample_rate: Optional[int] = None,
+            channels: Optional[int] = None, session_id: Optional[str] = None):
+        """
+        Register (or update) a single recording
+
+        Called right after a recording is saved so the catalog stays in sync
+        without rescanning the directory.
+        """
+        stat = os.stat(file_path)
+        if duration is None or sample_rate is None:
+            header = read_wav_header(file_path)
+            duration = header['duration'] if duration is None else duration
+            sample_rate = sample_rate or header['sample_rate']
+            channels = channels or header['channels']
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (os.path.basename(file_path), stat.st_size, stat.st_mtime,
+                 duration, sample_rate, channels, session_id)
+            )
+            self._conn.commit()
+
+    def remove(self, file_path: str):
+        """Forget a recording (the file itself is not touched)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM recordings WHERE filename = ?", (os.path.basename(file_path),))
+            self._conn.commit()
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Bring the catalog in line with the directory in a single os.scandir pass
+
+        New or modified WAV files are (re)indexed from their header, entries whose
+        file disappeared are removed. Unchanged files cost one dict lookup.
+
+        Returns:
+            dict: Number of added, updated and removed entries
+        """
+        with self._lock:
+            known = {
+                filename: (size, modified)
+                for filename, size, modified in self._conn.execute("SELECT filename, size, modified FROM recordings")
+            }
+
+        changes = {'added': 0, 'updated': 0, 'removed': 0}
+        upserts = []
+        seen = set()
+
+        with os.scandir(self.recordings_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.wav') or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                previous = known.get(entry.name)
+                if previous == (stat.st_size, stat.st_mtime):
+                    continue
+                header = read_wav_header(entry.path)
+                upserts.append((entry.name, stat.st_size, stat.st_mtime,
+                                header['duration'], header['sample_rate'], header['channels']))
+                changes['added' if previous is None else 'updated'] += 1
+
+        removed = [(filename,) for filename in known if filename not in seen]
+        changes['removed'] = len(removed)
+
+        if upserts or removed:
+            with self._lock:
+                # Conserver la session d'origine des fichiers déjà connus
+                self._conn.executemany(
+                    "INSERT INTO recordings (filename, size, modified, duration, sample_rate, channels) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(filename) DO UPDATE SET "
+                    "size = excluded.size, modified = excluded.modified, duration = excluded.duration, "
+                    "sample_rate = excluded.sample_rate, channels = excluded.channels",
+                    upserts
+                )
+                self._conn.executemany("DELETE FROM recordings WHERE filename = ?", removed)
+                self._conn.commit()
+
+        return changes
+
+    def query(self, page: int = 0, page_size: int = 50, session_id: Optional[str] = None) -> List[Dict]:
+        """
+        Return one page of recordings, newest first
+
+        Args:
+            page (int): Page number, starting at 0
+            page_size (int): Recordings per page
+            session_id (str): Only return recordings from this session
+
+        Returns:
+            list: Recording dicts (filename, path, size, modified, duration, ...)
+        """
+        sql = "SELECT {} FROM recordings".format(', '.join(COLUMNS))
+        params = []
+        if session_id is not None:
+            sql += " WHERE session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY modified DESC LIMIT ? OFFSET ?"
+        params.extend([page_size, page * page_size])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def all(self) -> List[Dict]:
+        """Return every recording, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT {} FROM recordings ORDER BY modified DESC".format(', '.join(COLUMNS))
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def count(self, session_id: Optional[str] = None) -> int:
+        """Number of catalogued recordings"""
+        with self._lock:
+            if session_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM recordings WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def total_size(self) -> int:
+        """Total size in bytes of the catalogued recordings"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM recordings").fetchone()[0]
+
+    def prune(self, max_bytes: Optional[int] = None, max_age: Optional[float] = None,
+              protect: Optional[List[str]] = None) -> List[str]:
+        """
+        Enforce the retention policy by deleting the oldest recordings
+
+        Args:
+            max_bytes (int): Keep the directory under this many bytes
+            max_age (float): Delete recordings older than this many seconds
+            protect (list): Paths that must never be deleted (e.g. the current recording)
+
+        Returns:
+            list: Paths of the deleted files
+        """
+        protected = {os.path.basename(path) for path in (protect or []) if path}
+        victims = []
+
+        with self._lock:
+            if max_age is not None:
+                cutoff = time.time() - max_age
+                victims.extend(
+                    filename for (filename,) in self._conn.execute(
+                        "SELECT filename FROM recordings WHERE modified < ?", (cutoff,)
+                    ) if filename not in protected
+                )
+
+            if max_bytes is not None:
+                oldest_first = self._conn.execute(
+                    "SELECT filename, size FROM recordings ORDER BY modified ASC"
+                ).fetchall()
+                already = set(victims)
+                total = sum(size for filename, size in oldest_first if filename not in already)
+                for filename, size in oldest_first:
+                    if total <= max_bytes:
+                        break
+                    if filename in already or filename in protected:
+                        continue
+                    victims.append(filename)
+                    total -= size
+
+        deleted = []
+        for filename in victims:
+            path = os.path.join(self.recordings_dir, filename)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                for suffix in SIDECAR_SUFFIXES:
+                    sidecar = os.path.splitext(path)[0] + suffix
+                    if os.path.exists(sidecar):
+                        os.remove(sidecar)
+                deleted.append(path)
+            except OSError as e:
+                print(f"⚠️ Could not delete {filename}: {e}")
+
+        if deleted:
+            with self._lock:
+                self._conn.executemany(
+                    "DELETE FROM recordings WHERE filename = ?",
+                    [(os.path.basename(path),) for path in deleted]
+                )
+                self._conn.commit()
+        return deleted
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,91 @@
+"""
+AI reply parsing for LearnwithAI
+Splits the model's reply into the text shown to the learner and the correction tips.
+"""
+
+import re
+import json
+from typing import Tuple
+
+# JSON plat contenant la clé "response", même entouré de texte
+_JSON_REPLY_RE = re.compile(r'\{[^{}]*"response"[^{}]*\}', re.DOTALL)
+
+
+def _tips(parsed: dict) -> str:
+    tips = parsed.get('tips', '')
+    return tips.strip() if isinstance(tips, str) else ''
+
+
+def parse_ai_response(ai_response: str) -> Tuple[str, str]:
+    """
+    Extract the reply and the tips from a raw AI response
+
+    The model is asked for {"response": ..., "tips": ...}; the JSON may be
+    surrounded by text. When no usable JSON is found the raw reply is shown.
+
+    Args:
+        ai_response (str): Raw reply from the AI service
+
+    Returns:
+        tuple: (reply to display, tips or "" when there are none)
+    """
+    try:
+        cleaned_response = ai_response.strip()
+
+        json_match = _JSON_REPLY_RE.search(cleaned_response)
+        if json_match:
+            try:
+                parsed_response = json.loads(json_match.group(0))
+                main_response = parsed_response.get('response', '')
+                # Si pas de réponse dans le JSON, utiliser la réponse complète
+                if not isinstance(main_response, str) or not main_response.strip():
+                    main_response = ai_response
+                return main_response, _tips(parsed_response)
+            except json.JSONDecodeError as e:
+                print(f"Erreur de parsing JSON: {e}")
+
+        # Vérifier si c'est du JSON complet et valide
+        if cleaned_response.startswith('{') and cleaned_response.endswith('}'):
+            try:
+                parsed_response = json.loads(cleaned_response)
+                if isinstance(parsed_response, dict):
+                    main_response = parsed_response.get('response', ai_response)
+                    return str(main_response), _tips(parsed_response)
+            except json.JSONDecodeError:
+                pass
+
+        return ai_response, ''
+
+    except Exception as e:
+        print(f"Erreur lors du traitement de la réponse AI: {e}")
+        return str(ai_response), ''
+
+
+def is_structured_reply(ai_response: str) -> bool:
+    """True when the reply holds the expected JSON with a non-empty "response" string"""
+    if not ai_response:
+        return False
+    json_match = _JSON_REPLY_RE.search(ai_response)
+    if not json_match:
+        return False
+    try:
+        parsed_response = json.loads(json_match.group(0))
+    except json.JSONDecodeError:
+        return False
+    main_response = parsed_response.get('response')
+    return isinstance(main_response, str) and bool(main_response.strip())
+
+
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def parse_tips(ai_response: str) -> str:
+    """Tips from a correction-only reply ({"tips": ...}, possibly surrounded by text)"""
+    json_match = _JSON_OBJECT_RE.search(ai_response or '')
+    if not json_match:
+        return ''
+    try:
+        parsed_response = json.loads(json_match.group(0))
+    except json.JSONDecodeError:
+        return ''
+    return _tips(parsed_response) if isinstance(parsed_response, dict) else ''
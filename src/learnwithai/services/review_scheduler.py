@@ -0,0 +1,356 @@
+"""
+Spaced-repetition review scheduler for LearnwithAI
+SM-2 scheduling over an array-backed card store with a heap-ordered due queue.
+Grading and "next due" lookups are O(log n); the heap and the day's queue are
+built in the background at startup.
+"""
+
+import os
+import sys
+import time
+import heapq
+import struct
+import threading
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .task_executor import LANE_BACKGROUND, QueueFull, default_executor
+
+MAGIC = b'LWAS'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+
+DAY = 24 * 3600
+RELEARN_DELAY = 10 * 60  # Une carte ratée revient 10 minutes plus tard
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# Types de cartes (origine)
+KIND_TIP = 0
+KIND_VOCABULARY = 1
+KIND_NAMES = {KIND_TIP: 'tip', KIND_VOCABULARY: 'vocabulary'}
+
+
+class ReviewScheduler:
+    def __init__(self, store_file: Optional[str] = None):
+        """Create an empty scheduler; call load() or load_in_background() to read the store"""
+        self.store_file = store_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'resources', 'review_cards.srs'
+        )
+        # Une colonne par champ : 100k cartes tiennent en quelques Mo
+        self.due = array('d')
+        self.interval = array('f')
+        self.ease = array('f')
+        self.reps = array('H')
+        self.lapses = array('H')
+        self.kind = array('B')
+        self.fronts: List[str] = []
+        self.backs: List[str] = []
+
+        self._heap = []  # (due, card id); stale entries are skipped lazily
+        self._lookup: Dict[Tuple[str, str], int] = {}  # (front, back) -> card id
+        self._lock = threading.RLock()
+        self.daily_queue = deque()
+        self.queue_until = 0.0
+        self.dirty = False
+        self.ready = threading.Event()
+        self._loading = False
+        self._pending_cards = []  # Ajouts faits pendant le chargement, fusionnés à la fin de load()
+        self._unreadable = None  # Magasin illisible resté en place : ne jamais l'écraser
+
+    def __len__(self) -> int:
+        return len(self.due)
+
+    # --- Cards ---
+
+    def add_card(self, front: str, back: str, kind: int = KIND_TIP, now: Optional[float] = None) -> Optional[int]:
+        """
+        Add a card (or return the existing identical one)
+
+        New cards are due immediately. Never blocks: during a background load
+        the card is kept aside and added once the store is read.
+
+        Returns:
+            int: Card id (None while the store is loading)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._loading:
+                # Le chargement en cours écraserait la carte : elle sera ajoutée à la fin de load()
+                self._pending_cards.append((front, back, kind, now))
+                return None
+            return self._insert_card(front, back, kind, now)
+
+    def _insert_card(self, front: str, back: str, kind: int, now: float) -> int:
+        """Add a card unless an identical one exists (lock held)"""
+        key = (front, back)
+        card_id = self._lookup.get(key)
+        if card_id is not None:
+            return card_id
+
+        card_id = len(self.due)
+        self.due.append(now)
+        self.interval.append(0.0)
+        self.ease.append(INITIAL_EASE)
+        self.reps.append(0)
+        self.lapses.append(0)
+        self.kind.append(kind)
+        self.fronts.append(front)
+        self.backs.append(back)
+        self._lookup[key] = card_id
+        heapq.heappush(self._heap, (now, card_id))
+        if now <= self.queue_until:
+            self.daily_queue.append(card_id)
+        self.dirty = True
+        return card_id
+
+    def get_card(self, card_id: int) -> Dict:
+        """Card fields as a dict"""
+        with self._lock:
+            return {
+                'id': card_id,
+                'front': self.fronts[card_id],
+                'back': self.backs[card_id],
+                'kind': KIND_NAMES.get(self.kind[card_id], 'tip'),
+                'due': self.due[card_id],
+                'interval': self.interval[card_id],
+                'ease': self.ease[card_id],
+                'reps': self.reps[card_id],
+                'lapses': self.lapses[card_id]
+            }
+
+    def grade(self, card_id: int, quality: int, now: Optional[float] = None) -> float:
+        """
+        Record a review with the SM-2 algorithm
+
+        Args:
+            card_id (int): Card reviewed
+            quality (int): 0 (blackout) to 5 (perfect recall); below 3 is a failure
+            now (float): Review time (defaults to now)
+
+        Returns:
+            float: New due time
+        """
+        now = time.time() if now is None else now
+        quality = max(0, min(5, int(quality)))
+        with self._lock:
+            if quality < 3:
+                self.reps[card_id] = 0
+                self.lapses[card_id] = min(self.lapses[card_id] + 1, 0xFFFF)
+                self.interval[card_id] = 0.0
+                due = now + RELEARN_DELAY
+            else:
+                reps = min(self.reps[card_id] + 1, 0xFFFF)
+                self.reps[card_id] = reps
+                if reps == 1:
+                    interval = 1.0
+                elif reps == 2:
+                    interval = 6.0
+                else:
+                    interval = round(self.interval[card_id] * self.ease[card_id])
+                self.interval[card_id] = interval
+                due = now + interval * DAY
+
+            penalty = 5 - quality
+            self.ease[card_id] = max(MIN_EASE, self.ease[card_id] + 0.1 - penalty * (0.08 + penalty * 0.02))
+            self.due[card_id] = due
+            heapq.heappush(self._heap, (due, card_id))
+            if due <= self.queue_until:
+                # Carte ratée : elle revient dans la session du jour
+                self.daily_queue.append(card_id)
+            self.dirty = True
+            return due
+
+    # --- Due queue ---
+
+    def _clean_top(self):
+        # Une entrée est périmée si la carte a été re-planifiée depuis
+        heap = self._heap
+        while heap and self.due[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_due(self, now: Optional[float] = None) -> Optional[int]:
+        """Id of the card that is due soonest if it is due by `now`, else None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._clean_top()
+            if self._heap and self._heap[0][0] <= now:
+                return self._heap[0][1]
+            return None
+
+    def next_due_time(self) -> Optional[float]:
+        """When the next card becomes due (None without cards)"""
+        with self._lock:
+            self._clean_top()
+            return self._heap[0][0] if self._heap else None
+
+    def build_daily_queue(self, now: Optional[float] = None) -> int:
+        """
+        Precompute the ids due before the end of the day, soonest first
+
+        Returns:
+            int: Number of cards in the queue
+        """
+        now = time.time() if now is None else now
+        end_of_day = time.mktime(time.localtime(now)[:3] + (23, 59, 59, 0, 0, -1))
+        with self._lock:
+            due = self.due
+            queue = sorted((card_id for card_id in range(len(due)) if due[card_id] <= end_of_day),
+                           key=due.__getitem__)
+            self.daily_queue = deque(queue)
+            self.queue_until = end_of_day
+            return len(queue)
+
+    def start_session(self, limit: int = 20, now: Optional[float] = None) -> List[int]:
+        """
+        Cards to review now, taken from the precomputed daily queue
+
+        Cards already reviewed (re-planned later) are skipped; the session starts
+        without scanning the store.
+        """
+        now = time.time() if now is None else now
+        self.ready.wait()
+        if now > self.queue_until:
+            self.build_daily_queue(now)
+        session = []
+        with self._lock:
+            seen = set()
+            kept = deque()
+            while self.daily_queue and len(session) < limit:
+                card_id = self.daily_queue.popleft()
+                if card_id in seen:
+                    continue
+                seen.add(card_id)
+                if self.due[card_id] <= now:
+                    session.append(card_id)
+                elif self.due[card_id] <= self.queue_until:
+                    kept.append(card_id)
+            # Les cartes pas encore dues (ex: réapprentissage) restent en file
+            self.daily_queue.extendleft(reversed(kept))
+            # Les cartes de la session restent en fin de file tant qu'elles ne sont pas notées ;
+            # une fois notées elles sont dues plus tard et seront ignorées
+            self.daily_queue.extend(session)
+        return session
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        """Number of cards due by `now` (linear scan, for statistics only)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return sum(1 for due in self.due if due <= now)
+
+    # --- Persistence ---
+
+    def save(self, path: Optional[str] = None):
+        """Write the store atomically (arrays as raw little-endian data + texts)"""
+        path = path or self.store_file
+        if path == self._unreadable:
+            print(f"❌ Review cards not saved: {path} could not be read and is kept as is")
+            return
+        with self._lock:
+            columns = [self.due, self.interval, self.ease, self.reps, self.lapses, self.kind]
+            texts = '\0'.join(self.fronts + self.backs).encode('utf-8')
+            count = len(self.due)
+            payload = []
+            for column in columns:
+                if sys.byteorder != 'little':
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                payload.append(column.tobytes())
+            self.dirty = False
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, count))
+                for data in payload:
+                    f.write(data)
+                f.write(texts)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.dirty = True
+            print(f"❌ Error saving review cards: {e}")
+
+    def load(self, path: Optional[str] = None, now: Optional[float] = None):
+        """Read the store, rebuild the heap (O(n) heapify) and the daily queue"""
+        path = path or self.store_file
+        try:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                magic, version, count = HEADER.unpack_from(data, 0)
+                if magic != MAGIC or version != VERSION:
+                    raise ValueError("unknown review store format")
+
+                offset = HEADER.size
+                columns = []
+                for typecode in ('d', 'f', 'f', 'H', 'H', 'B'):
+                    column = array(typecode)
+                    size = count * column.itemsize
+                    column.frombytes(data[offset:offset + size])
+                    if sys.byteorder != 'little':
+                        column.byteswap()
+                    if len(column) != count:
+                        raise ValueError("truncated review store")
+                    columns.append(column)
+                    offset += size
+                texts = data[offset:].decode('utf-8').split('\0') if count else []
+                if len(texts) != 2 * count:
+                    raise ValueError("review store texts do not match its cards")
+
+                with self._lock:
+                    self.due, self.interval, self.ease, self.reps, self.lapses, self.kind = columns
+                    self.fronts, self.backs = texts[:count], texts[count:]
+                    self._lookup = {key: i for i, key in enumerate(zip(self.fronts, self.backs))}
+                    self._heap = [(due, i) for i, due in enumerate(self.due)]
+                    heapq.heapify(self._heap)
+                    self.dirty = False
+                print(f"🗂️ Loaded {count} review cards")
+        except Exception as e:
+            print(f"❌ Error loading review cards: {e}")
+            self._set_aside(path)
+
+        self.build_daily_queue(now)
+        self._finish_loading()
+        self.ready.set()
+
+    def _set_aside(self, path: str):
+        """Move an unreadable store out of the way so the next save cannot replace the learner's deck"""
+        aside = f"{path}.unreadable-{time.strftime('%Y%m%d_%H%M%S')}"
+        try:
+            os.replace(path, aside)
+            print(f"⚠️ Unreadable review store kept as {aside}")
+        except OSError as e:
+            print(f"⚠️ Could not move the unreadable review store ({e}), saving is disabled")
+            self._unreadable = path
+
+    def _finish_loading(self):
+        """Leave the loading state and add the cards created meanwhile"""
+        with self._lock:
+            self._loading = False
+            pending, self._pending_cards = self._pending_cards, []
+            for front, back, kind, now in pending:
+                self._insert_card(front, back, kind, now)
+
+    def load_in_background(self, executor=None):
+        """Load the store and precompute today's queue without blocking startup
+
+        Returns:
+            Task: The load task on the background lane (None if the lane could
+                  not take it and the store was loaded on this thread)
+        """
+        with self._lock:
+            self._loading = True
+        try:
+            return (executor or default_executor()).submit(self.load, lane=LANE_BACKGROUND, name='reviews.load')
+        except (QueueFull, RuntimeError) as e:
+            # Aucune tâche ne chargera le magasin : ne pas laisser les ajouts en attente
+            print(f"⚠️ Review cards loaded in the foreground: {e}")
+            self._finish_loading()
+            self.load()
+            return None
+
+    def save_in_background(self, executor=None):
+        """Save the store from the background lane (the UI thread only queues the write)"""
+        return (executor or default_executor()).submit(self.save, lane=LANE_BACKGROUND, name='reviews.save')
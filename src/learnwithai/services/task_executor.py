@@ -0,0 +1,357 @@
+"""
+Background task executor for LearnwithAI
+One scheduler for the work that must not block the UI thread. A task goes to a
+priority lane (interactive chat > audio post-processing > prefetch and
+maintenance), waits in that lane's bounded queue, runs on a shared thread pool
+(or a process pool for CPU-bound functions) and reports back through callbacks
+marshalled to the Toga event loop.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Voies, par priorité décroissante
+LANE_INTERACTIVE = 0
+LANE_AUDIO = 1
+LANE_BACKGROUND = 2
+LANE_NAMES = {LANE_INTERACTIVE: 'interactive', LANE_AUDIO: 'audio', LANE_BACKGROUND: 'background'}
+
+QUEUE_LIMITS = {LANE_INTERACTIVE: 32, LANE_AUDIO: 16, LANE_BACKGROUND: 128}
+# Un thread réservé par voie prioritaire : le travail de fond ne peut pas les bloquer
+RESERVED_WORKERS = {LANE_INTERACTIVE: 1, LANE_AUDIO: 1}
+SHARED_WORKERS = 3
+PROCESS_WORKERS = 2
+TIMING_WINDOW = 200  # Dernières mesures d'attente / d'exécution gardées par voie
+
+# États d'une tâche
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class TaskCancelled(Exception):
+    """Raised by a task that noticed its cancellation token, or when waiting on a cancelled task"""
+
+
+class QueueFull(Exception):
+    """The lane already holds its maximum number of pending tasks"""
+
+
+class CancellationToken:
+    def __init__(self):
+        """Cooperative cancellation flag shared by a task and whoever may cancel it"""
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to `timeout` seconds; returns True as soon as the token is cancelled"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class Task:
+    def __init__(self, task_id: int, name: str, lane: int, func: Callable, args: tuple,
+                 token: CancellationToken, on_done: Optional[Callable], on_error: Optional[Callable],
+                 with_token: bool, use_process: bool):
+        """A unit of work submitted to a TaskExecutor (see TaskExecutor.submit)"""
+        self.id = task_id
+        self.name = name
+        self.lane = lane
+        self.func = func
+        self.args = args
+        self.token = token
+        self.on_done = on_done
+        self.on_error = on_error
+        self.with_token = with_token
+        self.use_process = use_process
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self._finished = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def cancel(self):
+        """Cancel the task (a pending task never runs; a running one sees its token)"""
+        self.token.cancel()
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        Block until the task has finished
+
+        Returns:
+            The task's result
+
+        Raises:
+            TimeoutError: The task did not finish in time
+            TaskCancelled: The task was cancelled
+            Exception: The error raised by the task
+        """
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"Task {self.name} still {self.state}")
+        if self.state == CANCELLED:
+            raise TaskCancelled()
+        if self.state == FAILED:
+            raise self.error
+        return self.result
+
+
+class TaskExecutor:
+    def __init__(self, shared_workers: int = SHARED_WORKERS, reserved_workers: Optional[Dict[int, int]] = None,
+                 queue_limits: Optional[Dict[int, int]] = None, process_workers: int = PROCESS_WORKERS):
+        """
+        Args:
+            shared_workers (int): Threads taking tasks from every lane, highest priority first
+            reserved_workers (dict): Extra threads per lane that only serve that lane
+            queue_limits (dict): Maximum pending tasks per lane
+            process_workers (int): Size of the process pool (created on first use)
+        """
+        self.shared_workers = shared_workers
+        self.reserved_workers = RESERVED_WORKERS if reserved_workers is None else reserved_workers
+        self.queue_limits = {**QUEUE_LIMITS, **(queue_limits or {})}
+        self.process_workers = process_workers
+        self._lanes = {lane: deque() for lane in LANE_NAMES}
+        self._condition = threading.Condition()
+        self._running: Dict[int, Task] = {}
+        self._ids = itertools.count(1)
+        self._threads: List[threading.Thread] = []
+        self._process_pool = None
+        self._dispatch = None
+        self._shutdown = False
+        self._counters = {lane: {'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0} for lane in LANE_NAMES}
+        self._wait_times = {lane: deque(maxlen=TIMING_WINDOW) for lane in LANE_NAMES}
+        self._run_times = {lane: deque(maxlen=TIMING_WINDOW) for lane in LANE_NAMES}
+
+    def bind_loop(self, loop):
+        """Deliver completion callbacks on this asyncio loop (Toga's app.loop)"""
+        self._dispatch = loop.call_soon_threadsafe
+
+    def _start_workers(self):
+        """Start the worker threads (called with the condition held, on first submit)"""
+        priority = tuple(sorted(LANE_NAMES))
+        workers = [(f"{LANE_NAMES[lane]}-{i}", (lane,))
+                   for lane, count in self.reserved_workers.items() for i in range(count)]
+        workers += [(f"shared-{i}", priority) for i in range(self.shared_workers)]
+        for name, lanes in workers:
+            thread = threading.Thread(target=self._worker, args=(lanes,), name=f"task-{name}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, func: Callable, *args, lane: int = LANE_BACKGROUND, name: Optional[str] = None,
+               on_done: Optional[Callable] = None, on_error: Optional[Callable] = None,
+               token: Optional[CancellationToken] = None, with_token: bool = False,
+               use_process: bool = False) -> Task:
+        """
+        Queue func(*args) on a lane
+
+        Args:
+            lane (int): LANE_INTERACTIVE, LANE_AUDIO or LANE_BACKGROUND
+            name (str): Label used in stats and logs (defaults to the function name)
+            on_done: Called with the result, on the UI loop when one is bound
+            on_error: Called with the exception, on the UI loop when one is bound
+            token (CancellationToken): Shared token (a new one is created otherwise)
+            with_token (bool): Pass the token to func as the `token` keyword argument
+            use_process (bool): Run func in the process pool (func and args must be picklable)
+
+        Returns:
+            Task: Handle to wait for or cancel the task
+
+        Raises:
+            QueueFull: The lane's queue is at its limit
+        """
+        if lane not in LANE_NAMES:
+            raise ValueError(f"Unknown lane: {lane}")
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Task executor is shut down")
+            queue = self._lanes[lane]
+            if len(queue) >= self.queue_limits[lane]:
+                self._counters[lane]['rejected'] += 1
+                raise QueueFull(f"{LANE_NAMES[lane]} queue is full ({len(queue)} tasks pending)")
+            if not self._threads:
+                self._start_workers()
+            task = Task(next(self._ids), name or getattr(func, '__name__', 'task'), lane, func, args,
+                        token or CancellationToken(), on_done, on_error, with_token, use_process)
+            queue.append(task)
+            self._condition.notify_all()
+        return task
+
+    def _next_task(self, lanes) -> Optional[Task]:
+        """Pop the first runnable task of the highest-priority lane (condition held)"""
+        for lane in lanes:
+            queue = self._lanes[lane]
+            while queue:
+                task = queue.popleft()
+                if task.token.cancelled:
+                    # Annulée avant de démarrer : ne s'exécute jamais
+                    self._finish(task, CANCELLED)
+                    continue
+                return task
+        return None
+
+    def _worker(self, lanes):
+        while True:
+            with self._condition:
+                task = self._next_task(lanes)
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    task = self._next_task(lanes)
+                task.state = RUNNING
+                task.started = time.perf_counter()
+                self._running[task.id] = task
+            self._run(task)
+
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._condition:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+
+    def _run(self, task: Task):
+        state = DONE
+        try:
+            if task.use_process:
+                future = self._processes().submit(task.func, *task.args)
+                # Le processus ne voit pas le jeton : on arrête seulement d'attendre son résultat
+                while not future.done():
+                    if task.token.wait(0.05):
+                        future.cancel()
+                        raise TaskCancelled()
+                task.result = future.result()
+            elif task.with_token:
+                task.result = task.func(*task.args, token=task.token)
+            else:
+                task.result = task.func(*task.args)
+        except TaskCancelled:
+            state = CANCELLED
+        except Exception as e:
+            state = FAILED
+            task.error = e
+            print(f"⚠️ Task {task.name} ({LANE_NAMES[task.lane]}) failed: {e}")
+
+        # Pas de rappel pour une tâche annulée entre-temps (la vue a pu être quittée)
+        if state == DONE and task.on_done and not task.token.cancelled:
+            self._call(task.on_done, task.result)
+        elif state == FAILED and task.on_error and not task.token.cancelled:
+            self._call(task.on_error, task.error)
+
+        # wait() rend la main après le rappel (ou sa mise en file sur la boucle UI)
+        with self._condition:
+            self._running.pop(task.id, None)
+            self._finish(task, state)
+
+    def _finish(self, task: Task, state: str):
+        """Record a finished task (condition held)"""
+        task.state = state
+        task.finished = time.perf_counter()
+        counters = self._counters[task.lane]
+        counters['completed' if state == DONE else state] += 1
+        if task.started is not None:
+            self._wait_times[task.lane].append(task.started - task.submitted)
+            self._run_times[task.lane].append(task.finished - task.started)
+        task._finished.set()
+
+    def _call(self, callback: Callable, value):
+        """Run a completion callback on the UI loop when one is bound, else inline"""
+        if self._dispatch is not None:
+            try:
+                self._dispatch(callback, value)
+                return
+            except RuntimeError:
+                pass  # Boucle fermée (fin de l'application) : exécuter sur place
+        try:
+            callback(value)
+        except Exception as e:
+            print(f"⚠️ Task callback failed: {e}")
+
+    def cancel_lane(self, lane: int) -> int:
+        """Cancel every pending task of a lane; returns how many were cancelled"""
+        with self._condition:
+            tasks = list(self._lanes[lane])
+            self._lanes[lane].clear()
+            for task in tasks:
+                task.token.cancel()
+                self._finish(task, CANCELLED)
+        return len(tasks)
+
+    def active(self) -> List[Dict]:
+        """Tasks running right now, longest-running first"""
+        now = time.perf_counter()
+        with self._condition:
+            running = sorted(self._running.values(), key=lambda task: task.started)
+            return [{'id': task.id, 'name': task.name, 'lane': LANE_NAMES[task.lane],
+                     'seconds': round(now - task.started, 3)} for task in running]
+
+    def stats(self) -> Dict:
+        """Per-lane queue depth, running tasks, outcomes and mean wait / run time (ms)"""
+        def mean_ms(values):
+            return round(sum(values) / len(values) * 1000, 2) if values else 0.0
+
+        with self._condition:
+            lanes = {}
+            for lane, name in LANE_NAMES.items():
+                lanes[name] = dict(
+                    self._counters[lane],
+                    queued=len(self._lanes[lane]),
+                    running=sum(1 for task in self._running.values() if task.lane == lane),
+                    wait_ms=mean_ms(self._wait_times[lane]),
+                    run_ms=mean_ms(self._run_times[lane]),
+                )
+            return {'lanes': lanes, 'workers': len(self._threads)}
+
+    def shutdown(self, timeout: float = 2.0):
+        """Cancel pending and running tasks and stop the workers"""
+        with self._condition:
+            self._shutdown = True
+            for lane in LANE_NAMES:
+                for task in self._lanes[lane]:
+                    task.token.cancel()
+                    self._finish(task, CANCELLED)
+                self._lanes[lane].clear()
+            for task in self._running.values():
+                task.token.cancel()
+            self._condition.notify_all()
+            threads, self._threads = self._threads, []
+            process_pool, self._process_pool = self._process_pool, None
+
+        deadline = time.perf_counter() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.perf_counter()))
+        if process_pool is not None:
+            process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+
+def default_executor() -> TaskExecutor:
+    """The executor shared by the application's services"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None or _default_executor._shutdown:
+            _default_executor = TaskExecutor()
+        return _default_executor
@@ -0,0 +1,272 @@
+"""
+Segmented transcription for LearnwithAI
+Long recordings are cut at the quietest point near every segment boundary,
+each segment keeps a short overlap with its neighbours, segments are
+transcribed concurrently by a bounded worker pool and the texts are stitched
+back with the words repeated in the overlaps removed.
+"""
+
+import io
+import re
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not available. Install with: pip install numpy")
+
+from .audio_buffer import resample
+from .pronunciation import read_wav_mono
+
+# Whisper travaille à 16 kHz : inutile d'envoyer plus
+TRANSCRIPTION_RATE = 16000
+DEFAULT_WHISPER_MODEL = "whisper-large-v3-turbo"
+
+# Découpage : segments de ~20 s, jamais plus de 28 s, coupés dans un silence
+TARGET_SEGMENT_SECONDS = 20.0
+MIN_SEGMENT_SECONDS = 10.0
+MAX_SEGMENT_SECONDS = 28.0
+OVERLAP_SECONDS = 1.0  # Chevauchement au cas où la coupure tombe dans un mot
+ENERGY_FRAME_SECONDS = 0.02
+QUIET_WINDOW_SECONDS = 0.3  # Durée de silence recherchée autour de la coupure
+# Pénalité (dB par seconde) pour s'éloigner de la cible
+DISTANCE_PENALTY_DB = 1.0
+
+DEFAULT_WORKERS = 4
+SEGMENT_RETRIES = 1
+MAX_OVERLAP_WORDS = 12
+
+_TOKEN_RE = re.compile(r"[\w']+")
+
+
+class TranscriptionFailed(Exception):
+    """Raised when a segment still fails after its retries: the transcript would have a hole"""
+
+
+class Segment:
+    __slots__ = ('index', 'start', 'end', 'samples', 'rate')
+
+    def __init__(self, index: int, start: int, end: int, samples: "np.ndarray", rate: int):
+        """Slice [start, end) of a recording (sample indices at `rate`)"""
+        self.index = index
+        self.start = start
+        self.end = end
+        self.samples = samples
+        self.rate = rate
+
+    @property
+    def start_time(self) -> float:
+        return self.start / float(self.rate)
+
+    @property
+    def end_time(self) -> float:
+        return self.end / float(self.rate)
+
+    def wav_bytes(self) -> bytes:
+        """The segment as a 16-bit mono WAV file in memory"""
+        pcm = np.clip(self.samples * 32767.0, -32768, 32767).astype('<i2')
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+
+def _frame_energy_db(samples: "np.ndarray", frame: int) -> "np.ndarray":
+    """Energy (dB) of consecutive non-overlapping frames"""
+    count = samples.size // frame
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float64)
+    return 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+
+
+def plan_segments(samples: "np.ndarray", rate: int,
+                  target_seconds: float = TARGET_SEGMENT_SECONDS,
+                  min_seconds: float = MIN_SEGMENT_SECONDS,
+                  max_seconds: float = MAX_SEGMENT_SECONDS,
+                  overlap_seconds: float = OVERLAP_SECONDS) -> List[Tuple[int, int]]:
+    """
+    Choose segment boundaries for a recording
+
+    Each cut is placed in the quietest `QUIET_WINDOW_SECONDS` stretch between
+    min_seconds and max_seconds after the previous cut, with a small penalty
+    for straying from target_seconds. Segments then extend by half the overlap
+    on both sides of every cut.
+
+    Returns:
+        list: (start, end) sample indices, in order
+    """
+    total = samples.size
+    if total <= int(max_seconds * rate):
+        return [(0, total)]
+
+    frame = max(1, int(ENERGY_FRAME_SECONDS * rate))
+    energy = _frame_energy_db(samples, frame)
+    # Énergie moyenne sur une fenêtre glissante : on cherche une vraie pause, pas un creux isolé
+    window = max(1, int(QUIET_WINDOW_SECONDS / ENERGY_FRAME_SECONDS))
+    quiet = np.convolve(energy, np.ones(window) / window, mode='same')
+    frame_seconds = frame / float(rate)
+
+    cuts = []
+    position = 0  # en trames
+    total_frames = energy.size
+    while (total_frames - position) * frame_seconds > max_seconds:
+        low = position + int(min_seconds / frame_seconds)
+        high = min(total_frames, position + int(max_seconds / frame_seconds))
+        candidates = np.arange(low, high)
+        distance = np.abs(candidates - (position + target_seconds / frame_seconds)) * frame_seconds
+        cut = int(candidates[np.argmin(quiet[low:high] + DISTANCE_PENALTY_DB * distance)])
+        cuts.append(cut * frame)
+        position = cut
+
+    half_overlap = int(overlap_seconds * rate / 2)
+    bounds = [0] + cuts + [total]
+    return [(max(0, bounds[i] - half_overlap), min(total, bounds[i + 1] + half_overlap))
+            for i in range(len(bounds) - 1)]
+
+
+def split_recording(samples: "np.ndarray", rate: int, **kwargs) -> List[Segment]:
+    """Cut samples into overlapping Segments (views on `samples`, no copy)"""
+    return [Segment(index, start, end, samples[start:end], rate)
+            for index, (start, end) in enumerate(plan_segments(samples, rate, **kwargs))]
+
+
+def _normalise(word: str) -> str:
+    return "".join(_TOKEN_RE.findall(word.lower()))
+
+
+def stitch_transcripts(texts: Sequence[str], max_overlap_words: int = MAX_OVERLAP_WORDS) -> str:
+    """
+    Join segment transcripts, dropping the words repeated in each overlap
+
+    The longest run of words that ends the text so far and starts the next
+    segment (compared without case or punctuation) is kept only once, as it
+    appears in the earlier segment.
+    """
+    words: List[str] = []
+    for text in texts:
+        incoming = text.split()
+        if not incoming:
+            continue
+        incoming_keys = [_normalise(word) for word in incoming[:max_overlap_words]]
+        tail_keys = [_normalise(word) for word in words[-max_overlap_words:]]
+        skip = 0
+        for size in range(min(len(tail_keys), len(incoming_keys)), 0, -1):
+            if tail_keys[-size:] == incoming_keys[:size]:
+                skip = size
+                break
+        words.extend(incoming[skip:])
+    return " ".join(words)
+
+
+class StubTranscriptionBackend:
+    def __init__(self, words: Optional[Sequence[Tuple[float, str]]] = None, delay: float = 0.0,
+                 delay_per_second: float = 0.0):
+        """
+        Local backend for tests and benchmarks
+
+        Args:
+            words: (time in seconds, word) pairs; a segment returns the words it contains
+            delay (float): Fixed latency per request, in seconds
+            delay_per_second (float): Extra latency per second of audio
+        """
+        self.words = sorted(words or [])
+        self.delay = delay
+        self.delay_per_second = delay_per_second
+        self.requests = 0
+
+    def transcribe(self, segment: Segment) -> str:
+        self.requests += 1
+        time.sleep(self.delay + self.delay_per_second * (segment.end_time - segment.start_time))
+        if not self.words:
+            return f"[{segment.start_time:.1f}-{segment.end_time:.1f}]"
+        return " ".join(word for at, word in self.words if segment.start_time <= at < segment.end_time)
+
+
+class GroqWhisperBackend:
+    def __init__(self, client, model: str = DEFAULT_WHISPER_MODEL, language: Optional[str] = "en"):
+        """Whisper transcription through the Groq audio API"""
+        self.client = client
+        self.model = model
+        self.language = language
+
+    def transcribe(self, segment: Segment) -> str:
+        kwargs = {'language': self.language} if self.language else {}
+        result = self.client.audio.transcriptions.create(
+            file=(f"segment_{segment.index}.wav", segment.wav_bytes()),
+            model=self.model,
+            response_format="json",
+            temperature=0.0,
+            **kwargs
+        )
+        return (getattr(result, 'text', None) or "").strip()
+
+
+class SegmentedTranscriber:
+    def __init__(self, backend, workers: int = DEFAULT_WORKERS, rate: int = TRANSCRIPTION_RATE,
+                 retries: int = SEGMENT_RETRIES, **segment_options):
+        """
+        Args:
+            backend: Object with transcribe(segment) -> str
+            workers (int): Concurrent requests at most
+            rate (int): Sample rate the audio is converted to before upload
+            retries (int): New attempts for a segment whose request failed
+            segment_options: target_seconds, min_seconds, max_seconds, overlap_seconds
+        """
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.rate = rate
+        self.retries = retries
+        self.segment_options = segment_options
+        self.last_stats: Dict = {}
+
+    def _transcribe_segment(self, segment: Segment) -> Optional[str]:
+        """Text of one segment, None when every attempt failed"""
+        for attempt in range(self.retries + 1):
+            try:
+                return self.backend.transcribe(segment)
+            except Exception as e:
+                print(f"⚠️ Segment {segment.index} ({segment.start_time:.1f}s) failed "
+                      f"(attempt {attempt + 1}): {e}")
+        return None
+
+    def transcribe_samples(self, samples: "np.ndarray", rate: int) -> str:
+        """Transcribe mono float32 samples recorded at `rate`
+
+        Raises:
+            TranscriptionFailed: a segment failed after its retries
+        """
+        started = time.perf_counter()
+        samples = resample(samples, rate, self.rate)
+        segments = split_recording(samples, self.rate, **self.segment_options)
+
+        if len(segments) == 1:
+            texts = [self._transcribe_segment(segments[0])]
+        else:
+            # Pool borné : au plus `workers` requêtes simultanées, résultats dans l'ordre
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(segments)),
+                                    thread_name_prefix="transcribe") as pool:
+                texts = list(pool.map(self._transcribe_segment, segments))
+
+        self.last_stats = {
+            'segments': len(segments),
+            'audio_seconds': round(samples.size / float(self.rate), 2),
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'failed_segments': sum(1 for text in texts if text is None),
+        }
+        # Un segment manquant rendrait une transcription tronquée : échec plutôt que texte partiel
+        if self.last_stats['failed_segments']:
+            raise TranscriptionFailed(f"{self.last_stats['failed_segments']} of {len(segments)} "
+                                      f"segment(s) could not be transcribed")
+        return stitch_transcripts(texts)
+
+    def transcribe_file(self, file_path: str) -> str:
+        """Transcribe a 16-bit WAV recording (resampled while it is read)"""
+        samples, rate = read_wav_mono(file_path, self.rate)
+        return self.transcribe_samples(samples, rate)
@@ -2,22 +2,35 @@
 AI Chat view for LearnwithAI - Conversation with chatbot and audio recording
 """
 
-import json
 import os
-import re
 import toga
 from toga.style.pack import COLUMN, ROW, Pack
 from ..services.ai_service import AIChatService
+from ..services.conversation import ASSISTANT_SENDER, TIP_SENDER, USER_SENDER, Conversation
+from ..services.profiling import profiled
+from ..services.response_parser import parse_ai_response
+from ..services.review_scheduler import KIND_TIP
+from ..services.task_executor import LANE_AUDIO, LANE_BACKGROUND, LANE_INTERACTIVE, QueueFull
+from .chat_transcript import TranscriptRenderer
+
+# Rafraîchissement du vumètre pendant l'enregistrement (secondes)
+LEVEL_METER_INTERVAL = 0.1
+WAVEFORM_WIDTH = 400
+WAVEFORM_HEIGHT = 60
 
 
 class AIChatView:
     def __init__(self, app):
         self.app = app
-        self.conversation_history = []
+        self.conversation = Conversation()
+        self.transcript = None
+        self.last_user_message = None
+        self._remembered_id = -1  # Dernier message déjà passé à la mémoire à long terme
         self.recording = False
         # Use the shared services from the app
         self.ai_service = app.ai_service
         self.audio_service = app.audio_service
+        self.executor = app.executor
         
     def create_view(self):
         """Create the AI chat page with text and audio capabilities"""
@@ -52,6 +65,7 @@ class AIChatView:
                 height=300
             )
         )
+        self.transcript = TranscriptRenderer(self.chat_display)
         
         # Text input for typing messages
         self.message_input = toga.TextInput(
@@ -110,6 +124,23 @@ class AIChatView:
             )
         )
         
+        # Live input level meter
+        self.level_meter = toga.ProgressBar(
+            max=1.0,
+            value=0.0,
+            style=Pack(padding=5, width=WAVEFORM_WIDTH)
+        )
+        
+        # Waveform of the last saved recording
+        self.waveform_canvas = toga.Canvas(
+            style=Pack(padding=5, width=WAVEFORM_WIDTH, height=WAVEFORM_HEIGHT)
+        )
+        
+        level_box = toga.Box(
+            children=[self.level_meter, self.waveform_canvas],
+            style=Pack(direction=COLUMN, alignment="center")
+        )
+        
         # Main container
         main_box = toga.Box(
             children=[
@@ -117,7 +148,8 @@ class AIChatView:
                 self.chat_display,
                 text_input_box,
                 audio_box,
-                self.recording_status
+                self.recording_status,
+                level_box
             ],
             style=Pack(
                 direction=COLUMN,
@@ -126,107 +158,143 @@ class AIChatView:
         )
         
         # Initialize chat with welcome message
-        self.add_message("AI Assistant", "Hi there! How’s your day going? I'm your English practice partner. You can write or speak — let's start improving your English together!")
+        self.add_message(ASSISTANT_SENDER, "Hi there! How’s your day going? I'm your English practice partner. You can write or speak — let's start improving your English together!")
 
         return main_box
     
+    def on_show(self):
+        """Re-validate the audio devices each time the chat is opened (a microphone may have been plugged in)"""
+        if self.audio_service:
+            self.audio_service.request_device_rescan()
+    
     def go_back(self, widget):
         """Return to home view"""
-        from .home_view import HomeView
-        home_view = HomeView(self.app)
-        self.app.main_window.content = home_view.create_view()
+        if self.app.review_scheduler.dirty:
+            self.app.review_scheduler.save_in_background(self.executor)
+        self.remember_session()
+        self.app.router.show('home')
+    
+    def take_new_messages(self):
+        """Messages not yet handed to the learner memory (marked as handed)"""
+        new_messages = self.conversation.since(self._remembered_id)
+        if new_messages:
+            self._remembered_id = new_messages[-1].id
+        return new_messages
+    
+    def remember_session(self):
+        """Hand the messages since the last call to the learner memory (background lane)"""
+        new_messages = self.take_new_messages()
+        if not new_messages:
+            return
+        try:
+            self.executor.submit(self.ai_service.remember_session, new_messages,
+                                 lane=LANE_BACKGROUND, name='memory.remember')
+        except QueueFull as e:
+            print(f"⚠️ Session not remembered: {e}")
         
     def send_message(self, widget):
         """Send text message to AI"""
         message = self.message_input.value.strip()
         if message:
+            # Contexte envoyé à l'IA : l'historique avant ce message
+            history = self.conversation.recent(10)
+            
             # Add user message to chat
-            self.add_message("Vous", message)
+            self.add_message(USER_SENDER, message)
+            self.last_user_message = message
             
             # Clear input
             self.message_input.value = ""
             
-            # Show thinking indicator
-            self.add_message("AI Assistant", "🤔 Thinking...")
+            # Show thinking indicator (replaced in place by the reply)
+            placeholder_id = self.add_message(ASSISTANT_SENDER, "🤔 Thinking...")
+            
+            def show_error(error):
+                # Replace thinking indicator with the error
+                self.update_message(placeholder_id, f"Sorry, I encountered an error: {str(error)}")
+                print(f"AI Service error: {error}")
             
+            # Les requêtes tournent sur la voie interactive ; les rappels arrivent sur le thread UI
             try:
-                # Get AI response using Groq
-                ai_response = self.ai_service.send_message(message, self.conversation_history)
-                
-                # Remove thinking indicator first
-                self.remove_last_message()
-                
-                # Process and display the response
-                self.process_ai_response(ai_response)
-                
-            except Exception as e:
-                # Remove thinking indicator and show error
-                self.remove_last_message()
-                self.add_message("AI Assistant", f"Sorry, I encountered an error: {str(e)}")
-                print(f"AI Service error: {e}")
+                if self.ai_service.parallel_corrections:
+                    # La réponse s'affiche dès qu'elle arrive, la correction s'ajoute ensuite
+                    self.ai_service.send_message_parallel(
+                        message, history,
+                        on_reply=lambda reply: self.process_ai_response(reply, placeholder_id, False),
+                        on_tips=lambda tips: self.add_tip_message(tips, message),
+                        on_error=show_error,
+                        executor=self.executor
+                    )
+                else:
+                    self.executor.submit(
+                        self.ai_service.send_message, message, history,
+                        lane=LANE_INTERACTIVE, name='chat.send',
+                        on_done=lambda reply: self.process_ai_response(reply, placeholder_id, user_message=message),
+                        on_error=show_error
+                    )
+            except QueueFull as e:
+                show_error(e)
     
-    def add_message(self, sender, message):
-        """Add a message to the chat display"""
-        timestamp = "now"  # TODO: Add proper timestamp
-        formatted_message = f"[{timestamp}] {sender}: {message}\n\n"
+    def add_message(self, sender, message, message_type=None):
+        """Add a message to the chat display
         
-        current_text = self.chat_display.value or ""
-        self.chat_display.value = current_text + formatted_message
-        
-        # Store in conversation history
-        self.conversation_history.append({
-            'sender': sender,
-            'message': message,
-            'timestamp': timestamp
-        })
+        Returns:
+            int: Id of the new message (for update_message / remove_message)
+        """
+        entry = self.conversation.append(sender, message, type=message_type)
+        self.transcript.append(entry)
+        return entry.id
+    
+    def update_message(self, message_id, message):
+        """Change the text of a message already in the chat display"""
+        entry = self.conversation.update(message_id, message)
+        self.transcript.replace(entry)
     
-    def add_tip_message(self, tips):
-        """Add a tip message with gray styling"""
-        timestamp = "now"
+    def add_tip_message(self, tips, user_message=None):
+        """Add a tip message with gray styling
         
-        # Créer un label pour les conseils avec style gris
-        tip_label = toga.Label(
-            f"💡 Conseil: {tips}",
-            style=Pack(
-                padding=5,
-                color="#666666",  # Couleur grise
-                font_style="italic"
-            )
-        )
+        Args:
+            tips (str): Correction text
+            user_message (str): Learner message it corrects (defaults to the last one)
+        """
+        if not tips:
+            return None
         
-        # Pour l'instant, on utilise le système normal mais avec un préfixe spécial
-        # TODO: Améliorer avec un vrai widget stylé quand Toga le supportera mieux
-        formatted_message = f"[{timestamp}] 💡 Conseil: {tips}\n\n"
+        # Mettre à jour le profil d'erreurs utilisé pour personnaliser le prompt
+        self.ai_service.record_tips(tips)
         
-        current_text = self.chat_display.value or ""
-        self.chat_display.value = current_text + formatted_message
+        # Garder la correction comme carte de révision (phrase de l'élève -> conseil)
+        user_message = user_message or self.last_user_message
+        if user_message:
+            self.app.review_scheduler.add_card(user_message, tips, kind=KIND_TIP)
         
-        # Store in conversation history avec un type spécial
-        self.conversation_history.append({
-            'sender': '💡 Conseil',
-            'message': tips,
-            'timestamp': timestamp,
-            'type': 'tip'  # Marquer comme conseil
-        })
+        # TODO: Améliorer avec un vrai widget stylé quand Toga le supportera mieux
+        return self.add_message(TIP_SENDER, tips, message_type='tip')
+    
+    def remove_message(self, message_id):
+        """Remove a message from the conversation and the chat display"""
+        if self.conversation.remove(message_id):
+            self.transcript.remove(message_id)
     
     def remove_last_message(self):
-        """Remove the last message from chat display (for removing thinking indicator)"""
-        if self.conversation_history:
-            # Remove from history
-            self.conversation_history.pop()
-            
-            # Rebuild chat display
-            self.chat_display.value = ""
-            for msg in self.conversation_history:
-                formatted_message = f"[{msg['timestamp']}] {msg['sender']}: {msg['message']}\n\n"
-                current_text = self.chat_display.value or ""
-                self.chat_display.value = current_text + formatted_message
+        """Remove the last message from chat display"""
+        last = self.conversation.last()
+        if last:
+            self.remove_message(last.id)
+    
+    def show_reply(self, message, placeholder_id=None):
+        """Display an AI reply, replacing the thinking indicator if there is one"""
+        if placeholder_id is not None and self.conversation.get(placeholder_id):
+            self.update_message(placeholder_id, message)
+        else:
+            self.add_message(ASSISTANT_SENDER, message)
     
     def start_recording(self, widget):
         """Start audio recording"""
         if self.audio_service.start_recording():
             self.recording_status.text = "🔴 Enregistrement en cours..."
             self.recording = True
+            self.update_level_meter()
         else:
             self.app.main_window.dialog(toga.InfoDialog(
                 "Erreur Audio", 
@@ -234,94 +302,98 @@ class AIChatView:
             ))
     
     def stop_recording(self, widget):
-        """Stop audio recording"""
+        """Stop audio recording (saving and waveform tables run on the audio lane)"""
         if self.recording:
-            file_path = self.audio_service.stop_recording()
             self.recording = False
-            
-            if file_path:
-                self.recording_status.text = f"⏹️ Enregistrement sauvé: {os.path.basename(file_path)}"
-                self.app.main_window.dialog(toga.InfoDialog(
-                    "Enregistrement", 
-                    f"Audio sauvé: {os.path.basename(file_path)}\n\nLa conversion parole-texte sera implémentée prochainement."
-                ))
-            else:
-                self.recording_status.text = "❌ Erreur lors de l'enregistrement"
+            self.level_meter.value = 0.0
+            self.recording_status.text = "💾 Sauvegarde de l'enregistrement..."
+            try:
+                self.executor.submit(self._save_recording, lane=LANE_AUDIO, name='audio.save',
+                                     on_done=self.on_recording_saved, on_error=lambda e: self.on_recording_saved(None))
+            except QueueFull:
+                self.on_recording_saved(self._save_recording())
         else:
             self.recording_status.text = "⚠️ Aucun enregistrement en cours"
     
+    def _save_recording(self):
+        """Stop the capture, write the file and load its waveform (worker thread)"""
+        file_path = self.audio_service.stop_recording()
+        if not file_path:
+            return None
+        return file_path, self.audio_service.get_waveform(file_path, width=WAVEFORM_WIDTH)
+    
+    def on_recording_saved(self, saved):
+        """Show the saved recording (UI thread)"""
+        if not saved:
+            self.recording_status.text = "❌ Erreur lors de l'enregistrement"
+            return
+        file_path, (mins, maxs) = saved
+        self.recording_status.text = f"⏹️ Enregistrement sauvé: {os.path.basename(file_path)}"
+        self.draw_waveform(mins, maxs)
+        self.app.main_window.dialog(toga.InfoDialog(
+            "Enregistrement", 
+            f"Audio sauvé: {os.path.basename(file_path)}\n\nLa conversion parole-texte sera implémentée prochainement."
+        ))
+    
+    def update_level_meter(self):
+        """Refresh the level meter while recording"""
+        if not self.recording:
+            return
+        level = self.audio_service.get_input_level()
+        self.level_meter.value = level['peak_hold']
+        self.app.loop.call_later(LEVEL_METER_INTERVAL, self.update_level_meter)
+    
+    def draw_waveform(self, mins, maxs):
+        """Draw a recording's waveform from its min/max pairs (see AudioService.get_waveform)"""
+        self.waveform_canvas.clear()
+        if not mins:
+            return
+        
+        middle = WAVEFORM_HEIGHT / 2
+        with self.waveform_canvas.Stroke(color="#4a90d9", line_width=1) as stroke:
+            for x, (low, high) in enumerate(zip(mins, maxs)):
+                stroke.move_to(x, middle - high * middle)
+                stroke.line_to(x, middle - low * middle)
+    
     def play_recording(self, widget):
-        """Play the last recording"""
-        if self.audio_service.play_audio():
-            self.recording_status.text = "▶️ Lecture en cours..."
+        """Play the last recording on the audio lane"""
+        self.recording_status.text = "▶️ Lecture en cours..."
+        try:
+            self.executor.submit(self.audio_service.play_audio, lane=LANE_AUDIO, name='audio.play',
+                                 on_done=self.on_playback_finished, on_error=lambda e: self.on_playback_finished(False))
+        except QueueFull:
+            self.on_playback_finished(False)
+    
+    def on_playback_finished(self, played):
+        """Report the end of playback (UI thread)"""
+        if played:
+            self.recording_status.text = "✅ Lecture terminée"
         else:
+            self.recording_status.text = "Prêt à enregistrer"
             self.app.main_window.dialog(toga.InfoDialog(
                 "Erreur", 
                 "Aucun enregistrement à lire ou erreur de lecture"
             ))
     
-    def process_ai_response(self, ai_response):
-        """Process AI response and update chat display"""
+    @profiled('chat.process_ai_response')
+    def process_ai_response(self, ai_response, placeholder_id=None, with_tips=True, user_message=None):
+        """Process AI response and update chat display
+        
+        Args:
+            ai_response (str): Raw reply from the AI service
+            placeholder_id (int): "Thinking..." message to replace with the reply
+            with_tips (bool): Show the reply's tips (False when the correction comes separately)
+            user_message (str): Learner message the reply answers (its tips are filed against it)
+        """
         try:
-            # Nettoyer la réponse (enlever les balises markdown si présentes)
-            cleaned_response = ai_response.strip()
-            
-            # Chercher du JSON dans la réponse (même s'il y a du texte autour)
-            json_pattern = r'\{[^{}]*"response"[^{}]*\}'
-            json_match = re.search(json_pattern, cleaned_response, re.DOTALL)
-            
-            if json_match:
-                try:
-                    json_str = json_match.group(0)
-                    parsed_response = json.loads(json_str)
-                    
-                    # Récupérer la réponse principale
-                    main_response = parsed_response.get('response', '')
-                    tips = parsed_response.get('tips', '')
-                    
-                    # Afficher la réponse principale si elle existe
-                    if main_response and main_response.strip():
-                        self.add_message("AI Assistant", main_response)
-                    else:
-                        # Si pas de réponse dans le JSON, utiliser la réponse complète
-                        self.add_message("AI Assistant", ai_response)
-                    
-                    # Si des conseils existent et ne sont pas vides, les afficher en gris
-                    if tips and tips.strip():
-                        self.add_tip_message(tips)
-                    
-                    return  # Succès, on sort de la fonction
-                    
-                except json.JSONDecodeError as e:
-                    print(f"Erreur de parsing JSON: {e}")
-                    # Continuer vers le traitement normal
-            
-            # Vérifier si c'est du JSON complet et valide
-            if cleaned_response.startswith('{') and cleaned_response.endswith('}'):
-                try:
-                    parsed_response = json.loads(cleaned_response)
-                    
-                    # Récupérer la réponse principale
-                    main_response = parsed_response.get('response', ai_response)
-                    tips = parsed_response.get('tips', '')
-                    
-                    # Afficher la réponse principale
-                    self.add_message("AI Assistant", main_response)
-                    
-                    # Si des conseils existent et ne sont pas vides, les afficher en gris
-                    if tips and tips.strip():
-                        self.add_tip_message(tips)
-                    
-                    return  # Succès, on sort de la fonction
-                    
-                except json.JSONDecodeError:
-                    # Si le parsing JSON échoue, continuer vers le traitement normal
-                    pass
+            reply, tips = parse_ai_response(ai_response)
+            self.show_reply(reply, placeholder_id)
             
-            # Traitement normal si ce n'est pas du JSON valide
-            self.add_message("AI Assistant", ai_response)
+            # Si des conseils existent, les afficher en gris
+            if tips and with_tips:
+                self.add_tip_message(tips, user_message)
                 
         except Exception as e:
             print(f"Erreur lors du traitement de la réponse AI: {e}")
-            # En cas d'erreur, afficher la réponse brute
-            self.add_message("AI Assistant", str(ai_response))
+            # En cas d'erreur, afficher la réponse brute (et retirer l'indicateur "Thinking...")
+            self.show_reply(str(ai_response), placeholder_id)
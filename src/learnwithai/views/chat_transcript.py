@@ -0,0 +1,57 @@
+"""
+Chat transcript renderer for LearnwithAI
+Keeps only a window of recent messages in the chat display and updates the
+affected message instead of rebuilding the whole transcript.
+"""
+
+from collections import OrderedDict
+
+# Nombre de messages gardés dans le widget (les plus anciens restent dans la conversation)
+DEFAULT_WINDOW_SIZE = 100
+
+
+class TranscriptRenderer:
+    def __init__(self, widget, window_size=DEFAULT_WINDOW_SIZE):
+        """
+        Args:
+            widget: Text widget with a `value` (toga.MultilineTextInput)
+            window_size (int): Number of messages kept materialized in the widget
+        """
+        self.widget = widget
+        self.window_size = window_size
+        self._segments = OrderedDict()  # message id -> formatted text
+        self._hidden = 0  # messages scrolled out of the window
+
+    def append(self, entry):
+        """Show a new message at the end of the transcript"""
+        self._segments[entry.id] = entry.format()
+        if len(self._segments) > self.window_size:
+            self._segments.popitem(last=False)
+            self._hidden += 1
+        self._render()
+
+    def replace(self, entry):
+        """Re-render a message that changed in place"""
+        if entry.id in self._segments:
+            self._segments[entry.id] = entry.format()
+            self._render()
+
+    def remove(self, message_id):
+        """Remove a message from the transcript"""
+        if self._segments.pop(message_id, None) is not None:
+            self._render()
+
+    def clear(self):
+        self._segments.clear()
+        self._hidden = 0
+        self._render()
+
+    def text(self):
+        """Text currently materialized in the widget"""
+        header = f"… {self._hidden} earlier message(s) …\n\n" if self._hidden else ""
+        return header + "".join(self._segments.values())
+
+    def _render(self):
+        # Coût proportionnel à la fenêtre, pas à la longueur de la session
+        self.widget.value = self.text()
+        self.widget.scroll_to_bottom()
@@ -2,13 +2,22 @@
 Courses view for LearnwithAI
 """
 
+import os
 import toga
 from toga.style.pack import COLUMN, ROW, Pack
+from ..services.lesson_pack import LessonPack
+from ..services.review_scheduler import KIND_VOCABULARY
+
+# Nombre de leçons affichées à la fois dans la liste d'un niveau
+LESSONS_PER_PAGE = 200
 
 
 class CoursesView:
     def __init__(self, app):
         self.app = app
+        self.pack_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'lessons.pack')
+        self.lesson_pack = None
+        self.current_level = None
         
     def create_view(self):
         """Create the courses page"""
@@ -64,7 +73,7 @@ class CoursesView:
         )
         
         # Main container
-        main_box = toga.Box(
+        self.main_box = toga.Box(
             children=[header_box, course_box],
             style=Pack(
                 direction=COLUMN,
@@ -72,25 +81,142 @@ class CoursesView:
             )
         )
         
-        return main_box
+        return self.main_box
+    
+    def on_show(self):
+        """Each visit starts on the level selection (the lesson list is a sub-screen of this route)"""
+        self.current_level = None
+        self.lesson_table = None
     
     def go_back(self, widget):
         """Return to home view"""
-        from .home_view import HomeView
-        home_view = HomeView(self.app)
-        self.app.main_window.content = home_view.create_view()
+        self.app.router.show('home')
         
     def open_beginner_courses(self, widget):
         """Open beginner courses"""
-        # TODO: Implement beginner courses view
-        self.app.main_window.info_dialog("Info", "Cours débutant - À implémenter")
+        self.open_level("Beginner", "🌱 Débutant")
         
     def open_intermediate_courses(self, widget):
         """Open intermediate courses"""
-        # TODO: Implement intermediate courses view
-        self.app.main_window.info_dialog("Info", "Cours intermédiaire - À implémenter")
+        self.open_level("Intermediate", "📈 Intermédiaire")
         
     def open_advanced_courses(self, widget):
         """Open advanced courses"""
-        # TODO: Implement advanced courses view
-        self.app.main_window.info_dialog("Info", "Cours avancé - À implémenter")
\ No newline at end of file
+        self.open_level("Advanced", "🎓 Avancé")
+    
+    def get_lesson_pack(self):
+        """Open the lesson pack on first use (memory-mapped, nothing is decoded yet)"""
+        if self.lesson_pack is None and os.path.exists(self.pack_file):
+            try:
+                self.lesson_pack = LessonPack(self.pack_file)
+            except Exception as e:
+                print(f"❌ Error opening lesson pack: {e}")
+        return self.lesson_pack
+    
+    def close(self):
+        """Unmap the lesson pack when the router evicts this view"""
+        if self.lesson_pack is not None:
+            self.lesson_pack.close()
+            self.lesson_pack = None
+    
+    def open_level(self, level, title):
+        """Show the lesson list of a level"""
+        pack = self.get_lesson_pack()
+        if pack is None or not len(pack.level_catalog(level)):
+            self.app.main_window.dialog(toga.InfoDialog("Info", f"{title} - Aucun cours disponible pour le moment"))
+            return
+        
+        self.current_level = level
+        catalog = pack.level_catalog(level)
+        # Préparer les exercices des prochaines leçons pendant que l'élève parcourt la liste
+        self.app.exercise_prefetcher.prefetch_next(pack, level)
+        
+        back_button = toga.Button(
+            "← Retour",
+            on_press=self.close_level,
+            style=Pack(padding=10)
+        )
+        
+        level_title = toga.Label(
+            f"{title} ({len(catalog)} leçons)",
+            style=Pack(
+                text_align="center",
+                font_size=20,
+                font_weight="bold",
+                padding=20
+            )
+        )
+        
+        header_box = toga.Box(
+            children=[back_button, level_title],
+            style=Pack(direction=ROW, alignment="center")
+        )
+        
+        search_input = toga.TextInput(
+            placeholder="Rechercher une leçon...",
+            on_change=self.on_search,
+            style=Pack(padding=10)
+        )
+        
+        # Seuls les titres de la première page sont décodés
+        self.lesson_table = toga.Table(
+            headings=["Leçon"],
+            accessors=["title"],
+            data=self._rows(catalog[:LESSONS_PER_PAGE]),
+            on_activate=self.open_lesson,
+            style=Pack(flex=1, padding=10)
+        )
+        
+        # Sous-écran de la route 'courses' : router.show('courses') revient au choix du niveau
+        self.app.main_window.content = toga.Box(
+            children=[header_box, search_input, self.lesson_table],
+            style=Pack(direction=COLUMN, padding=20)
+        )
+    
+    def _rows(self, lessons):
+        return [{"title": title, "lesson_id": lesson_id} for lesson_id, title in lessons]
+    
+    def on_search(self, widget):
+        """Filter the current level's lessons with the pack's keyword index"""
+        pack = self.get_lesson_pack()
+        query = widget.value.strip()
+        if not query:
+            rows = pack.level_catalog(self.current_level)[:LESSONS_PER_PAGE]
+        else:
+            ids = pack.search(query, level=self.current_level, limit=LESSONS_PER_PAGE)
+            rows = [(lesson_id, pack.get_title(lesson_id)) for lesson_id in ids]
+        self.lesson_table.data = self._rows(rows)
+    
+    def open_lesson(self, widget, row=None, **kwargs):
+        """Decode and display a lesson"""
+        if row is None:
+            return
+        pack = self.get_lesson_pack()
+        lesson = pack.get_lesson(row.lesson_id)
+        lines = [lesson.get("description", "")] if lesson.get("description") else []
+        for phrase in lesson.get("phrases", []):
+            if isinstance(phrase, dict):
+                lines.append(f"• {phrase.get('en', '')} — {phrase.get('fr', '')}")
+                # Le vocabulaire vu en cours rejoint les révisions
+                if phrase.get('en') and phrase.get('fr'):
+                    self.app.review_scheduler.add_card(phrase['en'], phrase['fr'], kind=KIND_VOCABULARY)
+            else:
+                lines.append(f"• {phrase}")
+        
+        # Exercices générés à l'avance ; sinon la leçon passe en tête de la file
+        exercises = self.app.exercise_prefetcher.get_exercises(lesson)
+        if exercises:
+            lines.append("")
+            lines.append("✏️ Exercices :")
+            for number, exercise in enumerate(exercises, 1):
+                lines.append(f"{number}. {exercise.get('question', '')}")
+        
+        # La leçon est vue : anticiper les suivantes
+        self.app.exercise_store.mark_completed(row.lesson_id)
+        if self.current_level:
+            self.app.exercise_prefetcher.prefetch_next(pack, self.current_level)
+        self.app.main_window.dialog(toga.InfoDialog(lesson.get("title", "Leçon"), "\n".join(lines) or "(vide)"))
+    
+    def close_level(self, widget):
+        """Return to the level selection"""
+        self.app.router.show('courses')
@@ -91,18 +91,12 @@ class HomeView:
     
     def open_courses(self, widget):
         """Navigate to courses view"""
-        from .courses_view import CoursesView
-        courses_view = CoursesView(self.app)
-        self.app.main_window.content = courses_view.create_view()
+        self.app.router.show('courses')
         
     def open_ai_chat(self, widget):
         """Navigate to AI chat view"""
-        from .ai_chat_view import AIChatView
-        ai_chat_view = AIChatView(self.app)
-        self.app.main_window.content = ai_chat_view.create_view()
+        self.app.router.show('chat')
         
     def open_settings(self, widget):
         """Navigate to settings view"""
-        from .settings_view import SettingsView
-        settings_view = SettingsView(self.app)
-        self.app.main_window.content = settings_view.create_view()
\ No newline at end of file
+        self.app.router.show('settings')
\ No newline at end of file
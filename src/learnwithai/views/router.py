@@ -0,0 +1,69 @@
+"""
+View router for LearnwithAI
+Builds each view once, keeps it alive and swaps the main window content
+"""
+
+from ..services.profiling import profile_scope
+
+
+class ViewRouter:
+    def __init__(self, app):
+        self.app = app
+        self._factories = {}  # name -> (factory, evict_on_hide)
+        self._views = {}  # name -> (view, content)
+        self.current = None
+
+    def register(self, name, factory, evict_on_hide=False):
+        """
+        Register a view
+
+        Args:
+            name (str): Route name used by show()
+            factory: Callable taking the app and returning a view with create_view()
+            evict_on_hide (bool): Drop the view's widget tree when another view is
+                                  shown (for memory-heavy views); it is rebuilt on demand
+        """
+        self._factories[name] = (factory, evict_on_hide)
+
+    def get_view(self, name):
+        """Return the view object for a route, building it on first use"""
+        if name not in self._views:
+            factory, _ = self._factories[name]
+            with profile_scope(f'view.{name}'):
+                view = factory(self.app)
+                self._views[name] = (view, view.create_view())
+        return self._views[name][0]
+
+    def show(self, name):
+        """Display a view, reusing its widget tree if it was already built"""
+        view = self.get_view(name)
+        previous = self.current
+        self.current = name
+
+        # Permettre à la vue de se resynchroniser (ex: paramètres modifiés ailleurs)
+        on_show = getattr(view, 'on_show', None)
+        if on_show:
+            on_show()
+
+        self.app.main_window.content = self._views[name][1]
+
+        if previous and previous != name and self._factories[previous][1]:
+            self.evict(previous)
+        return view
+
+    def evict(self, name):
+        """Forget a built view so its widgets can be garbage collected
+
+        The view's optional close() is called first to release what the garbage
+        collector cannot (open files, memory maps).
+        """
+        if name == self.current or name not in self._views:
+            return False
+        view, _ = self._views.pop(name)
+        close = getattr(view, 'close', None)
+        if close:
+            close()
+        return True
+
+    def is_built(self, name):
+        return name in self._views
@@ -166,6 +166,12 @@ class SettingsView:
         
         return main_box
     
+    def on_show(self):
+        """Reload saved settings each time the view is shown (discards cancelled edits)"""
+        self.settings = self.load_settings()
+        self.level_selection.value = self.settings.get("level", "Beginner")
+        self.focus_selection.value = self.settings.get("focus", "Conversation")
+        
     def on_level_change(self, widget):
         """Handle level selection change"""
         self.settings["level"] = self.level_selection.value
@@ -195,6 +201,4 @@ class SettingsView:
         
     def go_back(self, widget):
         """Return to home view"""
-        from .home_view import HomeView
-        home_view = HomeView(self.app)
-        self.app.main_window.content = home_view.create_view()
\ No newline at end of file
+        self.app.router.show('home')
\ No newline at end of file
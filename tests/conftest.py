@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_learner_stores(tmp_path, monkeypatch):
+    """Keep AIChatService away from the learner data in resources/"""
+    monkeypatch.setenv("LEARNER_MEMORY_FILE", str(tmp_path / 'learner_memory.npz'))
+    monkeypatch.setenv("ERROR_PROFILE_FILE", str(tmp_path / 'error_profile.json'))
@@ -0,0 +1,85 @@
+import threading
+from types import SimpleNamespace
+
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.conversation import Conversation
+
+
+class RecordingCompletions:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+def make_service():
+    completions = RecordingCompletions()
+    service = AIChatService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+def test_history_roles_skip_tips_and_status():
+    service, completions = make_service()
+    conversation = Conversation()
+    conversation.append("Vous", "I goed home")
+    conversation.append("AI Assistant", "Nice!")
+    conversation.append("💡 Conseil", "Say 'went'", type="tip")
+    conversation.append("🎤 Audio", "Recording saved")
+
+    service.send_message("Thanks", conversation.recent(10))
+
+    assert len(completions.requests) == 1
+    roles = [message["role"] for message in completions.requests[0]]
+    assert roles == ["system", "user", "assistant", "user"]
+
+
+def test_session_prompt_does_not_touch_shared_state():
+    service, completions = make_service()
+    shared_prompt = service.get_system_prompt()
+
+    service.send_message("Hi", system_prompt="Session prompt")
+
+    assert len(completions.requests) == 1
+    assert completions.requests[0][0]["content"] == "Session prompt"
+    assert service.get_system_prompt() == shared_prompt
+
+
+class PromptCompletions:
+    def create(self, messages, **kwargs):
+        if "reviewing a single message" in messages[0]["content"]:
+            content = 'Sure: {"tips": "Say \'I went\', not \'I goed\'."}'
+        else:
+            content = '{"response": "Where did you go?", "tips": ""}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_parallel_reply_and_correction():
+    service = AIChatService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=PromptCompletions()))
+    results = {}
+
+    tasks = service.send_message_parallel(
+        "I goed home",
+        on_reply=lambda reply: results.setdefault('reply', reply),
+        on_tips=lambda tips: results.setdefault('tips', tips)
+    )
+    for task in tasks:
+        task.wait(5)
+
+    assert results['reply'] == '{"response": "Where did you go?", "tips": ""}'
+    assert results['tips'] == "Say 'I went', not 'I goed'."
+
+
+def test_parallel_recall_runs_off_the_calling_thread():
+    service = AIChatService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=PromptCompletions()))
+    recall_threads = []
+    service.recall = lambda message: recall_threads.append(threading.current_thread()) or ""
+
+    for task in service.send_message_parallel("I goed home"):
+        task.wait(5)
+
+    assert len(recall_threads) == 1 and recall_threads[0] is not threading.current_thread()
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+import wave
+
+from learnwithai.services.audio_backends import VirtualAudio, virtual_backend_factory
+from learnwithai.services.audio_service import AudioService
+from learnwithai.services.device_cache import DeviceCapabilityCache
+from learnwithai.services.task_executor import LANE_AUDIO, default_executor
+
+
+def write_wav(path, frames, rate=16000):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b''.join(i.to_bytes(2, 'little', signed=True) for i in frames))
+    return str(path)
+
+
+def make_service(tmp_path, backend_factory):
+    return AudioService(
+        device_cache=DeviceCapabilityCache(str(tmp_path / 'devices.json')),
+        backend_factory=backend_factory,
+        recordings_dir=str(tmp_path / 'recordings')
+    )
+
+
+def test_virtual_input_loops_source(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', range(10))
+    device = VirtualAudio([source], speed=0)
+    stream = device.open(rate=16000, channels=1, format=8, input=True)
+
+    data = stream.read(15)
+    assert len(data) == 30
+    assert data[20:22] == (0).to_bytes(2, 'little')
+
+
+def test_record_and_play_headless(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', [1000, -1000] * 8000, rate=22050)
+    factory = virtual_backend_factory([source], speed=0, capture_output=True)
+    service = make_service(tmp_path, factory)
+    try:
+        assert service.fs == 22050
+        assert service.start_recording()
+        while len(service.frames) < 10:
+            time.sleep(0.01)
+        file_path = service.stop_recording()
+
+        with wave.open(file_path, 'rb') as wf:
+            assert wf.getframerate() == 22050
+            assert wf.getnframes() >= 10 * service.chunk
+
+        assert service.play_audio(file_path)
+        device = factory()
+        assert device.output_bytes == len(device.captured_output) > 0
+        assert service.count_recordings() == 1
+    finally:
+        service.cleanup()
+
+
+def test_devices_are_not_rescanned_under_a_stream_being_opened(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', [1000, -1000] * 8000)
+    device = VirtualAudio([source], speed=0)
+    created = []
+
+    def factory():
+        created.append(device)
+        return device
+    service = make_service(tmp_path, factory)
+    opened = threading.Event()
+    prepare = service._prepare_capture_processor
+
+    def slow_prepare():
+        # Fenêtre entre l'ouverture du flux et is_recording = True
+        opened.set()
+        time.sleep(0.2)
+        prepare()
+    service._prepare_capture_processor = slow_prepare
+    try:
+        service.stop_device_monitor()
+        opener = threading.Thread(target=service.start_recording)
+        opener.start()
+        assert opened.wait(5)
+        assert service.revalidate_devices() is False
+        opener.join()
+        assert service.is_recording and len(created) == 1
+        service.stop_recording()
+        assert service.revalidate_devices() is True and len(created) == 2
+    finally:
+        service.cleanup()
+
+
+def test_device_monitor_rescans_on_request_only(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', [1000, -1000] * 8000)
+    device = VirtualAudio([source], speed=0)
+    created = []
+
+    def factory():
+        created.append(device)
+        return device
+    service = make_service(tmp_path, factory)
+    try:
+        service.stop_device_monitor()
+        service._monitor_stop.clear()
+        service._rescan_wake.clear()
+        monitor = threading.Thread(target=service._monitor_devices, args=(0,), daemon=True)
+        monitor.start()
+        time.sleep(0.1)
+        assert len(created) == 1  # Pas de passage avant le délai initial ni sans demande
+
+        service.request_device_rescan()
+        deadline = time.time() + 5
+        while len(created) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(created) == 2
+        time.sleep(0.1)
+        assert len(created) == 2
+    finally:
+        service.cleanup()
+
+
+def test_capture_does_not_wait_for_busy_audio_workers(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', [1000, -1000] * 8000)
+    service = make_service(tmp_path, virtual_backend_factory([source], speed=0))
+    executor = default_executor()
+    release = threading.Event()
+    # Lecture ou enregistrement de fichier en cours : tous les workers du couloir audio sont pris
+    busy = [executor.submit(release.wait, 30, lane=LANE_AUDIO) for _ in range(4)]
+    try:
+        assert service.start_recording()
+        deadline = time.time() + 2
+        while len(service.frames) < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(service.frames) >= 10
+        assert service.stop_recording()
+    finally:
+        release.set()
+        for task in busy:
+            task.wait(5)
+        service.cleanup()
+
+
+def test_recordings_are_kept_unless_retention_is_set(tmp_path):
+    source = write_wav(tmp_path / 'in.wav', [1000, -1000] * 8000)
+    service = make_service(tmp_path, virtual_backend_factory([source], speed=0))
+    try:
+        assert service.start_recording()
+        while len(service.frames) < 5:
+            time.sleep(0.01)
+        file_path = service.stop_recording()
+        os.utime(file_path, (time.time() - 365 * 24 * 3600,) * 2)
+        service.catalog.reconcile()
+
+        assert service.prune_recordings() == []
+        service.current_recording = None
+        assert service.prune_recordings(max_age=24 * 3600) == [file_path]
+    finally:
+        service.cleanup()
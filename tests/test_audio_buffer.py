@@ -0,0 +1,100 @@
+import struct
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.audio_buffer import AudioBuffer, resample, write_wav
+from learnwithai.services.audio_levels import chunk_levels
+
+
+def make_wav(path, samples, rate, channels=1):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype('<i2').tobytes())
+    return str(path)
+
+
+def noise(size, seed=0):
+    return (np.random.default_rng(seed).standard_normal(size) * 3000).astype('<i2')
+
+
+def test_wav_is_mapped_without_copy(tmp_path):
+    samples = noise(48000)
+    with AudioBuffer.from_wav(make_wav(tmp_path / 'a.wav', samples, 48000)) as audio:
+        assert len(audio) == 48000 and audio.duration == 1.0
+        assert np.array_equal(audio.int16, samples)
+
+        second_half = audio.slice(0.5)
+        assert len(second_half) == 24000
+        assert np.shares_memory(second_half.int16, audio.int16)
+        assert np.array_equal(second_half.int16, samples[24000:])
+        assert len(audio.slice(0.25, 0.5)) == 12000
+
+        assert b''.join(bytes(chunk) for chunk in audio.chunks(1000)) == samples.tobytes()
+        assert chunk_levels(audio) == chunk_levels(samples.tobytes())
+
+
+def test_stereo_and_extra_chunks(tmp_path):
+    left, right = noise(8000, 1), noise(8000, 2)
+    stereo = np.stack([left, right], axis=1).reshape(-1)
+    path = make_wav(tmp_path / 'stereo.wav', stereo, 8000, channels=2)
+    # Un chunk LIST avant les données, comme en écrivent certains éditeurs audio
+    with open(path, 'rb') as f:
+        content = f.read()
+    info = b'LIST' + struct.pack('<I', 5) + b'INFO!\x00'
+    content = content[:36] + info + content[36:]
+    content = content[:4] + struct.pack('<I', len(content) - 8) + content[8:]
+    with open(path, 'wb') as f:
+        f.write(content)
+
+    audio = AudioBuffer.from_wav(path)
+    assert audio.channels == 2 and len(audio) == 8000
+    expected = (left.astype(np.float32) + right.astype(np.float32)) / 2 / 32768
+    assert np.allclose(audio.to_float32(), expected, atol=1e-6)
+
+
+def test_blockwise_resampling_matches_interpolation():
+    samples = noise(200000).astype(np.float32) / 32768
+    target = np.arange(int(samples.size / 48000.0 * 16000)) / 16000.0
+    expected = np.interp(target, np.arange(samples.size) / 48000.0, samples)
+    assert np.allclose(resample(samples, 48000, 16000), expected, atol=1e-6)
+
+    audio = AudioBuffer.from_bytes((samples * 32768).astype('<i2').tobytes(), 48000)
+    assert np.allclose(audio.to_float32(16000), expected, atol=1e-4)
+
+
+def test_same_rate_resampling_still_converts():
+    left, right = noise(1000, 1), noise(1000, 2)
+    frames = np.stack([left, right], axis=1)
+    expected = (left.astype(np.float32) + right.astype(np.float32)) / 2 / 32768
+
+    mono = resample(frames, 16000, 16000, scale=1.0 / 32768)
+    assert mono.dtype == np.float32 and mono.shape == (1000,)
+    assert np.allclose(mono, expected, atol=1e-6)
+    assert np.allclose(resample(left, 8000, 8000, scale=0.5), left.astype(np.float32) * 0.5)
+    assert resample(np.zeros((0, 2), dtype='<i2'), 8000, 16000).shape == (0,)
+
+
+def test_chunks_written_as_a_standard_wav(tmp_path):
+    samples = noise(5000)
+    chunks = [samples[i:i + 1024].tobytes() for i in range(0, samples.size, 1024)]
+    path = str(tmp_path / 'chunks.wav')
+    assert write_wav(path, chunks, 22050) == samples.size * 2
+    with wave.open(path, 'rb') as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, 22050)
+        assert wf.readframes(wf.getnframes()) == samples.tobytes()
+
+
+def test_only_16_bit_pcm(tmp_path):
+    path = tmp_path / 'eight_bit.wav'
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(1)
+        wf.setframerate(8000)
+        wf.writeframes(bytes(800))
+    with pytest.raises(ValueError):
+        AudioBuffer.from_wav(str(path))
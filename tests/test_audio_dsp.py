@@ -0,0 +1,96 @@
+import time
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.audio_backends import virtual_backend_factory
+from learnwithai.services.audio_dsp import CaptureProcessor
+from learnwithai.services.audio_service import AudioService
+from learnwithai.services.device_cache import DeviceCapabilityCache
+
+RATE = 48000
+
+
+def level_db(samples):
+    return 10 * np.log10(np.mean((samples.astype(np.float64) / 32768) ** 2) + 1e-12)
+
+
+def run(processor, samples, chunk=1024):
+    output = [processor.process(samples[i:i + chunk].tobytes()) for i in range(0, samples.size, chunk)]
+    output.append(processor.flush())
+    return np.frombuffer(b''.join(output), dtype='<i2')
+
+
+def tone_with_pauses(seconds=6, amplitude=0.3, noise=0.02):
+    t = np.arange(seconds * RATE) / float(RATE)
+    signal = amplitude * np.sin(2 * np.pi * 440 * t) * ((t % 2) >= 1)
+    signal += np.random.default_rng(0).standard_normal(t.size) * noise
+    return (signal * 32767).astype('<i2'), t
+
+
+def test_stft_reconstructs_input_with_irregular_chunks():
+    samples = (np.random.default_rng(1).standard_normal(RATE * 2) * 3000).astype('<i2')
+    processor = CaptureProcessor(RATE, agc=False, max_reduction_db=0.0)
+    output, position, sizes = [], 0, np.random.default_rng(2).integers(50, 3000, 200)
+    for size in sizes:
+        output.append(processor.process(samples[position:position + size].tobytes()))
+        position += size
+        if position >= samples.size:
+            break
+    output.append(processor.flush())
+
+    restored = np.frombuffer(b''.join(output), dtype='<i2')
+    assert restored.size == samples.size
+    assert np.abs(restored.astype(int) - samples).max() <= 1
+
+
+def test_noise_is_gated_and_speech_kept():
+    samples, t = tone_with_pauses()
+    output = run(CaptureProcessor(RATE, agc=False), samples)
+
+    noise = ((t % 2) < 1) & (t >= 2)
+    speech = (t % 2) >= 1.1
+    assert level_db(samples[noise]) - level_db(output[noise]) > 8
+    assert abs(level_db(samples[speech]) - level_db(output[speech])) < 1
+
+
+def test_agc_raises_quiet_speech_and_limits_loud_speech():
+    quiet, t = tone_with_pauses(amplitude=0.01, noise=0.0005)
+    output = run(CaptureProcessor(RATE), quiet)
+    late_speech = ((t % 2) >= 1.1) & (t >= 4)
+    assert level_db(output[late_speech]) - level_db(quiet[late_speech]) > 12
+
+    loud, _ = tone_with_pauses(amplitude=0.99, noise=0.0)
+    output = run(CaptureProcessor(RATE, noise_suppression=False), loud)
+    assert np.abs(output.astype(int)).max() < 32767
+
+
+def test_recording_with_dsp(tmp_path):
+    source = tmp_path / 'in.wav'
+    samples, _ = tone_with_pauses(seconds=2)
+    with wave.open(str(source), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+
+    service = AudioService(
+        device_cache=DeviceCapabilityCache(str(tmp_path / 'devices.json')),
+        backend_factory=virtual_backend_factory([str(source)], speed=0),
+        recordings_dir=str(tmp_path / 'recordings'),
+        dsp='on'
+    )
+    try:
+        assert service.start_recording()
+        while len(service.frames) < 20:
+            time.sleep(0.01)
+        file_path = service.stop_recording()
+
+        assert service.capture_processor is not None
+        with wave.open(file_path, 'rb') as wf:
+            # Le retard de la STFT est rattrapé par flush : aucun échantillon perdu
+            assert wf.getnframes() % service.chunk == 0
+    finally:
+        service.cleanup()
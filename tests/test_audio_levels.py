@@ -0,0 +1,52 @@
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.audio_levels import (
+    build_peak_pyramid,
+    chunk_levels,
+    load_peaks,
+    peaks_for_width,
+    peaks_path,
+)
+
+
+def test_chunk_levels_of_full_scale_square_wave():
+    samples = np.array([32767, -32768] * 512, dtype='<i2')
+    rms, peak = chunk_levels(samples.tobytes())
+
+    assert peak == pytest.approx(1.0)
+    assert rms == pytest.approx(1.0, abs=1e-3)
+    assert chunk_levels(b'') == (0.0, 0.0)
+
+
+def test_peak_pyramid_levels_are_consistent():
+    samples = (np.sin(np.linspace(0, 200, 100_000)) * 10000).astype(np.int16)
+    levels = build_peak_pyramid(samples)
+
+    assert levels[0]['block'] == 256
+    assert all(b['block'] == a['block'] * 4 for a, b in zip(levels, levels[1:]))
+    for level in levels:
+        assert level['min'].min() == samples.min()
+        assert level['max'].max() == samples.max()
+
+
+def test_load_peaks_caches_next_to_recording(tmp_path):
+    wav_path = str(tmp_path / 'clip.wav')
+    samples = (np.random.default_rng(0).uniform(-1, 1, 480000) * 20000).astype('<i2')
+    with wave.open(wav_path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(48000)
+        wf.writeframes(samples.tobytes())
+
+    levels = load_peaks(wav_path)
+    assert (tmp_path / 'clip.peaks.npz').exists()
+    assert peaks_path(wav_path).endswith('clip.peaks.npz')
+
+    mins, maxs = peaks_for_width(load_peaks(wav_path), 100)
+    assert len(mins) == len(maxs) == 100
+    assert min(mins) == pytest.approx(samples.min() / 32768.0)
+    assert len(levels) > 1
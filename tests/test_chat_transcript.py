@@ -0,0 +1,135 @@
+import re
+import sys
+
+from learnwithai.services.conversation import TIP_SENDER, Conversation, Role, api_role
+from learnwithai.views.chat_transcript import TranscriptRenderer
+
+
+class FakeTextWidget:
+    def __init__(self):
+        self.value = ""
+
+    def scroll_to_bottom(self):
+        pass
+
+
+def test_placeholder_is_replaced_in_place():
+    conversation = Conversation()
+    widget = FakeTextWidget()
+    renderer = TranscriptRenderer(widget)
+
+    renderer.append(conversation.append("Vous", "Hello"))
+    placeholder = conversation.append("AI Assistant", "🤔 Thinking...")
+    renderer.append(placeholder)
+    renderer.replace(conversation.update(placeholder.id, "Hi!"))
+    renderer.append(conversation.append("💡 Conseil", "Say 'Hello!'", type="tip"))
+
+    assert re.sub(r"\[\d\d:\d\d\]", "[hh:mm]", widget.value) == (
+        "[hh:mm] Vous: Hello\n\n"
+        "[hh:mm] AI Assistant: Hi!\n\n"
+        "[hh:mm] 💡 Conseil: Say 'Hello!'\n\n"
+    )
+    assert [m.id for m in conversation] == [1, 2, 3]
+
+
+def test_window_bounds_rendered_text():
+    conversation = Conversation()
+    widget = FakeTextWidget()
+    renderer = TranscriptRenderer(widget, window_size=3)
+
+    for i in range(1000):
+        renderer.append(conversation.append("Vous", f"message {i}"))
+
+    assert len(conversation) == 1000
+    assert widget.value.startswith("… 997 earlier message(s) …")
+    assert widget.value.count("Vous:") == 3
+    assert "message 999" in widget.value
+
+
+def test_history_is_limited_to_recent_messages():
+    conversation = Conversation()
+    for i in range(12):
+        conversation.append("Vous" if i % 2 else "AI Assistant", str(i))
+    tip = conversation.append("💡 Conseil", "tip", type="tip")
+
+    history = conversation.to_history(limit=10)
+    assert len(history) == 10
+    assert history[-1] == {'sender': '💡 Conseil', 'message': 'tip', 'timestamp': tip.timestamp, 'type': 'tip'}
+    assert re.fullmatch(r"\d\d:\d\d", tip.timestamp)
+
+    conversation.remove(tip.id)
+    assert conversation.last().message == "11"
+
+
+def test_old_messages_spill_to_disk():
+    conversation = Conversation(max_in_memory=5)
+    for i in range(20):
+        conversation.append("Vous" if i % 2 else "AI Assistant", f"message {i}")
+
+    assert len(conversation) == 20
+    assert conversation.get(1) is None  # spilled
+    assert [m.message for m in conversation] == [f"message {i}" for i in range(20)]
+    assert [m.role for m in conversation.recent(2)] == [Role.ASSISTANT, Role.USER]
+    conversation.close()
+
+
+def test_since_reads_only_the_recent_tail():
+    conversation = Conversation(max_in_memory=5)
+    for i in range(20):
+        conversation.append("Vous", f"message {i}")
+
+    def no_disk():
+        raise AssertionError("spill file read")
+    spilled, conversation._iter_spilled = conversation._iter_spilled, no_disk
+    assert [m.id for m in conversation.since(17)] == [18, 19, 20]
+    assert conversation.since(20) == []
+
+    conversation._iter_spilled = spilled  # Messages non encore remis déjà partis sur disque
+    assert [m.id for m in conversation.since(12)] == list(range(13, 21))
+    conversation.close()
+
+
+def test_roles_and_interned_senders():
+    conversation = Conversation()
+    user = conversation.append("Vous", "Hi")
+    tip = conversation.append(TIP_SENDER, "Say 'Hello'", type="tip")
+    status = conversation.append("🎤 Audio", "Recording saved")
+
+    assert user.role.api_role == "user" and tip.is_tip and status.role is Role.STATUS
+    assert api_role({'sender': 'AI Assistant', 'message': 'x'}) == "assistant"
+    assert api_role(tip) is None
+    assert user.sender is sys.intern("Vous")
+    assert not hasattr(user, '__dict__')
+
+
+def test_reply_tips_are_filed_against_the_message_they_answer(tmp_path):
+    from types import SimpleNamespace
+
+    from learnwithai.services.review_scheduler import ReviewScheduler
+    from learnwithai.views.ai_chat_view import AIChatView
+
+    scheduler = ReviewScheduler(str(tmp_path / 'cards.srs'))
+    scheduler.load()
+    ai_service = SimpleNamespace(record_tips=lambda tips: [])
+    view = AIChatView(SimpleNamespace(ai_service=ai_service, audio_service=None,
+                                      review_scheduler=scheduler, executor=None))
+    view.transcript = TranscriptRenderer(FakeTextWidget())
+
+    # La réponse au premier message arrive après l'envoi du second
+    view.last_user_message = "I have two sister"
+    view.process_ai_response('{"response": "Nice!", "tips": "Say \'I went\'."}', user_message="I goed home")
+
+    assert scheduler.get_card(0)["front"] == "I goed home"
+
+
+def test_opening_the_chat_requests_a_device_rescan():
+    from types import SimpleNamespace
+
+    from learnwithai.views.ai_chat_view import AIChatView
+
+    rescans = []
+    audio_service = SimpleNamespace(request_device_rescan=lambda: rescans.append(True))
+    view = AIChatView(SimpleNamespace(ai_service=None, audio_service=audio_service,
+                                      review_scheduler=None, executor=None))
+    view.on_show()
+    assert rescans == [True]
@@ -0,0 +1,56 @@
+from learnwithai.services.device_cache import (
+    DeviceCapabilityCache,
+    best_sample_rate,
+    device_key,
+    probe_device,
+)
+
+
+class FakeAudio:
+    """Minimal stand-in for pyaudio.PyAudio.is_format_supported"""
+
+    def __init__(self, rates, max_channels=1):
+        self.rates = rates
+        self.max_channels = max_channels
+        self.calls = 0
+
+    def is_format_supported(self, rate, input_device, input_channels, input_format):
+        self.calls += 1
+        if rate in self.rates and input_channels <= self.max_channels:
+            return True
+        raise ValueError("Invalid sample rate")
+
+
+DEVICE = {'index': 3, 'name': 'USB Mic', 'maxInputChannels': 1, 'defaultSampleRate': 48000.0}
+
+
+def test_probe_device_records_supported_rates():
+    profile = probe_device(FakeAudio([48000, 16000]), DEVICE, 'ALSA', sample_format=8)
+
+    assert profile['supported_rates'] == [48000, 16000]
+    assert profile['supported_channels'] == [1]
+    assert best_sample_rate(profile) == 48000
+
+
+def test_best_sample_rate_falls_back_to_device_default():
+    profile = probe_device(FakeAudio([]), DEVICE, 'ALSA', sample_format=8)
+
+    assert profile['supported_rates'] == []
+    assert best_sample_rate(profile) == 48000
+
+
+def test_cache_roundtrip(tmp_path):
+    cache_file = str(tmp_path / 'audio_devices.json')
+    key = device_key(DEVICE, 'ALSA')
+
+    cache = DeviceCapabilityCache(cache_file)
+    cache.put(key, probe_device(FakeAudio([44100]), DEVICE, 'ALSA', sample_format=8))
+    cache.set_default_input(key)
+    cache.save()
+
+    reloaded = DeviceCapabilityCache(cache_file)
+    assert reloaded.get_default_profile()['supported_rates'] == [44100]
+    assert not reloaded.is_stale(key, max_age=60)
+
+    reloaded.remove(key)
+    assert reloaded.get_default_profile() is None
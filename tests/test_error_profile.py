@@ -0,0 +1,44 @@
+from learnwithai.services.error_profile import HALF_LIFE, ErrorProfile, classify_tip
+
+
+def test_classify_tip():
+    assert classify_tip("Use the past tense: 'I went', not 'I go'.") == ['tense']
+    assert classify_tip("You need the article \"an\" before a vowel sound.") == ['articles']
+    assert classify_tip("We say 'at' the station, this preposition is tricky.") == ['prepositions']
+    assert classify_tip("Great job!") == []
+
+
+def test_addendum_lists_top_weaknesses(tmp_path):
+    profile = ErrorProfile(str(tmp_path / "profile.json"))
+    assert profile.prompt_addendum() == ""
+
+    for _ in range(3):
+        profile.record("Remember the past tense here.", now=1000.0)
+    profile.record("Check the spelling of 'receive'.", now=1000.0)
+
+    addendum = profile.prompt_addendum(now=1000.0)
+    assert "verb tenses" in addendum
+    assert "spelling" not in addendum  # a single mistake is below the threshold
+
+
+def test_addendum_follows_decay_without_new_tips(tmp_path):
+    profile = ErrorProfile(str(tmp_path / "profile.json"))
+    profile.record("Remember the past tense here.", now=0.0)
+    profile.record("Remember the past tense here.", now=0.0)
+    assert "verb tenses" in profile.prompt_addendum(now=0.0)
+
+    # Une semaine plus tard le poids est tombé à 1.0, sous le seuil
+    assert profile.prompt_addendum(now=HALF_LIFE) == ""
+
+
+def test_counters_decay_and_persist(tmp_path):
+    path = str(tmp_path / "profile.json")
+    profile = ErrorProfile(path)
+    profile.record("Wrong article: say 'the'.", now=0.0)
+    profile.record("Wrong article: say 'a'.", now=0.0)
+
+    assert profile.weight('articles', now=HALF_LIFE) == 1.0
+    profile.save()
+
+    reloaded = ErrorProfile(path)
+    assert reloaded.weight('articles', now=2 * HALF_LIFE) == 0.5
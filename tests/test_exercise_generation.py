@@ -0,0 +1,64 @@
+import json
+from types import SimpleNamespace
+
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.exercise_generation import plan_slots, split_exercises, validate_exercise
+
+LESSON = {"title": "At the restaurant", "phrases": [{"en": "The bill, please", "fr": "L'addition, s'il vous plaît"}]}
+
+
+def reply(*items):
+    return json.dumps({"exercises": list(items)})
+
+
+def test_plan_slots_cycles_kinds():
+    assert plan_slots(4) == ["fill_blank", "translation", "qa", "fill_blank"]
+    assert plan_slots(2, ["qa", "unknown"]) == ["qa", "qa"]
+
+
+def test_validate_exercise():
+    assert validate_exercise({"type": "fill_blank", "question": "I ___ hungry", "answer": "am"})
+    assert validate_exercise({"type": "fill_blank", "question": "I am hungry", "answer": "am"}) is None
+    assert validate_exercise({"type": "qa", "question": "Why?", "answer": ""}) is None
+    assert validate_exercise({"type": "essay", "question": "Why?", "answer": "Because"}) is None
+
+
+def test_split_keeps_valid_items_and_reports_failed_slots():
+    content = "Here you go: " + reply(
+        {"type": "translation", "question": "Traduire : bonjour", "answer": "hello"},
+        {"type": "fill_blank", "question": "no blank here", "answer": "x"},
+        {"type": "qa", "question": "What do you ask for?", "answer": "The bill"},
+    )
+    items, failed = split_exercises(content, ["fill_blank", "translation", "qa"])
+    assert failed == [0]
+    assert items[1]["answer"] == "hello" and items[2]["type"] == "qa"
+
+    assert split_exercises("not json", ["qa"]) == ([None], [0])
+
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def create(self, messages, **kwargs):
+        self.prompts.append(messages[0]["content"])
+        content = self.replies.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_generate_exercises_rerequests_only_failed_items():
+    completions = FakeCompletions([
+        reply({"type": "fill_blank", "question": "The ___, please", "answer": "bill"},
+              {"type": "translation", "question": "", "answer": "hello"},
+              {"type": "qa", "question": "Where are you?", "answer": "At the restaurant"}),
+        reply({"type": "translation", "question": "Traduire : l'addition", "answer": "the bill"}),
+    ])
+    service = AIChatService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    exercises = service.generate_exercises(LESSON, count=3)
+
+    assert [exercise["type"] for exercise in exercises] == ["fill_blank", "translation", "qa"]
+    assert len(completions.prompts) == 2
+    assert "exactly 1 exercises" in completions.prompts[1]
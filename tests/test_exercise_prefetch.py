@@ -0,0 +1,140 @@
+import time
+
+from learnwithai.services.exercise_prefetch import ExercisePrefetcher, ExerciseStore, predict_next_lessons
+from learnwithai.services.task_executor import TaskExecutor
+
+
+def test_store_is_bounded_and_expires(tmp_path):
+    store = ExerciseStore(str(tmp_path / "cache.json"), max_lessons=2, ttl=100)
+    store.put("1", [{"question": "a"}], now=0)
+    store.put("2", [{"question": "b"}], now=0)
+    assert store.get("1", now=10) is not None  # "1" becomes the most recent
+    store.put("3", [{"question": "c"}], now=10)
+
+    assert store.get("2", now=10) is None  # least recently used was dropped
+    assert store.get("1", now=50) is not None
+    assert store.get("1", now=200) is None  # expired
+
+
+def test_store_persists_exercises_and_progress(tmp_path):
+    path = str(tmp_path / "cache.json")
+    store = ExerciseStore(path)
+    store.put("7", [{"question": "q", "answer": "a"}])
+    store.mark_completed(7)
+    store.save()
+
+    reloaded = ExerciseStore(path)
+    reloaded.load()
+    assert reloaded.get("7") == [{"question": "q", "answer": "a"}]
+    assert reloaded.completed == {7}
+
+
+def test_predict_next_lessons():
+    ids = range(10, 20)
+    assert predict_next_lessons(ids, set(), 3) == [10, 11, 12]
+    assert predict_next_lessons(ids, {10, 11, 14}, 3) == [15, 16, 17]
+    assert predict_next_lessons(ids, {18}, 3) == [19, 10, 11]
+
+
+def test_prefetcher_fills_the_store(tmp_path):
+    generated = []
+
+    def generate(lesson):
+        generated.append(lesson['id'])
+        return [{"question": lesson['title'], "answer": "x"}]
+
+    store = ExerciseStore(str(tmp_path / "cache.json"))
+    prefetcher = ExercisePrefetcher(generate, store)
+    prefetcher.start()
+    prefetcher.schedule([{"id": 1, "title": "one"}, {"id": 2, "title": "two"}])
+    deadline = time.time() + 5
+    while len(store) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    prefetcher.stop()
+
+    assert generated == [1, 2]
+    assert prefetcher.get_exercises({"id": 2, "title": "two"}) == [{"question": "two", "answer": "x"}]
+
+
+def test_requested_lessons_go_before_predictions(tmp_path):
+    generated = []
+
+    def generate(lesson):
+        generated.append(lesson['id'])
+        return [{"question": lesson['title'], "answer": "x"}]
+
+    store = ExerciseStore(str(tmp_path / "cache.json"))
+    prefetcher = ExercisePrefetcher(generate, store)
+    prefetcher.schedule([{"id": i, "title": str(i)} for i in (1, 2, 3)])
+    prefetcher.schedule([{"id": 4, "title": "4"}])  # Prédiction suivante : après la leçon la plus probable déjà en file
+    assert prefetcher.get_exercises({"id": 5, "title": "5"}) is None
+    assert prefetcher.get_exercises({"id": 6, "title": "6"}) is None
+    assert prefetcher.get_exercises({"id": 2, "title": "2"}) is None  # Déjà prédite, remontée
+    assert prefetcher.pending() == 6
+
+    prefetcher.start()
+    deadline = time.time() + 5
+    while len(store) < 6 and time.time() < deadline:
+        time.sleep(0.01)
+    prefetcher.stop()
+
+    assert generated == [2, 6, 5, 1, 4, 3]
+
+
+def test_stop_while_waiting_for_idle_skips_generation(tmp_path):
+    generated = []
+    waits = []
+
+    def never_idle(timeout=None):
+        waits.append(timeout)
+        time.sleep(timeout)
+        return False
+
+    store = ExerciseStore(str(tmp_path / "cache.json"))
+    prefetcher = ExercisePrefetcher(lambda lesson: generated.append(lesson['id']) or [{}], store,
+                                    wait_until_idle=never_idle)
+    prefetcher.start()
+    prefetcher.schedule([{"id": 1, "title": "one"}])
+    deadline = time.time() + 5
+    while not waits and time.time() < deadline:
+        time.sleep(0.01)
+    task = prefetcher._task
+    prefetcher.stop()
+    task.wait(5)
+
+    assert task.done and generated == []
+    assert waits[0] is not None
+    assert prefetcher.pending() == 1  # Reprise au prochain start()
+
+
+def test_store_save_replaces_the_file_atomically(tmp_path):
+    path = tmp_path / "cache.json"
+    store = ExerciseStore(str(path))
+    store.put("7", [{"question": "q"}])
+    store.save()
+    assert path.exists() and not (tmp_path / "cache.json.tmp").exists()
+
+
+def test_store_loads_in_background_and_keeps_newer_entries(tmp_path):
+    path = str(tmp_path / "cache.json")
+    saved = ExerciseStore(path)
+    saved.put("1", [{"question": "old"}])
+    saved.put("2", [{"question": "kept"}])
+    saved.mark_completed(1)
+    saved.save()
+
+    store = ExerciseStore(path)
+    store.put("1", [{"question": "new"}])  # Générée pendant la lecture du fichier
+    store.mark_completed(2)
+    loaded = []
+    executor = TaskExecutor(shared_workers=1, reserved_workers={})
+    try:
+        task = store.load_in_background(executor, on_done=lambda: loaded.append(True))
+        task.wait(5)
+    finally:
+        executor.shutdown()
+
+    assert loaded == [True]
+    assert store.get("1") == [{"question": "new"}]
+    assert store.get("2") == [{"question": "kept"}]
+    assert store.completed == {1, 2}
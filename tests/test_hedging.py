@@ -0,0 +1,89 @@
+import threading
+import time
+
+from learnwithai.services.hedging import HedgedCompleter
+
+
+def attempt(reply, delay, log=None):
+    def run(cancel, on_first_token):
+        if cancel.wait(delay):
+            if log is not None:
+                log.append(('cancelled', reply))
+            return None
+        on_first_token()
+        return reply
+    return run
+
+
+def test_fast_primary_is_not_hedged():
+    completer = HedgedCompleter(default_delay=0.2)
+    assert completer.complete(attempt("primary", 0.0), attempt("hedge", 0.0)) == "primary"
+    assert completer.stats()['hedge_rate'] == 0.0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    log = []
+    completer = HedgedCompleter(default_delay=0.05)
+    started = time.perf_counter()
+    assert completer.complete(attempt("primary", 2.0, log), attempt("hedge", 0.01)) == "hedge"
+    assert time.perf_counter() - started < 1.0
+
+    time.sleep(0.05)
+    assert log == [('cancelled', 'primary')]
+    stats = completer.stats()
+    assert stats['hedge_rate'] == 1.0 and stats['hedge_win_rate'] == 1.0
+
+
+def test_hedge_rate_is_capped():
+    completer = HedgedCompleter(default_delay=0.01, max_hedge_rate=0.25)
+    for _ in range(8):
+        completer.complete(attempt("primary", 0.03), attempt("hedge", 0.0))
+    assert completer.hedges <= 2
+
+
+class BlockingResponse:
+    """Streamed response whose read only returns once the connection is closed"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+def test_loser_without_first_token_is_closed():
+    response = BlockingResponse()
+
+    def primary(cancel, on_first_token):
+        cancel.on_cancel(response.close)
+        response.closed.wait(5)  # Bloqué dans la lecture, n'observe jamais l'annulation
+        raise ConnectionError("stream closed")
+
+    completer = HedgedCompleter(default_delay=0.05)
+    assert completer.complete(primary, attempt("hedge", 0.01)) == "hedge"
+    assert response.closed.wait(1)
+
+
+def test_attempts_share_a_bounded_pool():
+    lock = threading.Lock()
+    running = [0, 0]  # en cours, maximum observé
+
+    def tracked(cancel, on_first_token):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.05)
+        on_first_token()
+        with lock:
+            running[0] -= 1
+        return "ok"
+
+    completer = HedgedCompleter(default_delay=1.0, max_workers=2)
+    callers = [threading.Thread(target=completer.complete, args=(tracked,)) for _ in range(6)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join(5)
+    assert completer.requests == 6
+    assert running[1] <= 2
+    completer.shutdown()
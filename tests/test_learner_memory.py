@@ -0,0 +1,125 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.conversation import Conversation
+from learnwithai.services.learner_memory import (
+    KIND_FACT,
+    KIND_TIP,
+    HashedEncoder,
+    LearnerMemory,
+    estimate_tokens,
+)
+
+
+def session():
+    conversation = Conversation()
+    conversation.append("Vous", "Hello! I work as a nurse in Lyon. Yesterday I goed to the market.")
+    conversation.append("AI Assistant", "Nice! What did you buy at the market?")
+    conversation.append("💡 Conseil", "Say 'I went', not 'I goed'.", type="tip")
+    conversation.append("Vous", "I bought apples for my daughter.")
+    return conversation
+
+
+def test_encoder_is_stable_and_groups_related_texts():
+    encoder = HashedEncoder()
+    nurse = encoder.encode("I work as a nurse at the hospital")
+    assert np.allclose(nurse, HashedEncoder().encode("I work as a nurse at the hospital"))
+    assert abs(np.linalg.norm(nurse) - 1) < 1e-5
+    assert nurse @ encoder.encode("working as a nurse") > nurse @ encoder.encode("my cat likes fish")
+
+
+def test_remember_session_extracts_facts_tips_and_summary(tmp_path):
+    memory = LearnerMemory(str(tmp_path / 'memory.npz'))
+    assert memory.remember_session(session()) == 4
+    assert memory.stats() == {'items': 4, 'fact': 2, 'summary': 1, 'tip': 1}
+    assert any("nurse in Lyon" in text for text in memory.texts)
+
+    # Une session identique ne fait que rafraîchir les souvenirs
+    assert memory.remember_session(session()) == 0
+    assert len(memory) == 4
+
+
+def test_search_ranks_by_similarity(tmp_path):
+    memory = LearnerMemory(str(tmp_path / 'memory.npz'))
+    memory.add("The learner said: \"I work as a nurse in Lyon\"", KIND_FACT)
+    memory.add("The learner said: \"I play the guitar on weekends\"", KIND_FACT)
+    memory.add("Correction given: Say 'I went', not 'I goed'.", KIND_TIP)
+
+    results = memory.search("Do nurses in Lyon work at night?")
+    assert "nurse" in results[0][1]
+    assert memory.search("quantum chromodynamics") == []
+
+
+def test_prompt_addendum_respects_the_token_budget(tmp_path):
+    memory = LearnerMemory(str(tmp_path / 'memory.npz'))
+    for i in range(10):
+        memory.add(f"The learner said: \"I work as a nurse, story number {i} " + "and more " * i + "\"")
+
+    for budget in (0, 30, 60, 150):
+        addendum = memory.prompt_addendum("nurse work", token_budget=budget)
+        assert estimate_tokens(addendum) <= budget + 1
+    assert memory.prompt_addendum("nurse work", token_budget=0) == ""
+    assert "nurse" in memory.prompt_addendum("nurse work", token_budget=150)
+
+
+def test_save_load_and_eviction(tmp_path):
+    path = str(tmp_path / 'memory.npz')
+    memory = LearnerMemory(path, max_items=20)
+    for i in range(25):
+        memory.add(f"fact {i}: " + " ".join(f"word{i}x{j}" for j in range(5)), now=1000 + i)
+    assert len(memory) <= 20
+    assert "fact 0:" not in " ".join(memory.texts)  # Les plus anciens partent en premier
+    memory.save()
+
+    restored = LearnerMemory(path, max_items=20)
+    assert restored.texts == memory.texts
+    query = memory.texts[-1]
+    assert restored.search(query)[0][1] == query
+
+
+def test_search_scales_to_many_memories(tmp_path):
+    memory = LearnerMemory(str(tmp_path / 'memory.npz'))
+    rng = np.random.default_rng(0)
+    vocabulary = [f"topic{i}" for i in range(3000)]
+    assert memory.add_many((KIND_FACT, " ".join(rng.choice(vocabulary, 6))) for _ in range(20000)) > 19000
+    memory.add("The learner said: \"I work as a nurse in Lyon\"")
+
+    memory.search("warm-up")
+    start = time.perf_counter()
+    for _ in range(20):
+        results = memory.search("Are you a nurse in Lyon?")
+    assert (time.perf_counter() - start) / 20 < 0.05
+    assert "nurse" in results[0][1]
+
+
+class RecordingCompletions:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+def test_relevant_memories_are_added_to_the_system_prompt(tmp_path):
+    completions = RecordingCompletions()
+    service = AIChatService(memory_file=str(tmp_path / 'memory.npz'))
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    assert service.memory.store_file == str(tmp_path / 'memory.npz')
+
+    service.send_message("Hello")
+    assert all("previous sessions" not in request[0]["content"] for request in completions.requests)
+
+    assert service.remember_session(session()) == 4
+    assert (tmp_path / 'memory.npz').exists()
+    service.send_message("I am tired after my nurse shift")
+    assert "nurse in Lyon" in completions.requests[-1][0]["content"]
+
+    # Un prompt de session explicite est envoyé tel quel
+    service.send_message("I am tired after my nurse shift", system_prompt="Session prompt")
+    assert completions.requests[-1][0]["content"] == "Session prompt"
@@ -0,0 +1,74 @@
+import pytest
+
+from learnwithai.services.lesson_pack import LessonPack, write_lesson_pack
+
+
+def make_lessons(count=3000):
+    levels = ["Advanced", "Beginner", "Intermediate"]
+    lessons = []
+    for i in range(count):
+        lessons.append({
+            "level": levels[i % 3],
+            "title": f"Lesson {i}: at the restaurant" if i % 100 == 0 else f"Lesson {i}: greetings",
+            "keywords": ["food"] if i % 100 == 0 else ["hello"],
+            "phrases": [{"en": "Good morning", "fr": "Bonjour"}],
+        })
+    return lessons
+
+
+@pytest.fixture
+def pack(tmp_path):
+    path = str(tmp_path / "lessons.pack")
+    write_lesson_pack(path, make_lessons())
+    with LessonPack(path) as opened:
+        yield opened
+
+
+def test_levels_are_contiguous_and_ordered(pack):
+    assert pack.level_names() == ["Beginner", "Intermediate", "Advanced"]
+    beginner = pack.level_catalog("Beginner")
+    assert len(beginner) == 1000
+    lesson_id, title = beginner[0]
+    assert title == "Lesson 1: greetings"
+    assert pack.get_lesson(lesson_id)["level"] == "Beginner"
+    assert len(pack.level_catalog("Expert")) == 0
+
+
+def test_get_lesson_decodes_full_document(pack):
+    lesson = pack.get_lesson(5)
+    assert lesson["phrases"] == [{"en": "Good morning", "fr": "Bonjour"}]
+    assert lesson["id"] == 5
+    with pytest.raises(IndexError):
+        pack.get_lesson(len(pack))
+
+
+def test_prefix_and_keyword_search(pack):
+    ids = pack.search("restau")
+    assert len(ids) == 30
+    assert all("restaurant" in pack.get_title(i) for i in ids)
+
+    advanced = pack.search("rest food", level="Advanced")
+    assert advanced and all(pack.get_lesson(i)["level"] == "Advanced" for i in advanced)
+    assert pack.search("restaurant hello") == []
+    assert pack.search("") == []
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bogus.pack"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        LessonPack(str(path))
+
+
+def test_courses_view_unmaps_the_pack_on_close(tmp_path):
+    from types import SimpleNamespace
+
+    from learnwithai.views.courses_view import CoursesView
+
+    view = CoursesView(SimpleNamespace())
+    view.pack_file = str(tmp_path / "lessons.pack")
+    write_lesson_pack(view.pack_file, make_lessons(30))
+    pack = view.get_lesson_pack()
+    view.close()
+
+    assert view.lesson_pack is None and pack._mm.closed
@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.model_router import (ROUTE_ADVANCED, ROUTE_COMPLEX, ROUTE_ESCALATED, ROUTE_FAST,
+                                               ModelRouter, message_complexity)
+
+
+def test_complexity_heuristic():
+    assert message_complexity("Hi! How are you?") < 0.2
+    hard = ("Could you explain the difference between the present perfect and the past simple, "
+            "and why we would use the conditional here although the action had been finished?")
+    assert message_complexity(hard) >= 0.6
+
+
+def test_choose_route():
+    router = ModelRouter("small", "large")
+    assert router.choose("Hello there", "Beginner") == ("small", ROUTE_FAST)
+    assert router.choose("Hello there", "Advanced") == ("large", ROUTE_ADVANCED)
+    hard = "Please explain the grammar rule: why is the subjunctive used if I would have known?"
+    assert router.choose(hard, "Beginner") == ("large", ROUTE_COMPLEX)
+    assert ModelRouter("small", None).choose(hard, "Advanced") == ("small", ROUTE_FAST)
+
+
+class ModelCompletions:
+    def __init__(self, replies):
+        self.replies = replies
+        self.models = []
+
+    def create(self, model, **kwargs):
+        self.models.append(model)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.replies[model]))])
+
+
+def test_cascade_is_opt_in(monkeypatch):
+    good = json.dumps({"response": "Hello!", "tips": ""})
+    hard = "Please explain the grammar rule: why is the subjunctive used if I would have known?"
+    monkeypatch.delenv("MODEL_ROUTING", raising=False)
+    monkeypatch.setenv("GROQ_MODEL", "small")
+    monkeypatch.setenv("GROQ_STRONG_MODEL", "large")
+
+    # Par défaut : un seul modèle, ni routage ni nouvelle tentative
+    completions = ModelCompletions({"small": "Hello! (forgot the JSON)"})
+    service = AIChatService()
+    service.settings = {"level": "Advanced", "focus": "Conversation"}
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    assert not service.router.enabled
+    assert service.send_message(hard) == "Hello! (forgot the JSON)"
+    assert completions.models == ["small"]
+
+    monkeypatch.setenv("MODEL_ROUTING", "cascade")
+    completions = ModelCompletions({"small": "Hello! (forgot the JSON)", "large": good})
+    service = AIChatService()
+    service.settings = {"level": "Beginner", "focus": "Conversation"}
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    assert (service.router.fast_model, service.router.strong_model) == ("small", "large")
+
+    assert service.send_message(hard) == good
+    assert completions.models == ["large"]
+    assert service.send_message("Hi") == good
+    assert completions.models == ["large", "small", "large"]
+    assert service.router.stats()['routes'][ROUTE_COMPLEX]['turns'] == 1
+    assert service.router.stats()['routes'][ROUTE_ESCALATED]['turns'] == 1
+
+
+def test_invalid_fast_reply_escalates():
+    good = json.dumps({"response": "Hello!", "tips": ""})
+    completions = ModelCompletions({"small": "Hello! (forgot the JSON)", "large": good})
+    service = AIChatService()
+    service.settings = {"level": "Beginner", "focus": "Conversation"}
+    service.router = ModelRouter("small", "large")
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert service.send_message("Hi") == good
+    assert completions.models == ["small", "large"]
+
+    completions.replies["small"] = good
+    service.send_message("Hi again")
+    stats = service.router.stats()
+    assert stats['routes'][ROUTE_ESCALATED]['turns'] == 1
+    assert stats['routes'][ROUTE_FAST]['turns'] == 1
+    assert stats['escalation_rate'] == 0.5
@@ -0,0 +1,55 @@
+import os
+import time
+
+from learnwithai.services.profiling import Profiler
+
+
+def busy(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_off_writes_nothing(tmp_path):
+    profiler = Profiler()
+    profiler.configure('off', str(tmp_path))
+    with profiler.scope('noop'):
+        busy(0.001)
+    assert os.listdir(tmp_path) == []
+
+
+def test_cprofile_reports_outermost_scope_only(tmp_path):
+    profiler = Profiler()
+    profiler.configure('cprofile', str(tmp_path))
+    with profiler.scope('outer'):
+        with profiler.scope('inner'):
+            busy(0.01)
+    profiler.shutdown()
+
+    reports = os.listdir(tmp_path)
+    assert len(reports) == 1 and 'cprofile-outer' in reports[0]
+    with open(tmp_path / reports[0]) as f:
+        assert 'busy' in f.read()
+
+
+def test_reports_are_rotated(tmp_path):
+    profiler = Profiler()
+    profiler.configure('cprofile', str(tmp_path))
+    profiler.max_reports = 3
+    for i in range(6):
+        with profiler.scope(f'scope{i}'):
+            pass
+    profiler.shutdown()
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_sampling_writes_collapsed_stacks(tmp_path):
+    profiler = Profiler()
+    profiler.configure('sampling', str(tmp_path))
+    with profiler.scope('work'):
+        busy(0.1)
+    profiler.shutdown()
+
+    (report,) = os.listdir(tmp_path)
+    with open(tmp_path / report) as f:
+        assert f.readline().startswith('work;')
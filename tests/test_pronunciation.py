@@ -0,0 +1,63 @@
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.pronunciation import (
+    banded_dtw,
+    mfcc_features,
+    score_features,
+    score_pronunciation,
+)
+
+
+def naive_dtw(cost):
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            acc[i, j] = cost[i - 1, j - 1] + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+    return acc[n, m]
+
+
+def chirp(seconds, rate=16000, stretch=1.0):
+    t = np.arange(int(seconds * stretch * rate)) / float(rate) / stretch
+    return (0.5 * np.sin(2 * np.pi * (200 + 300 * t) * t) * np.hanning(t.size)).astype(np.float32)
+
+
+def write_wav(path, samples, rate=16000):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes((samples * 32767).astype('<i2').tobytes())
+
+
+@pytest.mark.parametrize("shape", [(5, 7), (23, 17), (40, 40)])
+def test_banded_dtw_matches_naive_dtw_with_wide_band(shape):
+    cost = np.random.default_rng(0).random(shape)
+    total, path = banded_dtw(cost, band_ratio=10)
+
+    assert total == pytest.approx(naive_dtw(cost))
+    assert path[0] == (0, 0)
+    assert path[-1] == (shape[0] - 1, shape[1] - 1)
+
+
+def test_time_stretched_utterance_scores_higher_than_noise():
+    reference = mfcc_features(chirp(2.0))
+    stretched = score_features(mfcc_features(chirp(2.0, stretch=1.2)), reference)
+    noise = score_features(mfcc_features(np.random.default_rng(0).normal(0, 0.3, 32000)), reference)
+
+    assert stretched['score'] > noise['score'] + 30
+    assert len(stretched['segments']) == 5
+
+
+def test_score_pronunciation_of_identical_clips(tmp_path):
+    write_wav(tmp_path / 'ref.wav', chirp(1.0))
+    write_wav(tmp_path / 'learner.wav', chirp(1.0), rate=16000)
+
+    result = score_pronunciation(str(tmp_path / 'learner.wav'), str(tmp_path / 'ref.wav'))
+    assert result['score'] == pytest.approx(100.0)
+    assert result['duration_ratio'] == 1.0
@@ -0,0 +1,63 @@
+import os
+import time
+import wave
+
+from learnwithai.services.recordings_catalog import RecordingsCatalog
+
+
+def write_wav(path, seconds, rate=16000, mtime=None):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b'\x00\x00' * int(seconds * rate))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_reconcile_indexes_directory_in_one_pass(tmp_path):
+    now = time.time()
+    write_wav(tmp_path / 'a.wav', 1.0, mtime=now - 20)
+    write_wav(tmp_path / 'b.wav', 0.5, mtime=now - 10)
+    (tmp_path / 'notes.txt').write_text('ignored')
+
+    catalog = RecordingsCatalog(str(tmp_path))
+    assert catalog.reconcile() == {'added': 2, 'updated': 0, 'removed': 0}
+    assert catalog.reconcile() == {'added': 0, 'updated': 0, 'removed': 0}
+
+    newest = catalog.query(page=0, page_size=1)
+    assert [r['filename'] for r in newest] == ['b.wav']
+    assert newest[0]['duration'] == 0.5
+    assert newest[0]['sample_rate'] == 16000
+    assert [r['filename'] for r in catalog.query(page=1, page_size=1)] == ['a.wav']
+
+    os.remove(tmp_path / 'a.wav')
+    assert catalog.reconcile()['removed'] == 1
+    assert catalog.count() == 1
+
+
+def test_add_keeps_session_id(tmp_path):
+    write_wav(tmp_path / 'a.wav', 0.1)
+    catalog = RecordingsCatalog(str(tmp_path))
+    catalog.add(str(tmp_path / 'a.wav'), session_id='abc')
+
+    assert catalog.count(session_id='abc') == 1
+    catalog.reconcile()
+    assert catalog.query(session_id='abc')[0]['filename'] == 'a.wav'
+
+
+def test_prune_enforces_age_and_quota(tmp_path):
+    now = time.time()
+    write_wav(tmp_path / 'old.wav', 0.1, mtime=now - 3600)
+    write_wav(tmp_path / 'mid.wav', 1.0, mtime=now - 60)
+    write_wav(tmp_path / 'new.wav', 1.0, mtime=now)
+    catalog = RecordingsCatalog(str(tmp_path))
+    catalog.reconcile()
+
+    deleted = catalog.prune(max_age=600)
+    assert [os.path.basename(p) for p in deleted] == ['old.wav']
+
+    one_file = os.path.getsize(tmp_path / 'new.wav')
+    deleted = catalog.prune(max_bytes=one_file, protect=[str(tmp_path / 'mid.wav')])
+    assert [os.path.basename(p) for p in deleted] == ['new.wav']
+    assert sorted(os.listdir(tmp_path)) == ['catalog.sqlite3', 'mid.wav']
@@ -0,0 +1,30 @@
+from learnwithai.services.response_parser import parse_ai_response, parse_tips
+
+
+def test_json_reply_with_tips():
+    reply = '{"response": "Well done!", "tips": " Use \'went\', not \'goed\'. "}'
+    assert parse_ai_response(reply) == ("Well done!", "Use 'went', not 'goed'.")
+
+
+def test_json_surrounded_by_text():
+    reply = 'Here it is:\n{"response": "Hello!", "tips": ""}\nBye'
+    assert parse_ai_response(reply) == ("Hello!", "")
+
+
+def test_empty_response_falls_back_to_raw_reply():
+    reply = '{"response": "", "tips": "Check your spelling."}'
+    assert parse_ai_response(reply) == (reply, "Check your spelling.")
+
+
+def test_malformed_replies_are_shown_as_is():
+    assert parse_ai_response("Just text") == ("Just text", "")
+    assert parse_ai_response('{"response": "oops"') == ('{"response": "oops"', "")
+    assert parse_ai_response('{"tips": "no reply"}') == ('{"tips": "no reply"}', "no reply")
+    nested = '{"response": "Nested", "tips": {"grammar": "x"}}'
+    assert parse_ai_response(nested) == ("Nested", "")
+
+
+def test_parse_tips():
+    assert parse_tips('Here: {"tips": " Use \'an\' before a vowel. "}') == "Use 'an' before a vowel."
+    assert parse_tips('{"tips": ""}') == ""
+    assert parse_tips("no json") == ""
@@ -0,0 +1,131 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from learnwithai.services.review_scheduler import DAY, KIND_VOCABULARY, ReviewScheduler
+from learnwithai.services.task_executor import QueueFull, TaskExecutor
+
+NOW = time.mktime((2026, 10, 19, 9, 0, 0, 0, 0, -1))
+
+
+def make_scheduler(tmp_path, cards=0):
+    scheduler = ReviewScheduler(str(tmp_path / "cards.srs"))
+    scheduler.load(now=NOW)
+    for i in range(cards):
+        scheduler.add_card(f"front {i}", f"back {i}", now=NOW - i)
+    return scheduler
+
+
+def test_add_card_is_idempotent(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    first = scheduler.add_card("I goed home", "went", now=NOW)
+    assert scheduler.add_card("I goed home", "went", now=NOW) == first
+    assert len(scheduler) == 1
+
+
+def test_sm2_intervals_and_relearning(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=1)
+    assert scheduler.next_due(now=NOW) == 0
+
+    assert scheduler.grade(0, 4, now=NOW) == NOW + DAY
+    assert scheduler.grade(0, 4, now=NOW) == NOW + 6 * DAY
+    assert scheduler.grade(0, 5, now=NOW) == NOW + 15 * DAY
+    assert scheduler.next_due(now=NOW) is None
+
+    due = scheduler.grade(0, 1, now=NOW)
+    assert due == NOW + 600
+    assert scheduler.get_card(0)["lapses"] == 1
+    assert scheduler.next_due(now=NOW + 600) == 0
+
+
+def test_session_comes_from_daily_queue(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=50)
+    scheduler.build_daily_queue(now=NOW)
+
+    session = scheduler.start_session(limit=10, now=NOW)
+    assert session == list(range(49, 39, -1))
+    for card_id in session:
+        scheduler.grade(card_id, 5, now=NOW)
+
+    assert set(scheduler.start_session(limit=100, now=NOW)) == set(range(40))
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=3)
+    scheduler.add_card("Bonjour", "Good morning", kind=KIND_VOCABULARY, now=NOW)
+    scheduler.grade(1, 4, now=NOW)
+    scheduler.save()
+
+    reloaded = ReviewScheduler(scheduler.store_file)
+    reloaded.load_in_background().wait(5)
+    assert len(reloaded) == 4
+    assert reloaded.get_card(3)["kind"] == "vocabulary"
+    assert reloaded.get_card(1)["due"] == NOW + DAY
+    assert reloaded.add_card("Bonjour", "Good morning") == 3
+
+
+def test_cards_added_during_load_are_merged(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=2)
+    scheduler.save()
+
+    executor = TaskExecutor(shared_workers=1, reserved_workers={})
+    release = threading.Event()
+    try:
+        executor.submit(release.wait, 5)
+        reloaded = ReviewScheduler(scheduler.store_file)
+        task = reloaded.load_in_background(executor)
+
+        started = time.perf_counter()
+        assert reloaded.add_card("Bonjour", "Good morning", now=NOW) is None
+        assert reloaded.add_card("front 1", "back 1", now=NOW) is None
+        assert time.perf_counter() - started < 0.5  # Le thread UI n'attend pas le chargement
+
+        release.set()
+        task.wait(5)
+    finally:
+        executor.shutdown()
+    assert len(reloaded) == 3
+    assert reloaded.fronts[2] == "Bonjour"
+    assert reloaded.add_card("Bonjour", "Good morning") == 2
+
+
+def test_load_runs_in_foreground_when_the_lane_is_full(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=2)
+    scheduler.save()
+
+    def submit(*args, **kwargs):
+        raise QueueFull("background lane is full")
+    reloaded = ReviewScheduler(scheduler.store_file)
+    assert reloaded.load_in_background(SimpleNamespace(submit=submit)) is None
+    assert reloaded.ready.is_set() and len(reloaded) == 2
+    assert reloaded.add_card("Bonjour", "Good morning", now=NOW) == 2
+
+
+def test_unreadable_store_is_set_aside_not_overwritten(tmp_path):
+    store = tmp_path / "cards.srs"
+    store.write_bytes(b"not a review store")
+    scheduler = make_scheduler(tmp_path)
+    assert len(scheduler) == 0
+
+    scheduler.add_card("I goed home", "went", now=NOW)
+    scheduler.save()
+    kept = list(tmp_path.glob("cards.srs.unreadable-*"))
+    assert len(kept) == 1
+    assert kept[0].read_bytes() == b"not a review store"
+
+
+def test_truncated_store_is_rejected(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=3)
+    scheduler.save()
+    store = tmp_path / "cards.srs"
+    store.write_bytes(store.read_bytes()[:-10])
+
+    reloaded = make_scheduler(tmp_path)
+    assert len(reloaded) == 0
+    assert list(tmp_path.glob("cards.srs.unreadable-*"))
+
+
+def test_lookup_does_not_depend_on_text_hashes(tmp_path):
+    scheduler = make_scheduler(tmp_path, cards=2)
+    assert scheduler._lookup[("front 1", "back 1")] == 1
+    assert scheduler.add_card("front 1", "back 1", now=NOW) == 1
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from learnwithai.views.router import ViewRouter
+
+
+class FakeView:
+    built = 0
+
+    def __init__(self, app):
+        self.shown = 0
+        self.closed = 0
+
+    def create_view(self):
+        FakeView.built += 1
+        return object()
+
+    def on_show(self):
+        self.shown += 1
+
+    def close(self):
+        self.closed += 1
+
+
+def make_router():
+    app = SimpleNamespace(main_window=SimpleNamespace(content=None))
+    router = ViewRouter(app)
+    router.register('home', FakeView)
+    router.register('chat', FakeView)
+    router.register('courses', FakeView, evict_on_hide=True)
+    return app, router
+
+
+def test_views_are_built_once_and_reused():
+    FakeView.built = 0
+    app, router = make_router()
+
+    chat = router.show('chat')
+    chat_content = app.main_window.content
+    router.show('home')
+    assert router.show('chat') is chat
+    assert app.main_window.content is chat_content
+    assert chat.shown == 2
+    assert FakeView.built == 2
+
+
+def test_evict_on_hide_drops_view_after_navigation():
+    app, router = make_router()
+
+    courses = router.show('courses')
+    assert not router.evict('courses')
+    router.show('home')
+    assert not router.is_built('courses')
+    assert router.is_built('home')
+    assert courses.closed == 1  # Ressources libérées à l'éviction
+    assert not router.evict('courses')
+    assert courses.closed == 1
@@ -0,0 +1,124 @@
+import math
+import threading
+
+import pytest
+
+from learnwithai.services.task_executor import (
+    LANE_BACKGROUND,
+    LANE_INTERACTIVE,
+    QueueFull,
+    TaskCancelled,
+    TaskExecutor,
+)
+
+
+def blocker(executor, lane=LANE_BACKGROUND):
+    """Occupy a worker until the returned event is set"""
+    release, started = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+    task = executor.submit(block, lane=lane)
+    assert started.wait(5)
+    return release, task
+
+
+def test_higher_priority_lane_runs_first():
+    executor = TaskExecutor(shared_workers=1, reserved_workers={})
+    order = []
+    try:
+        release, _ = blocker(executor)
+        background = executor.submit(order.append, 'background', lane=LANE_BACKGROUND)
+        interactive = executor.submit(order.append, 'interactive', lane=LANE_INTERACTIVE)
+        release.set()
+        background.wait(5)
+        interactive.wait(5)
+        assert order == ['interactive', 'background']
+    finally:
+        executor.shutdown()
+
+
+def test_reserved_worker_is_not_blocked_by_background_work():
+    executor = TaskExecutor(shared_workers=1, reserved_workers={LANE_INTERACTIVE: 1})
+    try:
+        release, _ = blocker(executor)
+        assert executor.submit(lambda: 42, lane=LANE_INTERACTIVE).wait(5) == 42
+        release.set()
+    finally:
+        executor.shutdown()
+
+
+def test_queues_are_bounded():
+    executor = TaskExecutor(shared_workers=1, reserved_workers={}, queue_limits={LANE_BACKGROUND: 2})
+    try:
+        release, _ = blocker(executor)
+        executor.submit(print, lane=LANE_BACKGROUND)
+        executor.submit(print, lane=LANE_BACKGROUND)
+        with pytest.raises(QueueFull):
+            executor.submit(print, lane=LANE_BACKGROUND)
+        release.set()
+        assert executor.stats()['lanes']['background']['rejected'] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_cancellation():
+    executor = TaskExecutor(shared_workers=2, reserved_workers={})
+    ran = []
+    try:
+        release, _ = blocker(executor)
+        other_release, _ = blocker(executor)
+        pending = executor.submit(ran.append, 'pending')
+        pending.cancel()
+        release.set()
+        with pytest.raises(TaskCancelled):
+            pending.wait(5)
+        assert ran == []
+
+        def cooperative(token):
+            token.wait(5)
+            token.raise_if_cancelled()
+        running = executor.submit(cooperative, with_token=True)
+        running.cancel()
+        with pytest.raises(TaskCancelled):
+            running.wait(5)
+        other_release.set()
+    finally:
+        executor.shutdown()
+
+
+class FakeLoop:
+    def __init__(self):
+        self.calls = []
+
+    def call_soon_threadsafe(self, callback, *args):
+        self.calls.append((callback, args))
+
+
+def test_callbacks_are_marshalled_to_the_loop():
+    executor = TaskExecutor(shared_workers=1)
+    loop = FakeLoop()
+    executor.bind_loop(loop)
+    results, errors = [], []
+    try:
+        executor.submit(lambda: "reply", on_done=results.append).wait(5)
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0, on_error=errors.append).wait(5)
+
+        assert results == [] and errors == []  # Rien n'est exécuté sur le thread du worker
+        for callback, args in loop.calls:
+            callback(*args)
+        assert results == ["reply"] and isinstance(errors[0], ZeroDivisionError)
+    finally:
+        executor.shutdown()
+
+
+def test_process_pool():
+    executor = TaskExecutor(shared_workers=1, process_workers=1)
+    try:
+        assert executor.submit(math.factorial, 20, use_process=True).wait(30) == math.factorial(20)
+        stats = executor.stats()['lanes']['background']
+        assert stats['completed'] == 1 and stats['failed'] == 0
+    finally:
+        executor.shutdown()
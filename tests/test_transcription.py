@@ -0,0 +1,143 @@
+import time
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from learnwithai.services.ai_service import AIChatService
+from learnwithai.services.transcription import (
+    SegmentedTranscriber,
+    StubTranscriptionBackend,
+    TranscriptionFailed,
+    plan_segments,
+    stitch_transcripts,
+)
+
+RATE = 16000
+
+
+def speech_like(seconds, pause_every=3.0, pause=0.5, rate=RATE):
+    """Tone bursts with a pause every `pause_every` seconds; returns (samples, pause centres)"""
+    t = np.arange(int(seconds * rate)) / float(rate)
+    samples = (0.4 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    pauses = []
+    start = pause_every
+    while start + pause < seconds:
+        samples[int(start * rate):int((start + pause) * rate)] = 0.0
+        pauses.append(start + pause / 2)
+        start += pause_every + pause
+    return samples, pauses
+
+
+def write_wav(path, samples, rate=RATE):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes((samples * 32767).astype('<i2').tobytes())
+
+
+def test_cuts_fall_in_pauses_and_segments_overlap():
+    samples, pauses = speech_like(60)
+    segments = plan_segments(samples, RATE, target_seconds=10, min_seconds=6, max_seconds=14,
+                             overlap_seconds=1.0)
+
+    assert len(segments) > 1
+    assert segments[0][0] == 0 and segments[-1][1] == samples.size
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        assert end - start == RATE  # 1 s de chevauchement
+        cut = (start + end) / 2.0 / RATE
+        assert min(abs(cut - centre) for centre in pauses) < 0.25
+    assert all((end - start) / RATE <= 15 for start, end in segments)
+
+
+def test_short_recording_is_one_segment():
+    samples, _ = speech_like(5)
+    assert plan_segments(samples, RATE) == [(0, samples.size)]
+
+
+def test_stitch_removes_overlap_duplicates():
+    texts = ["I went to the market", "the market, and bought", "bought some apples.", ""]
+    assert stitch_transcripts(texts) == "I went to the market and bought some apples."
+    assert stitch_transcripts(["no overlap here", "at all"]) == "no overlap here at all"
+
+
+def test_segmented_transcription_round_trip(tmp_path):
+    samples, _ = speech_like(60)
+    path = tmp_path / "long.wav"
+    write_wav(path, samples)
+    words = [(0.25 + 0.5 * i, f"w{i}") for i in range(119)]
+
+    transcriber = SegmentedTranscriber(StubTranscriptionBackend(words), workers=3,
+                                       target_seconds=10, min_seconds=6, max_seconds=14)
+    text = transcriber.transcribe_file(str(path))
+
+    assert text == " ".join(word for _, word in words)
+    assert transcriber.last_stats['segments'] > 1
+
+
+def test_more_workers_reduce_wall_time():
+    samples, _ = speech_like(60)
+    timings = {}
+    for workers in (1, 4):
+        transcriber = SegmentedTranscriber(StubTranscriptionBackend(delay=0.05), workers=workers,
+                                           target_seconds=8, min_seconds=5, max_seconds=10)
+        started = time.perf_counter()
+        transcriber.transcribe_samples(samples, RATE)
+        timings[workers] = time.perf_counter() - started
+    assert timings[4] < timings[1] / 2
+
+
+class FlakyBackend(StubTranscriptionBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failed = False
+
+    def transcribe(self, segment):
+        if segment.index == 1 and not self.failed:
+            self.failed = True
+            raise IOError("timeout")
+        return super().transcribe(segment)
+
+
+def test_failed_segment_is_retried():
+    samples, _ = speech_like(30)
+    backend = FlakyBackend([(1.0, "hello"), (15.0, "middle"), (29.0, "bye")])
+    transcriber = SegmentedTranscriber(backend, target_seconds=10, min_seconds=6, max_seconds=14)
+
+    assert transcriber.transcribe_samples(samples, RATE) == "hello middle bye"
+    assert backend.failed and transcriber.last_stats['failed_segments'] == 0
+
+
+def test_process_audio_to_text_uses_backend(tmp_path):
+    samples, _ = speech_like(40)
+    path = tmp_path / "clip.wav"
+    write_wav(path, samples)
+
+    service = AIChatService()
+    text = service.process_audio_to_text(str(path), backend=StubTranscriptionBackend(
+        [(1.0, "hello"), (39.0, "bye")]))
+
+    assert text == "hello bye"
+
+
+class BrokenBackend(StubTranscriptionBackend):
+    def transcribe(self, segment):
+        if segment.index == 1:
+            raise IOError("timeout")
+        return super().transcribe(segment)
+
+
+def test_segment_failing_after_retries_fails_the_transcription(tmp_path):
+    samples, _ = speech_like(30)
+    backend = BrokenBackend([(1.0, "hello"), (15.0, "middle"), (29.0, "bye")])
+    transcriber = SegmentedTranscriber(backend, target_seconds=10, min_seconds=6, max_seconds=14)
+
+    with pytest.raises(TranscriptionFailed):
+        transcriber.transcribe_samples(samples, RATE)
+    assert transcriber.last_stats['failed_segments'] == 1
+
+    path = tmp_path / "clip.wav"
+    write_wav(path, samples)
+    assert AIChatService().process_audio_to_text(str(path), backend=backend) == ""